@@ -0,0 +1,331 @@
+"""Defines the benchmark suite that times each stage of the pipeline.
+
+Stages are timed on the bundled ``Data/`` snapshot, and the stages whose cost
+grows with the number of players (merging and ranking) are also timed on
+synthetic pools 10 and 100 times larger. Every run is appended to a JSON
+history file and compared against a stored baseline, so regressions are caught
+before a draft.
+
+Run with ``python -m benchmarks.bench``; ``--save-baseline`` stores the run as
+the new baseline.
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy
+
+from src import charting
+from src import draft
+from src import fitting
+from src import infra
+from src import settings
+from src.infra import Player, PlayerIndex
+from src.table import PlayerTable
+
+BENCHMARKS_DIR_PATH: str = os.path.dirname(os.path.abspath(__file__))
+HISTORY_FILE_PATH: str = os.path.join(BENCHMARKS_DIR_PATH, "history.json")
+BASELINE_FILE_PATH: str = os.path.join(BENCHMARKS_DIR_PATH, "baseline.json")
+
+SCALES: Sequence[int] = (1, 10, 100)
+# A stage regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE: float = 0.25
+# ...and slower by more than this many seconds, so timer noise on very fast
+# stages is not reported.
+NOISE_FLOOR: float = 0.001
+# Picks drafted by the ranking benchmark.
+RANK_PICKS: int = 20
+# Ranking cost does not depend on the curves' shape, so every position uses
+# this fixed curve and the benchmark does not depend on which fits converge.
+RANK_CURVE_PARAMS: Sequence[float] = (100.0, 1.0, 1.0, 0.5, 0.0)
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    best: float
+    median: float
+    repeat: int
+    # Work items per call, for stages reported per item (e.g. per pick).
+    per: int = 1
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+
+
+def time_stage(
+    name: str,
+    func: Callable[[], Any],
+    repeat: int,
+    per: int = 1,
+) -> BenchmarkResult:
+    """Time ``func`` ``repeat`` times; the best and median times are kept."""
+
+    timings: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) / per)
+    return BenchmarkResult(name, min(timings), statistics.median(timings), repeat, per)
+
+
+def scaled_players(players: Sequence[Player], factor: int) -> List[Player]:
+    """Return ``factor`` renamed copies of ``players`` with interleaved ranks."""
+
+    scaled: List[Player] = []
+    for copy in range(factor):
+        for player in players:
+            name: str = player.name if copy == 0 else f"{player.name} {copy + 1}"
+            clone = Player(name, player.position, player.team)
+            for source, rank in player.rank_map.items():
+                clone.set_rank(source, rank * factor + copy)
+            for source, position_rank in player.position_rank_map.items():
+                clone.set_position_rank(source, position_rank * factor + copy)
+            for source, projected_ppg in player.projected_ppg_map.items():
+                clone.set_projected_ppg(source, projected_ppg * (1.0 - 0.001 * copy))
+            scaled.append(clone)
+    return scaled
+
+
+def _merge(players: Sequence[Player]) -> PlayerIndex:
+    """Merge ``players`` into an index twice over, as a second source would."""
+
+    index: PlayerIndex = PlayerIndex()
+    for round_players in (players, players):
+        for player in round_players:
+            match: Optional[Player] = index.find_match(player)
+            if match:
+                match.merge(player)
+            else:
+                index.add(Player.from_record(player.to_record()))
+    return index
+
+
+def _rank_picks(table: PlayerTable, functions: draft.Functions, picks: int) -> None:
+    state: draft.DraftState = draft.DraftState(table)
+    for pick in range(1, picks + 1):
+        ranking: List[draft.RankedPlayer] = state.rank(functions, pick, top_k=1)
+        if not ranking:
+            break
+        state.take(ranking[0].name)
+
+
+def _parse_files(
+    source: infra.FantasyDataSource, kind: str, paths: Sequence[str]
+) -> List[List[infra.PlayerRecord]]:
+    return [source.parse_records(kind, path) for path in paths]
+
+
+def bench_parsing(repeat: int) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    for source_class in infra.source_classes():
+        source: infra.FantasyDataSource = source_class()
+        for kind, parse in (
+            (infra.RANKINGS, "parse_rankings"),
+            (infra.PPG, "parse_ppg"),
+        ):
+            paths: List[str] = [path for k, path in source.file_paths() if k == kind]
+            results.append(
+                time_stage(
+                    f"{parse}[{source}]",
+                    functools.partial(_parse_files, source, kind, paths),
+                    repeat,
+                )
+            )
+    return results
+
+
+def bench_fitting(table: PlayerTable, repeat: int) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    for position in table.positions:
+        points = fitting.fitting_points(position, *table.points(position))
+        results.append(
+            time_stage(
+                f"fit_curve[{position}]",
+                functools.partial(fitting.fit_position, position, *points),
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_charting(table: PlayerTable, repeat: int) -> BenchmarkResult:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    plot_data: charting.ScatterPlotData = charting.ScatterPlotData()
+    for position in table.positions:
+        plot_data.append(
+            charting.PointSet(position).extend_from_arrays(*table.points(position))
+        )
+    with tempfile.TemporaryDirectory() as output_dir_path:
+        return time_stage(
+            "charting.plot",
+            lambda: charting.plot(
+                plot_data,
+                chart_title="Benchmark",
+                show_vs_save=False,
+                output_dir_path=output_dir_path,
+            ),
+            repeat,
+        )
+
+
+def run(scales: Sequence[int] = SCALES, repeat: int = 3) -> List[BenchmarkResult]:
+    """Run every benchmark and return the results in a stable order."""
+
+    verbose: bool = settings.VERBOSE
+    use_cache: bool = settings.USE_CACHE
+    settings.VERBOSE = False
+    try:
+        results: List[BenchmarkResult] = []
+        settings.USE_CACHE = False
+        results.extend(bench_parsing(repeat))
+
+        settings.USE_CACHE = use_cache
+        # The first call fills the parse cache so that only merging is timed.
+        players: List[Player] = infra.load_players(num_workers=1)
+        results.append(
+            time_stage(
+                "load_players", lambda: infra.load_players(num_workers=1), repeat
+            )
+        )
+        table: PlayerTable = PlayerTable.from_players(players)
+
+        functions: draft.Functions = {
+            position: (fitting.power_model, numpy.asarray(RANK_CURVE_PARAMS))
+            for position in table.positions
+        }
+        for factor in scales:
+            pool: List[Player] = scaled_players(players, factor)
+            pool_table: PlayerTable = PlayerTable.from_players(pool)
+            results.append(
+                time_stage(f"merge[x{factor}]", functools.partial(_merge, pool), repeat)
+            )
+            results.append(
+                time_stage(
+                    f"rank_per_pick[x{factor}]",
+                    functools.partial(_rank_picks, pool_table, functions, RANK_PICKS),
+                    repeat,
+                    per=RANK_PICKS,
+                )
+            )
+
+        # Fits would otherwise be served from the cache or warm-started.
+        settings.USE_CACHE = False
+        results.extend(bench_fitting(table, 1))
+        settings.USE_CACHE = use_cache
+        results.append(bench_charting(table, repeat))
+        return results
+    finally:
+        settings.VERBOSE = verbose
+        settings.USE_CACHE = use_cache
+
+
+def compare(
+    results: Sequence[BenchmarkResult],
+    baseline: Dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Regression]:
+    """Return the stages whose best time regressed from ``baseline``."""
+
+    return [
+        Regression(result.name, baseline[result.name], result.best)
+        for result in results
+        if result.name in baseline
+        and result.best > baseline[result.name] * (1.0 + tolerance)
+        and result.best - baseline[result.name] > NOISE_FLOOR
+    ]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _read_json(file_path: str, default: Any) -> Any:
+    if not os.path.exists(file_path):
+        return default
+    with open(file_path, "r") as json_file:
+        return json.load(json_file)
+
+
+def _write_json(file_path: str, value: Any) -> None:
+    with open(file_path, "w") as json_file:
+        json.dump(value, json_file, indent=2)
+        json_file.write("\n")
+
+
+def append_history(file_path: str, results: Sequence[BenchmarkResult]) -> None:
+    history: List[Dict[str, Any]] = _read_json(file_path, [])
+    history.append(
+        {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "results": {result.name: result._asdict() for result in results},
+        }
+    )
+    _write_json(file_path, history)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time each stage of the pipeline.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scales", type=int, nargs="*", default=list(SCALES))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--history", default=HISTORY_FILE_PATH)
+    parser.add_argument("--baseline", default=BASELINE_FILE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store this run as the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    results: List[BenchmarkResult] = run(args.scales, args.repeat)
+    append_history(args.history, results)
+
+    baseline: Dict[str, float] = _read_json(args.baseline, {})
+    print(f"{'stage':<32} {'best (s)':>12} {'median (s)':>12} {'baseline (s)':>12}")
+    for result in results:
+        reference: str = (
+            f"{baseline[result.name]:12.6f}" if result.name in baseline else " " * 12
+        )
+        print(
+            f"{result.name:<32} {result.best:12.6f} {result.median:12.6f} {reference}"
+        )
+
+    if args.save_baseline:
+        _write_json(args.baseline, {result.name: result.best for result in results})
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions: List[Regression] = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.current:.6f}s "
+            f"vs baseline {regression.baseline:.6f}s"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""Defines bootstrap confidence bands for the position trade-off curves.
+
+The curve of each position is the one the rest of the pipeline uses: the
+power curve, or the family chosen by cross-validation when
+``settings.CURVE_MODELS`` has other candidates (see ``models``). It is
+refitted on many resamples of its points, drawn with replacement, in batches
+spread over a process pool. Power fits are warm-started from the position's
+full-data parameters, which lie close to any resample's optimum, and stop at
+``fitting.REFIT_TOLERANCE``. A resample then converges in tens of model
+evaluations, where a cold start takes thousands. The other families fit in
+closed form and simply refit.
+
+Batches have a fixed size and each has its own seed, so results for a given
+seed do not depend on the number of workers. Percentiles of the refitted
+curves bound both the curve and every player's draft value.
+"""
+
+import concurrent.futures
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy
+
+from . import fitting
+from . import models
+from . import settings
+from .table import PlayerTable
+
+# Resamples fitted one after another in one job.
+_BATCH_SIZE: int = 25
+
+
+class BootstrapFit(NamedTuple):
+    name: str
+    # The curve family, or None if the position could not be fitted.
+    model: Optional[str]
+    # Full-data parameters, or None if the position could not be fitted.
+    params: Optional[numpy.ndarray]
+    # Parameters of every resample that converged. Some families have as
+    # many parameters as the points have distinct x values, so these are not
+    # all the same length.
+    samples: List[numpy.ndarray]
+    # Resamples whose fit failed or timed out.
+    failures: int
+    # Total over every resample, across workers.
+    function_evaluations: int
+    wall_time: float
+
+
+class Band(NamedTuple):
+    lower: numpy.ndarray
+    median: numpy.ndarray
+    upper: numpy.ndarray
+
+
+class _BatchJob(NamedTuple):
+    name: str
+    model: str
+    x_values: numpy.ndarray
+    y_values: numpy.ndarray
+    initial_params: numpy.ndarray
+    size: int
+    seed: numpy.random.SeedSequence
+    timeout: Optional[float]
+
+
+class _BatchResult(NamedTuple):
+    samples: List[numpy.ndarray]
+    failures: int
+    function_evaluations: int
+    wall_time: float
+
+
+def _fit_batch(job: _BatchJob) -> _BatchResult:
+    start: float = time.perf_counter()
+    rng: numpy.random.Generator = numpy.random.default_rng(job.seed)
+    model: models.CurveModel = models.get_model(job.model)
+    num_points: int = job.x_values.size
+    samples: List[numpy.ndarray] = []
+    failures: int = 0
+    evaluations: int = 0
+    for _ in range(job.size):
+        resample: numpy.ndarray = rng.integers(0, num_points, num_points)
+        x_values: numpy.ndarray = job.x_values[resample]
+        y_values: numpy.ndarray = job.y_values[resample]
+        try:
+            if job.model == models.PowerModel.name:
+                result, result_evaluations = fitting.refit(
+                    x_values,
+                    y_values,
+                    job.initial_params,
+                    job.timeout,
+                    fitting.REFIT_TOLERANCE,
+                    fitting.REFIT_MAX_FUNCTION_EVALUATIONS,
+                )
+                evaluations += result_evaluations
+                samples.append(result.params)
+            else:
+                samples.append(model.fit_independently(x_values, y_values, job.timeout))
+        except (RuntimeError, fitting.FitTimeoutError, ValueError, TypeError):
+            failures += 1
+    return _BatchResult(
+        samples,
+        failures,
+        evaluations,
+        time.perf_counter() - start,
+    )
+
+
+def bootstrap_curves(
+    points: Dict[str, Tuple[Sequence[float], Sequence[float]]],
+    resamples: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    timeout: fitting.Timeout = fitting.DEFAULT_TIMEOUT,
+    seed: Optional[int] = None,
+    candidates: Optional[Sequence[str]] = None,
+) -> Dict[str, BootstrapFit]:
+    """Refit every position's curve on resamples of its points.
+
+    Args:
+        points: Mapping from position to its (x, y) points.
+        resamples: Resamples per position; ``settings.BOOTSTRAP_RESAMPLES`` by
+            default.
+        num_workers: Size of the process pool; ``settings.NUM_WORKERS`` by
+            default.
+        timeout: Per-fit time limit in seconds; ``settings.FIT_TIMEOUT`` by
+            default, and no limit if None. Resamples that run over count as
+            failures.
+        seed: Seed for reproducible results.
+        candidates: Candidate curve families; ``settings.CURVE_MODELS`` by
+            default. Unless this is just the power model, each position's
+            family is picked as ``models.select_curves`` does.
+
+    Returns:
+        A ``BootstrapFit`` for each position, in the order of ``points``.
+        Positions without full-data parameters are not resampled.
+    """
+
+    if resamples is None:
+        resamples = settings.BOOTSTRAP_RESAMPLES
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+    limit: Optional[float] = fitting.resolve_timeout(timeout)
+
+    # The full-data fits are usually served from the cache.
+    full_fits: Dict[str, Tuple[Optional[str], Optional[numpy.ndarray]]]
+    if models.power_only(candidates):
+        full_fits = {
+            name: (models.PowerModel.name, report.params)
+            for name, report in fitting.fit_curves(points, num_workers, limit).items()
+        }
+    else:
+        full_fits = {
+            name: (selection.model, selection.params)
+            for name, selection in models.select_curves(
+                points, candidates, num_workers=num_workers, timeout=limit
+            ).items()
+        }
+    batch_sizes: List[int] = [
+        min(_BATCH_SIZE, resamples - start)
+        for start in range(0, resamples, _BATCH_SIZE)
+    ]
+    jobs: List[_BatchJob] = []
+    for (name, (x_values, y_values)), position_seed in zip(
+        points.items(), numpy.random.SeedSequence(seed).spawn(len(points))
+    ):
+        model, params = full_fits[name]
+        if model is None or params is None:
+            continue
+        jobs.extend(
+            _BatchJob(
+                name,
+                model,
+                numpy.asarray(x_values, dtype=numpy.float64),
+                numpy.asarray(y_values, dtype=numpy.float64),
+                params,
+                batch_size,
+                batch_seed,
+                limit,
+            )
+            for batch_size, batch_seed in zip(
+                batch_sizes, position_seed.spawn(len(batch_sizes))
+            )
+        )
+
+    batches: List[_BatchResult]
+    if num_workers > 1 and len(jobs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(jobs))
+        ) as executor:
+            batches = list(executor.map(_fit_batch, jobs))
+    else:
+        batches = [_fit_batch(job) for job in jobs]
+
+    results: Dict[str, List[_BatchResult]] = {name: [] for name in points}
+    for job, batch in zip(jobs, batches):
+        results[job.name].append(batch)
+    return {
+        name: BootstrapFit(
+            name,
+            *full_fits[name],
+            [params for batch in position_batches for params in batch.samples],
+            sum(batch.failures for batch in position_batches),
+            sum(batch.function_evaluations for batch in position_batches),
+            sum(batch.wall_time for batch in position_batches),
+        )
+        for name, position_batches in results.items()
+    }
+
+
+def bootstrap_table(
+    table: PlayerTable,
+    resamples: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    timeout: fitting.Timeout = fitting.DEFAULT_TIMEOUT,
+    seed: Optional[int] = None,
+    candidates: Optional[Sequence[str]] = None,
+) -> Dict[str, BootstrapFit]:
+    """Bootstrap the curve of every position in ``table``; see ``bootstrap_curves``."""
+
+    return bootstrap_curves(
+        fitting.table_points(table),
+        resamples,
+        num_workers,
+        timeout,
+        seed,
+        candidates,
+    )
+
+
+def curve_samples(fit: BootstrapFit, x_values: numpy.ndarray) -> numpy.ndarray:
+    """Return every resample's curve at ``x_values``, one row per resample."""
+
+    x_array: numpy.ndarray = numpy.asarray(x_values, dtype=numpy.float64)
+    if fit.model is None or not fit.samples:
+        return numpy.zeros((0, x_array.size))
+    func: Callable[..., Any] = models.get_model(fit.model).func
+    with numpy.errstate(all="ignore"):
+        return numpy.array(
+            [
+                numpy.broadcast_to(func(x_array, *params), x_array.shape)
+                for params in fit.samples
+            ]
+        )
+
+
+def _band(samples: numpy.ndarray, confidence: Optional[float]) -> Band:
+    if confidence is None:
+        confidence = settings.BOOTSTRAP_CONFIDENCE
+    tail: float = 50.0 * (1.0 - confidence)
+    if not samples.shape[0]:
+        nans: numpy.ndarray = numpy.full(samples.shape[1:], numpy.nan)
+        return Band(nans, nans, nans)
+    # Diverged resamples can leave inf or NaN at extreme x values.
+    samples = numpy.where(numpy.isfinite(samples), samples, numpy.nan)
+    with numpy.errstate(all="ignore"):
+        lower, median, upper = numpy.nanpercentile(
+            samples, (tail, 50.0, 100.0 - tail), axis=0
+        )
+    return Band(lower, median, upper)
+
+
+def curve_band(
+    fit: BootstrapFit, x_values: numpy.ndarray, confidence: Optional[float] = None
+) -> Band:
+    """Return the ``confidence`` percentile band of the curve at ``x_values``.
+
+    ``confidence`` is ``settings.BOOTSTRAP_CONFIDENCE`` by default. The band is
+    NaN everywhere if no resample converged.
+    """
+
+    return _band(curve_samples(fit, x_values), confidence)
+
+
+def draft_value_bands(
+    table: PlayerTable,
+    draft_position: int,
+    fits: Dict[str, BootstrapFit],
+    confidence: Optional[float] = None,
+) -> Band:
+    """Return the band of every player's draft value at ``draft_position``.
+
+    Each resample's draft values are computed as in ``draft.draft_values``.
+    Players whose position has no resamples are NaN.
+    """
+
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    lower: numpy.ndarray = numpy.full(len(table), numpy.nan)
+    median: numpy.ndarray = numpy.full(len(table), numpy.nan)
+    upper: numpy.ndarray = numpy.full(len(table), numpy.nan)
+    for position, fit in fits.items():
+        if not fit.samples:
+            continue
+        mask: numpy.ndarray = table.position_mask(position)
+        curve: Band = curve_band(
+            fit,
+            numpy.array([float(draft_position + settings.LEAGUE_SIZE)]),
+            confidence,
+        )
+        # A higher curve means a lower draft value.
+        lower[mask] = average_ppg[mask] - curve.upper[0]
+        median[mask] = average_ppg[mask] - curve.median[0]
+        upper[mask] = average_ppg[mask] - curve.lower[0]
+    return Band(lower, median, upper)
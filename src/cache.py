@@ -0,0 +1,93 @@
+"""Defines a content-addressed on-disk cache for derived data.
+
+Entries are grouped by namespace (for example ``"parse"``) and addressed by a
+key that is usually a digest of the inputs they were derived from, so stale
+entries are never served: a changed input simply maps to a different key.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+from . import settings
+
+_CHUNK_SIZE: int = 1 << 20
+
+
+def digest(*parts: Any) -> str:
+    """Return a hex digest identifying ``parts``.
+
+    Each part is hashed through its ``repr`` (or directly when it is already
+    ``bytes``), so callers can mix version numbers, names and raw data.
+    """
+
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else repr(part).encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def file_digest(file_path: str, *salt: Any) -> str:
+    """Return a hex digest of the contents of ``file_path`` combined with ``salt``."""
+
+    hasher = hashlib.sha256(digest(*salt).encode())
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _entry_path(namespace: str, key: str) -> str:
+    return os.path.join(settings.CACHE_DIR_PATH, namespace, f"{key}.pickle")
+
+
+def load(namespace: str, key: str) -> Optional[Any]:
+    """Return the value stored under ``key``, or ``None`` on a miss.
+
+    Unreadable or truncated entries are treated as misses so that a crash
+    half-way through a write can never poison later runs.
+    """
+
+    if not settings.USE_CACHE:
+        return None
+    try:
+        with open(_entry_path(namespace, key), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        if settings.VERBOSE:
+            print(f"Ignoring unreadable {namespace} cache entry {key}: {e}")
+        return None
+
+
+def contains(namespace: str, key: str) -> bool:
+    """Return whether an entry exists under ``key``, without reading it.
+
+    An unreadable entry still counts; ``load`` will treat it as a miss.
+    """
+
+    if not settings.USE_CACHE:
+        return False
+    return os.path.exists(_entry_path(namespace, key))
+
+
+def store(namespace: str, key: str, value: Any) -> None:
+    """Persist ``value`` under ``key``, replacing any existing entry atomically."""
+
+    if not settings.USE_CACHE:
+        return
+    entry_path: str = _entry_path(namespace, key)
+    dir_path: str = os.path.dirname(entry_path)
+    os.makedirs(dir_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
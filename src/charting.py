@@ -1,15 +1,48 @@
-"""Creates charts."""
+"""Creates charts.
 
-import copy
+``plot`` shows a chart interactively or saves it. ``render`` draws a chart
+headlessly on the Agg canvas, without pyplot, and writes every requested
+format from the single drawing. ``render_batch`` renders many charts (for
+example one per position and source) in parallel worker processes.
+
+Bounds, regression lines and curve overlays are computed with whole-array
+NumPy operations. Overlays used by ``render`` are given as a ``curve``
+(a function and its parameters) rather than a callback, so that point sets can
+be sent to worker processes.
+"""
+
+import concurrent.futures
+import functools
 import itertools
 import os
-from typing import Any, Callable, List, Optional, Dict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import matplotlib.pyplot as plt
 import numpy
-import scipy.stats
+
+from . import settings
 
 DEFAULT_COLORS: List[str] = ["blue", "green", "red", "yellow", "orange", "purple"]
+DEFAULT_FORMATS: Tuple[str, ...] = ("png",)
+# Curve values at or above this are off the chart and not drawn.
+MAX_CURVE_Y: float = 1000.0
+# Axes extend past the points by this fraction of their range on every side.
+_MARGIN: float = 0.2
+# Points a new point set has room for before its buffers grow.
+_INITIAL_CAPACITY: int = 64
+
+# A curve function and its parameters, e.g. a fitted position curve.
+Curve = Tuple[Callable[..., Any], Any]
 
 
 class Point:
@@ -24,7 +57,14 @@ class Point:
         return f"{self.__class__.__name__}(x={self.x_value}, y={self.y_value}, label={self.label})"
 
 
-class PointSet(list):
+class PointSet:
+    """A named series of points, stored in growable NumPy buffers.
+
+    ``x_values`` and ``y_values`` are read-only views of the buffers, so fitting
+    and plotting read the points without copying them. ``Point`` objects are
+    only built when a point set is iterated or indexed.
+    """
+
     def __init__(
         self,
         name: str,
@@ -32,107 +72,225 @@ class PointSet(list):
         points: Optional[List[Point]] = None,
         add_regression_line: bool = False,
         additional_charting_behavior: Optional[Callable[..., None]] = None,
+        curve: Optional[Curve] = None,
     ) -> None:
-        super().__init__(points or [])
         self.name: str = name
         self.color: Optional[str] = color
         self.add_regression_line = add_regression_line
+        # Draws with pyplot, so it is only applied by ``plot``.
         self.additional_charting_behavior = additional_charting_behavior
-        for point in self:
-            assert isinstance(point, Point)
+        self.curve = curve
+        self._x: numpy.ndarray = numpy.empty(_INITIAL_CAPACITY)
+        self._y: numpy.ndarray = numpy.empty(_INITIAL_CAPACITY)
+        self._size: int = 0
+        # Allocated on the first label, since most point sets have none.
+        self._labels: Optional[List[Optional[str]]] = None
+        for point in points or []:
+            self.append(point)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Point:
+        if not -self._size <= index < self._size:
+            raise IndexError(index)
+        index %= self._size
+        return Point(
+            float(self._x[index]),
+            float(self._y[index]),
+            self._labels[index] if self._labels else None,
+        )
+
+    def __iter__(self) -> Iterator[Point]:
+        return (self[index] for index in range(self._size))
+
+    def _reserve(self, count: int) -> None:
+        """Make room for ``count`` more points, doubling the buffers as needed."""
+
+        needed: int = self._size + count
+        if needed <= self._x.size:
+            return
+        capacity: int = max(needed, 2 * self._x.size)
+        for attribute in ("_x", "_y"):
+            buffer: numpy.ndarray = numpy.empty(capacity)
+            buffer[: self._size] = getattr(self, attribute)[: self._size]
+            setattr(self, attribute, buffer)
 
     def append(self, point: Point) -> None:
-        assert isinstance(point, Point)
-        super().append(point)
+        self._reserve(1)
+        self._x[self._size] = point.x_value
+        self._y[self._size] = point.y_value
+        if point.label is not None and self._labels is None:
+            self._labels = [None] * self._size
+        if self._labels is not None:
+            self._labels.append(point.label)
+        self._size += 1
 
-    def x_values(self) -> List[float]:
-        return [point.x_value for point in self]
+    def extend_from_arrays(
+        self,
+        x_values: Sequence[float],
+        y_values: Sequence[float],
+        labels: Optional[Sequence[Optional[str]]] = None,
+    ) -> "PointSet":
+        """Append a point per pair of ``x_values`` and ``y_values`` in one copy."""
 
-    def y_values(self) -> List[float]:
-        return [point.y_value for point in self]
+        x_array: numpy.ndarray = numpy.asarray(x_values, dtype=numpy.float64)
+        y_array: numpy.ndarray = numpy.asarray(y_values, dtype=numpy.float64)
+        if x_array.shape != y_array.shape or x_array.ndim != 1:
+            raise ValueError("x and y values must be 1-D and of the same length")
+        if labels is not None and len(labels) != x_array.size:
+            raise ValueError("There must be one label per point")
+
+        self._reserve(x_array.size)
+        self._x[self._size : self._size + x_array.size] = x_array
+        self._y[self._size : self._size + y_array.size] = y_array
+        if labels is not None and self._labels is None:
+            self._labels = [None] * self._size
+        if self._labels is not None:
+            self._labels.extend(labels if labels is not None else [None] * x_array.size)
+        self._size += x_array.size
+        return self
 
     def add_points_from_lists(
         self,
-        x_values: List[float],
-        y_values: List[float],
-        labels: Optional[List[str]] = None,
+        x_values: Sequence[float],
+        y_values: Sequence[float],
+        labels: Optional[Sequence[Optional[str]]] = None,
     ) -> "PointSet":
-        assert len(x_values) == len(y_values)
-        if labels:
-            assert len(labels) == len(y_values)
+        return self.extend_from_arrays(x_values, y_values, labels or None)
 
-        for i, (x, y) in enumerate(zip(x_values, y_values)):
-            label = labels[i] if labels else None
-            self.append(Point(x, y, label=label))
-        return self
+    def x_values(self) -> numpy.ndarray:
+        return _read_only(self._x[: self._size])
+
+    def y_values(self) -> numpy.ndarray:
+        return _read_only(self._y[: self._size])
+
+    def labels(self) -> List[Optional[str]]:
+        return list(self._labels) if self._labels else [None] * self._size
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the filled part of the buffers is worth sending to workers.
+        state: Dict[str, Any] = dict(self.__dict__)
+        state["_x"] = self._x[: self._size].copy()
+        state["_y"] = self._y[: self._size].copy()
+        return state
 
     def __repr__(self) -> str:
-        return (
-            f"{self.__class__.__name__}(name={self.name}, points={super().__repr__()})"
-        )
+        return f"{self.__class__.__name__}(name={self.name}, points={list(self)})"
+
+
+def _read_only(view: numpy.ndarray) -> numpy.ndarray:
+    view.flags.writeable = False
+    return view
 
 
 class ScatterPlotData(list):
+    """Point sets with unique names, found by name through a dict."""
+
     def __init__(self, point_sets: Optional[List[PointSet]] = None) -> None:
-        super().__init__(point_sets or [])
-        for ps in self:
-            assert isinstance(ps, PointSet)
-        assert len(set(ps.name for ps in self)) == len(self), (
-            "Point set names must be unique"
-        )
+        super().__init__()
+        self._positions: Dict[str, int] = {}
+        for point_set in point_sets or []:
+            self.append(point_set)
 
     def append(self, point_set: PointSet) -> None:
         assert isinstance(point_set, PointSet)
-        assert point_set.name not in [ps.name for ps in self], (
-            "Point set name must be unique"
-        )
+        assert point_set.name not in self._positions, "Point set name must be unique"
+        self._positions[point_set.name] = len(self)
         super().append(point_set)
 
+    def extend(self, point_sets: Iterable[PointSet]) -> None:
+        for point_set in point_sets:
+            self.append(point_set)
+
+    def point_set(self, set_name: str) -> PointSet:
+        try:
+            return self[self._positions[set_name]]
+        except KeyError:
+            raise ValueError(f"Point set not found: {set_name}") from None
+
     def add_point(self, point: Point, set_name: str) -> None:
-        for ps in self:
-            if ps.name == set_name:
-                ps.append(point)
-                return
-        raise ValueError(f"Point set not found: {set_name}")
+        self.point_set(set_name).append(point)
 
     def all_points(self) -> List[Point]:
         return list(itertools.chain.from_iterable(self))
 
 
-def plot(
-    points: ScatterPlotData,
-    x_label: Optional[str] = None,
-    y_label: Optional[str] = None,
-    chart_title: Optional[str] = None,
-    show_vs_save: bool = True,
-    output_dir_path: Optional[str] = None,
-) -> None:
-    plt.clf()
-    plt.figure(figsize=(17, 10))
+class ChartSpec(NamedTuple):
+    """Everything needed to render one chart; cheap to send to workers."""
 
-    all_points: List[Point] = points.all_points()
-    x_min, x_max = (
-        min(p.x_value for p in all_points),
-        max(p.x_value for p in all_points),
-    )
-    y_min, y_max = (
-        min(p.y_value for p in all_points),
-        max(p.y_value for p in all_points),
+    points: ScatterPlotData
+    chart_title: str
+    x_label: Optional[str] = None
+    y_label: Optional[str] = None
+
+
+class _Bounds(NamedTuple):
+    x_min: float
+    x_max: float
+    x_range: float
+    x_step: float
+    y_min: float
+    y_max: float
+    y_range: float
+
+
+def _bounds(points: ScatterPlotData) -> _Bounds:
+    if not any(len(point_set) for point_set in points):
+        raise ValueError("Cannot chart point sets without any points.")
+    filled: List[PointSet] = [point_set for point_set in points if len(point_set)]
+    x_min: float = min(float(ps.x_values().min()) for ps in filled)
+    x_max: float = max(float(ps.x_values().max()) for ps in filled)
+    y_min: float = min(float(ps.y_values().min()) for ps in filled)
+    y_max: float = max(float(ps.y_values().max()) for ps in filled)
+    x_range: float = x_max - x_min
+    return _Bounds(x_min, x_max, x_range, x_range / 25.0, y_min, y_max, y_max - y_min)
+
+
+def _line_x_values(bounds: _Bounds) -> numpy.ndarray:
+    """Return the x values that lines are drawn through, across the whole chart."""
+
+    return numpy.arange(
+        bounds.x_min - bounds.x_range * _MARGIN,
+        bounds.x_max + bounds.x_range * _MARGIN + bounds.x_step / 2.0,
+        bounds.x_step,
     )
-    x_range, y_range = float(x_max - x_min), float(y_max - y_min)
-    x_step: float = x_range / 25.0
 
-    plt.axis(
+
+def curve_points(
+    curve: Curve, x_values: numpy.ndarray
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Evaluate ``curve`` at ``x_values``, keeping only first-quadrant points.
+
+    Points whose value is undefined or at least ``MAX_CURVE_Y`` are dropped.
+    """
+
+    func, params = curve
+    with numpy.errstate(all="ignore"):
+        y_values: numpy.ndarray = numpy.asarray(func(x_values, *params), dtype=float)
+    keep: numpy.ndarray = (x_values >= 0) & (y_values >= 0) & (y_values < MAX_CURVE_Y)
+    return x_values[keep], y_values[keep]
+
+
+def _draw(
+    axes: Any,
+    points: ScatterPlotData,
+    x_label: Optional[str],
+    y_label: Optional[str],
+    chart_title: Optional[str],
+) -> None:
+    bounds: _Bounds = _bounds(points)
+    axes.axis(
         [
-            x_min - x_range * 0.2,
-            x_max + x_range * 0.2,
-            y_min - y_range * 0.2,
-            y_max + y_range * 0.2,
+            bounds.x_min - bounds.x_range * _MARGIN,
+            bounds.x_max + bounds.x_range * _MARGIN,
+            bounds.y_min - bounds.y_range * _MARGIN,
+            bounds.y_max + bounds.y_range * _MARGIN,
         ]
     )
+    line_x_values: numpy.ndarray = _line_x_values(bounds)
 
-    default_colors: List[str] = copy.deepcopy(DEFAULT_COLORS)
-
+    default_colors: List[str] = list(DEFAULT_COLORS)
     for point_set in points:
         color: Optional[str] = point_set.color
         if not color:
@@ -140,55 +298,56 @@ def plot(
                 raise ValueError("Too many point sets; ran out of default colors.")
             color = default_colors.pop(0)
 
-        plt.scatter(
-            point_set.x_values(),
-            point_set.y_values(),
-            s=100.0,
-            alpha=0.25,
-            c=color,
-            label=point_set.name,
+        x_values: numpy.ndarray = point_set.x_values()
+        y_values: numpy.ndarray = point_set.y_values()
+        axes.scatter(
+            x_values, y_values, s=100.0, alpha=0.25, c=color, label=point_set.name
         )
-        for point in point_set:
-            if point.label:
-                fontdict: Dict[str, Any] = {
-                    "fontsize": 6,
-                    "horizontalalignment": "center",
-                    "color": color,
-                }
-                plt.text(point.x_value, point.y_value, point.label, fontdict=fontdict)
+        # Matplotlib has no batched text artist, so each label is its own.
+        fontdict: Dict[str, Any] = {
+            "fontsize": 6,
+            "horizontalalignment": "center",
+            "color": color,
+        }
+        for x_value, y_value, label in zip(x_values, y_values, point_set.labels()):
+            if label:
+                axes.text(x_value, y_value, label, fontdict=fontdict)
 
         if point_set.add_regression_line:
-            slope, intercept, _, _, _ = scipy.stats.linregress(
-                point_set.x_values(), point_set.y_values()
-            )
-            lsrl_x_values: numpy.ndarray = numpy.arange(
-                x_min - x_range * 0.2, x_max + x_range * 0.2 + x_step / 2.0, x_step
-            )
-            lsrl_y_values: List[float] = [x * slope + intercept for x in lsrl_x_values]
-            plt.plot(lsrl_x_values, lsrl_y_values, "--", c=color)
+            slope, intercept = numpy.polyfit(x_values, y_values, 1)
+            axes.plot(line_x_values, line_x_values * slope + intercept, "--", c=color)
+
+        if point_set.curve is not None:
+            axes.plot(*curve_points(point_set.curve, line_x_values), "--", c=color)
 
         if point_set.additional_charting_behavior:
-            point_set.additional_charting_behavior(
-                point_set,
-                x_min,
-                x_max,
-                x_range,
-                x_step,
-                y_min,
-                y_max,
-                y_range,
-                color,
-            )
+            point_set.additional_charting_behavior(point_set, *bounds, color)
 
     if len(points) > 1:
-        plt.legend()
+        axes.legend()
 
     if x_label:
-        plt.xlabel(x_label)
+        axes.set_xlabel(x_label)
     if y_label:
-        plt.ylabel(y_label)
+        axes.set_ylabel(y_label)
     if chart_title:
-        plt.title(chart_title)
+        axes.set_title(chart_title)
+
+
+def plot(
+    points: ScatterPlotData,
+    x_label: Optional[str] = None,
+    y_label: Optional[str] = None,
+    chart_title: Optional[str] = None,
+    show_vs_save: bool = True,
+    output_dir_path: Optional[str] = None,
+) -> None:
+    # Imported here so that building point sets does not load the plotting stack.
+    import matplotlib.pyplot as plt
+
+    plt.clf()
+    plt.figure(figsize=(17, 10))
+    _draw(plt.gca(), points, x_label, y_label, chart_title)
 
     if show_vs_save:
         plt.show()
@@ -198,3 +357,65 @@ def plot(
         file_name: str = f"{chart_title}.pdf"
         file_path: str = os.path.join(output_dir_path, file_name)
         plt.savefig(file_path, bbox_inches="tight")
+        plt.close("all")
+
+
+def render(
+    spec: ChartSpec,
+    output_dir_path: str,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+) -> List[str]:
+    """Draw ``spec`` once on a headless Agg canvas and save it in every format.
+
+    Returns the paths written, one per format, named after the chart title.
+    """
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if any(ps.additional_charting_behavior for ps in spec.points):
+        raise ValueError(
+            "render cannot apply additional_charting_behavior; use a curve instead."
+        )
+
+    figure = Figure(figsize=(17, 10))
+    FigureCanvasAgg(figure)
+    _draw(
+        figure.add_subplot(), spec.points, spec.x_label, spec.y_label, spec.chart_title
+    )
+
+    file_paths: List[str] = []
+    for file_format in formats:
+        file_path: str = os.path.join(
+            output_dir_path, f"{spec.chart_title}.{file_format}"
+        )
+        figure.savefig(file_path, format=file_format, bbox_inches="tight")
+        file_paths.append(file_path)
+    return file_paths
+
+
+def render_batch(
+    specs: Sequence[ChartSpec],
+    output_dir_path: str,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    num_workers: Optional[int] = None,
+) -> List[List[str]]:
+    """Render every chart of ``specs``; see ``render``.
+
+    Charts are rendered in a pool of ``num_workers`` processes
+    (``settings.NUM_WORKERS`` by default). Returns the paths written for each
+    spec, in order.
+    """
+
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+    os.makedirs(output_dir_path, exist_ok=True)
+    render_spec: Callable[[ChartSpec], List[str]] = functools.partial(
+        render, output_dir_path=output_dir_path, formats=tuple(formats)
+    )
+    if num_workers > 1 and len(specs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(specs))
+        ) as executor:
+            return list(executor.map(render_spec, specs))
+    return [render_spec(spec) for spec in specs]
@@ -0,0 +1,252 @@
+"""Defines draft-time ranking of players over a ``PlayerTable``."""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy
+
+from . import fitting
+from . import settings
+from .infra import Player, PlayerIndex
+from .table import RANK, PlayerTable, PlayerView
+
+# Mapping from position to the fitted curve function and its learned parameters.
+Functions = Dict[str, Tuple[Callable[..., Any], Any]]
+
+
+class Pick(NamedTuple):
+    # Overall pick number, from 1.
+    number: int
+    # The name the pick was recorded under.
+    name: str
+    # Table row of the drafted player, or None if no player matched.
+    row: Optional[int]
+
+
+class RankedPlayer(NamedTuple):
+    row: int
+    name: str
+    position: str
+    projected_ppg: float
+    draft_value: float
+
+
+def draft_values(
+    table: PlayerTable, draft_position: int, functions: Functions
+) -> numpy.ndarray:
+    """Return every player's draft value at ``draft_position`` as an array.
+
+    Each position's curve is evaluated once, at the pick after the next round
+    as in ``main.calculate_draft_value``, and subtracted from that position's
+    average projected PPG. Players with no fitted position curve are NaN.
+    """
+
+    values: numpy.ndarray = numpy.full(len(table), numpy.nan)
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    for position, (func, params) in functions.items():
+        mask: numpy.ndarray = table.position_mask(position)
+        values[mask] = average_ppg[mask] - func(
+            draft_position + settings.LEAGUE_SIZE, *params
+        )
+    return values
+
+
+def rank_by_draft_value(
+    table: PlayerTable,
+    draft_position: int,
+    functions: Functions,
+    available: Optional[numpy.ndarray] = None,
+    top_k: Optional[int] = None,
+) -> List[RankedPlayer]:
+    """Return players by decreasing draft value at ``draft_position``.
+
+    Args:
+        table: The full player pool.
+        draft_position: Overall pick number.
+        functions: Mapping from position to the fitted curve function and
+            its learned parameters.
+        available: Optional boolean mask of players that can still be drafted.
+        top_k: If given, only the best ``top_k`` players are selected (with
+            ``numpy.argpartition``) and sorted.
+
+    Players without a fitted curve or a projection are left out. Ties keep
+    table order.
+    """
+
+    values: numpy.ndarray = draft_values(table, draft_position, functions)
+    candidates: numpy.ndarray = ~numpy.isnan(values)
+    if available is not None:
+        candidates &= available
+    rows: numpy.ndarray = numpy.flatnonzero(candidates)
+
+    if top_k is not None and top_k < rows.size:
+        top_rows: numpy.ndarray = (
+            rows[numpy.argpartition(-values[rows], top_k - 1)[:top_k]]
+            if top_k > 0
+            else rows[:0]
+        )
+        rows = numpy.sort(top_rows)
+    rows = rows[numpy.argsort(-values[rows], kind="stable")]
+
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    return [
+        RankedPlayer(
+            int(row),
+            table.names[row],
+            table.positions[table.position_codes[row]],
+            float(average_ppg[row]),
+            float(values[row]),
+        )
+        for row in rows
+    ]
+
+
+def optimal_draft_positions(
+    table: PlayerTable, functions: Functions, last_pick: Optional[int] = None
+) -> numpy.ndarray:
+    """Return, per player, the pick at which their position's curve meets their PPG.
+
+    This is the batch counterpart of ``main.find_optimal_draft_position``: each
+    position's curve is inverted for all of its players at once, and results
+    are clamped to picks 1 through ``last_pick`` (the last pick of the draft
+    by default) instead of failing. Players with no curve or projection, or
+    whose curve is not finite where it would meet their PPG, are NaN.
+    """
+
+    if last_pick is None:
+        last_pick = settings.LEAGUE_SIZE * settings.DRAFT_ROUNDS
+
+    positions: numpy.ndarray = numpy.full(len(table), numpy.nan)
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    for position, (func, params) in functions.items():
+        mask: numpy.ndarray = table.position_mask(position)
+        positions[mask] = fitting.invert_curve(
+            average_ppg[mask], func, params, 1.0, float(last_pick)
+        )
+    return positions
+
+
+def snake_order(draft_slot: int, num_teams: int, num_rounds: int) -> numpy.ndarray:
+    """Return the 1-based overall picks that belong to ``draft_slot``."""
+
+    rounds: numpy.ndarray = numpy.arange(num_rounds)
+    offsets: numpy.ndarray = numpy.where(
+        rounds % 2 == 0, draft_slot - 1, num_teams - draft_slot
+    )
+    return rounds * num_teams + offsets + 1
+
+
+def consensus_ranks(table: PlayerTable) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Return each player's mean overall rank and the spread around it.
+
+    The spread is the standard deviation of the player's ranks across sources,
+    floored because sources rarely disagree by less than a few picks and
+    disagree more deeper in the draft. Unranked players are placed after every
+    ranked one, best projection first.
+    """
+
+    ranks: numpy.ndarray = table.values[RANK]
+    with numpy.errstate(all="ignore"):
+        rank_counts: numpy.ndarray = numpy.sum(~numpy.isnan(ranks), axis=1)
+        consensus: numpy.ndarray = numpy.nansum(ranks, axis=1) / rank_counts
+        spread: numpy.ndarray = numpy.sqrt(
+            numpy.nansum((ranks - consensus[:, numpy.newaxis]) ** 2, axis=1)
+            / rank_counts
+        )
+
+    unranked: numpy.ndarray = numpy.isnan(consensus)
+    max_rank: float = float(numpy.nanmax(consensus)) if (~unranked).any() else 0.0
+    consensus[unranked] = (
+        max_rank
+        + 1.0
+        + numpy.argsort(numpy.argsort(-table.average_projected_ppg()[unranked]))
+    )
+    spread = numpy.maximum(numpy.nan_to_num(spread), 1.0 + 0.1 * consensus)
+    return consensus, spread
+
+
+class DraftState:
+    """Tracks which players of a ``PlayerTable`` have been drafted.
+
+    Each drafted name is resolved once against a ``PlayerIndex`` of the table,
+    and availability is kept as a boolean mask, so recording a pick is O(1)
+    and the remaining pool is available without rescanning earlier picks.
+    Picks of players missing from the table can be recorded with ``skip``, so
+    the overall pick count stays in step with the real draft.
+    """
+
+    def __init__(self, table: PlayerTable) -> None:
+        self.table = table
+        self.available: numpy.ndarray = numpy.ones(len(table), dtype=bool)
+        # Every pick, matched or not, in draft order.
+        self.history: List[Pick] = []
+        self._index: PlayerIndex = PlayerIndex(table)
+
+    @property
+    def picks(self) -> List[int]:
+        """Table rows of the drafted players that matched one, in draft order."""
+
+        return [pick.row for pick in self.history if pick.row is not None]
+
+    @property
+    def pick_number(self) -> int:
+        """Overall number of the next pick."""
+
+        return len(self.history) + 1
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Return the table row of the player called ``name``, if any."""
+
+        match: Optional[Player] = self._index.find_match(Player(name))
+        return match.row if isinstance(match, PlayerView) else None
+
+    def take(self, name: str) -> Optional[int]:
+        """Mark the player called ``name`` as drafted and return their row.
+
+        Returns ``None`` if no player matches ``name``. Taking an already
+        drafted player is a no-op.
+        """
+
+        row: Optional[int] = self.resolve(name)
+        if row is not None and self.available[row]:
+            self.available[row] = False
+            self.history.append(Pick(self.pick_number, name, row))
+        return row
+
+    def skip(self, name: str = "") -> int:
+        """Record a pick that matches no player in the table; return its number."""
+
+        pick: Pick = Pick(self.pick_number, name, None)
+        self.history.append(pick)
+        return pick.number
+
+    def undo(self) -> Optional[Pick]:
+        """Undo the most recent pick, returning its player to the pool.
+
+        Returns the undone pick, or ``None`` if there were no picks.
+        """
+
+        if not self.history:
+            return None
+        pick: Pick = self.history.pop()
+        if pick.row is not None:
+            self.available[pick.row] = True
+        return pick
+
+    def remaining(self) -> numpy.ndarray:
+        return numpy.flatnonzero(self.available)
+
+    def rank(
+        self,
+        functions: Functions,
+        draft_position: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ) -> List[RankedPlayer]:
+        """Rank the remaining players, at the next pick unless told otherwise."""
+
+        return rank_by_draft_value(
+            self.table,
+            self.pick_number if draft_position is None else draft_position,
+            functions,
+            self.available,
+            top_k,
+        )
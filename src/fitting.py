@@ -0,0 +1,548 @@
+"""Defines fitting of the position-specific draft position/PPG trade-off curves.
+
+Fits are cached on disk, keyed by the exact points and the model definition,
+so an unchanged position is never refit. When a position's points change, the
+refit starts from that position's most recent parameters instead of SciPy's
+default initial guess, which converges in far fewer evaluations.
+"""
+
+import concurrent.futures
+import enum
+import math
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy
+
+from . import cache
+from . import settings
+from . import store
+from .table import PlayerTable
+
+# Bump whenever power_model or the fitting procedure changes.
+MODEL_NAME: str = "power-v1"
+MAX_FUNCTION_EVALUATIONS: int = 10000
+NUM_PARAMS: int = 5
+# Fits of throwaway point sets (bootstrap resamples, cross-validation folds)
+# start close to their optimum and stop once the squared error improves by
+# less than this fraction, within this many evaluations. Resampling noise dwarfs the optimizer's precision, while the
+# power model's nearly flat ridge makes tighter fits crawl for thousands of
+# evaluations.
+REFIT_TOLERANCE: float = 1e-4
+REFIT_MAX_FUNCTION_EVALUATIONS: int = 2000
+
+
+class _Default(enum.Enum):
+    TIMEOUT = "default"
+
+
+# Default of the ``timeout`` arguments that fall back to
+# ``settings.FIT_TIMEOUT``; an explicit None disables the limit.
+DEFAULT_TIMEOUT: Final = _Default.TIMEOUT
+Timeout = Union[float, None, Literal[_Default.TIMEOUT]]
+# QB points below this PPG are outliers that negatively impact curve fitting.
+MIN_QB_PPG: float = 200.0
+
+
+def power_model(
+    x_value: Any,
+    coefficient1: float,
+    coefficient2: float,
+    x_intercept: float,
+    exponent: float,
+    y_intercept: float,
+) -> Any:
+    return (
+        coefficient1 / numpy.power(coefficient2 * (x_value + x_intercept), exponent)
+        + y_intercept
+    )
+
+
+def initial_guess(x_values: numpy.ndarray, y_values: numpy.ndarray) -> numpy.ndarray:
+    """Return ``power_model`` parameters roughly fitted to the points.
+
+    The intercepts put the curve's asymptotes just outside the points, and the
+    exponent and scale come from a straight-line fit in log-log space. This
+    depends on nothing but the points, unlike ``latest_params``, and starts
+    far closer to the optimum than SciPy's all-ones default.
+    """
+
+    x_array: numpy.ndarray = numpy.asarray(x_values, dtype=numpy.float64)
+    y_array: numpy.ndarray = numpy.asarray(y_values, dtype=numpy.float64)
+    if not x_array.size:
+        return numpy.ones(NUM_PARAMS)
+    spread: float = max(float(numpy.ptp(y_array)), 1.0)
+    y_intercept: float = float(numpy.min(y_array)) - 0.1 * spread
+    x_intercept: float = 1.0 - float(numpy.min(x_array))
+    log_x: numpy.ndarray = numpy.log(x_array + x_intercept)
+    log_y: numpy.ndarray = numpy.log(y_array - y_intercept)
+    variance: float = float(numpy.var(log_x))
+    slope: float = (
+        float(numpy.mean((log_x - log_x.mean()) * (log_y - log_y.mean()))) / variance
+        if variance > 0
+        else 0.0
+    )
+    # The curves fall with x; anything else is no better than a flat start.
+    exponent: float = -slope if slope < 0 else 1.0
+    coefficient1: float = float(numpy.exp(numpy.mean(log_y + exponent * log_x)))
+    return numpy.array([coefficient1, 1.0, x_intercept, exponent, y_intercept])
+
+
+def invert_curve(
+    targets: numpy.ndarray,
+    func: Callable[..., Any],
+    params: Any,
+    low: float,
+    high: float,
+    tolerance: float = 1e-6,
+) -> numpy.ndarray:
+    """Return, for every target y, the x in [low, high] where ``func`` reaches it.
+
+    ``func`` is assumed monotone over the range, which holds for the fitted
+    trade-off curves. All targets are solved at once by bisection over NumPy
+    arrays, one vectorized curve evaluation per step, so the cost barely
+    depends on how many targets there are. Targets beyond the curve's values
+    at the ends of the range are clamped to ``low`` or ``high`` rather than
+    failing. A crossing can only be bracketed where the curve is finite, so
+    NaN targets give NaN, and so does every target if the curve is not finite
+    at both ends of the range, or any target whose final bracket does not
+    have the curve finite and crossing it.
+    """
+
+    targets = numpy.asarray(targets, dtype=numpy.float64)
+    with numpy.errstate(all="ignore"):
+        value_at_low: float = float(func(low, *params))
+        value_at_high: float = float(func(high, *params))
+        if not (numpy.isfinite(value_at_low) and numpy.isfinite(value_at_high)):
+            return numpy.full(targets.shape, numpy.nan)
+        # Orient the problem so that the error increases with x.
+        sign: float = -1.0 if value_at_low >= value_at_high else 1.0
+
+        result: numpy.ndarray = numpy.full(targets.shape, numpy.nan)
+        result[sign * (value_at_low - targets) >= 0] = low
+        result[sign * (value_at_high - targets) <= 0] = high
+        active: numpy.ndarray = numpy.isnan(result) & ~numpy.isnan(targets)
+
+        active_targets: numpy.ndarray = targets[active]
+        lows: numpy.ndarray = numpy.full(active_targets.shape, float(low))
+        highs: numpy.ndarray = numpy.full(active_targets.shape, float(high))
+        steps: int = max(1, math.ceil(math.log2((high - low) / tolerance)))
+        for _ in range(steps):
+            mids: numpy.ndarray = (lows + highs) / 2.0
+            too_high: numpy.ndarray = sign * (func(mids, *params) - active_targets) > 0
+            highs = numpy.where(too_high, mids, highs)
+            lows = numpy.where(too_high, lows, mids)
+        # Comparisons with NaN are False, so a non-finite stretch of the curve
+        # walks the bisection off to one side; keep only final brackets that
+        # still have the curve finite and crossing the target.
+        low_gaps: numpy.ndarray = sign * (func(lows, *params) - active_targets)
+        high_gaps: numpy.ndarray = sign * (func(highs, *params) - active_targets)
+        crossed: numpy.ndarray = (low_gaps <= 0) & (high_gaps >= 0)
+        result[active] = numpy.where(crossed, (lows + highs) / 2.0, numpy.nan)
+    return result
+
+
+class CurveFit(NamedTuple):
+    params: numpy.ndarray
+    covariance: numpy.ndarray
+
+
+class FitTimeoutError(Exception):
+    pass
+
+
+class FitReport(NamedTuple):
+    """Outcome and telemetry of fitting one position's curve.
+
+    ``status`` is ``CONVERGED``, ``CACHED``, ``FELL_BACK`` (the fit failed or
+    timed out and the position's last good parameters were used instead) or
+    ``FAILED`` (no parameters at all, in which case ``params`` is ``None``).
+    """
+
+    name: str
+    status: str
+    params: Optional[numpy.ndarray]
+    covariance: Optional[numpy.ndarray]
+    wall_time: float
+    function_evaluations: int
+    residual_norm: float
+    message: str = ""
+
+
+CONVERGED: str = "converged"
+CACHED: str = "cached"
+FELL_BACK: str = "fell back"
+FAILED: str = "failed"
+
+
+class _InstrumentedModel:
+    """``power_model`` wrapper that counts evaluations and enforces a deadline.
+
+    Raising from inside the model is the only way to stop MINPACK part-way, so
+    the deadline is checked on every evaluation.
+    """
+
+    def __init__(self, deadline: Optional[float]) -> None:
+        self.deadline = deadline
+        self.evaluations: int = 0
+
+    def __call__(self, x_value: Any, *params: float) -> Any:
+        self.evaluations += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise FitTimeoutError(f"timed out after {self.evaluations} evaluations")
+        return power_model(x_value, *params)
+
+
+def fit_curve(
+    name: str,
+    x_values: Sequence[float],
+    y_values: Sequence[float],
+    timeout: Optional[float] = None,
+) -> CurveFit:
+    """Fit ``power_model`` to the points of the position called ``name``.
+
+    Raises:
+        RuntimeError: If the fit does not converge. Failures are cached too,
+            so a hopeless point set does not burn through the evaluation
+            budget on every run.
+        FitTimeoutError: If ``timeout`` seconds pass before the fit finishes.
+    """
+
+    return _fit_curve(name, x_values, y_values, _InstrumentedModel(_deadline(timeout)))
+
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else time.perf_counter() + timeout
+
+
+def _fit_curve(
+    name: str,
+    x_values: Sequence[float],
+    y_values: Sequence[float],
+    model: _InstrumentedModel,
+) -> CurveFit:
+    x_array: numpy.ndarray = numpy.asarray(x_values, dtype=numpy.float64)
+    y_array: numpy.ndarray = numpy.asarray(y_values, dtype=numpy.float64)
+    key: str = _fit_key(x_array, y_array)
+
+    cached: Optional[Tuple[Any, ...]] = cache.load("fit", key)
+    if cached is not None:
+        if isinstance(cached[0], str):
+            raise RuntimeError(f"curve fitting failed for {name}: {cached[0]}")
+        return CurveFit(*cached)
+
+    initial_params: Optional[numpy.ndarray] = latest_params(name)
+    try:
+        result: CurveFit = _fit(x_array, y_array, initial_params, model)
+    except RuntimeError as exc:
+        cache.store("fit", key, (str(exc),))
+        raise RuntimeError(f"curve fitting failed for {name}: {exc}") from exc
+
+    cache.store("fit", key, tuple(result))
+    cache.store("fit-latest", cache.digest(MODEL_NAME, name), result.params)
+    return result
+
+
+def _fit_key(x_values: Sequence[float], y_values: Sequence[float]) -> str:
+    return cache.digest(
+        MODEL_NAME,
+        numpy.asarray(x_values, dtype=numpy.float64).tobytes(),
+        numpy.asarray(y_values, dtype=numpy.float64).tobytes(),
+    )
+
+
+def latest_params(name: str) -> Optional[numpy.ndarray]:
+    """Return the most recently fitted parameters for ``name``, if any."""
+
+    return cache.load("fit-latest", cache.digest(MODEL_NAME, name))
+
+
+def _fit(
+    x_values: numpy.ndarray,
+    y_values: numpy.ndarray,
+    initial_params: Optional[numpy.ndarray],
+    model: _InstrumentedModel,
+) -> CurveFit:
+    import scipy.optimize
+
+    if initial_params is not None:
+        try:
+            return CurveFit(
+                *scipy.optimize.curve_fit(
+                    model,
+                    x_values,
+                    y_values,
+                    p0=initial_params,
+                    maxfev=MAX_FUNCTION_EVALUATIONS,
+                )
+            )
+        except RuntimeError:
+            # The old solution can be a poor start for very different data;
+            # fall back to a cold start before giving up.
+            pass
+
+    # The wrapper's signature hides the parameter count from curve_fit, so
+    # pass its default initial guess explicitly.
+    return CurveFit(
+        *scipy.optimize.curve_fit(
+            model,
+            x_values,
+            y_values,
+            p0=numpy.ones(NUM_PARAMS),
+            maxfev=MAX_FUNCTION_EVALUATIONS,
+        )
+    )
+
+
+def refit(
+    x_values: numpy.ndarray,
+    y_values: numpy.ndarray,
+    initial_params: numpy.ndarray,
+    timeout: Optional[float] = None,
+    tolerance: Optional[float] = None,
+    max_function_evaluations: int = MAX_FUNCTION_EVALUATIONS,
+) -> Tuple[CurveFit, int]:
+    """Fit ``power_model`` from ``initial_params`` only, bypassing the cache.
+
+    For throwaway point sets close to an already fitted one, such as
+    bootstrap resamples, which would only fill the cache. ``tolerance`` is the
+    relative reduction in squared error at which the fit stops (SciPy's
+    ``ftol``, left at SciPy's default if not given). There is no cold-start
+    fallback.
+
+    Returns:
+        The fit and the number of model evaluations it took.
+
+    Raises:
+        RuntimeError: If the fit does not converge.
+        FitTimeoutError: If ``timeout`` seconds pass before the fit finishes.
+    """
+
+    import scipy.optimize
+
+    model = _InstrumentedModel(_deadline(timeout))
+    options: Dict[str, Any] = {} if tolerance is None else {"ftol": tolerance}
+    result = CurveFit(
+        *scipy.optimize.curve_fit(
+            model,
+            x_values,
+            y_values,
+            p0=initial_params,
+            maxfev=max_function_evaluations,
+            **options,
+        )
+    )
+    return result, model.evaluations
+
+
+def fit_position(
+    name: str,
+    x_values: Sequence[float],
+    y_values: Sequence[float],
+    timeout: Optional[float] = None,
+) -> FitReport:
+    """Fit one position's curve and report how it went. Never raises."""
+
+    start: float = time.perf_counter()
+    model = _InstrumentedModel(_deadline(timeout))
+    status: str = CONVERGED
+    message: str = ""
+    params: Optional[numpy.ndarray] = None
+    covariance: Optional[numpy.ndarray] = None
+    try:
+        params, covariance = _fit_curve(name, x_values, y_values, model)
+        if model.evaluations == 0:
+            status = CACHED
+    except (RuntimeError, FitTimeoutError, ValueError, TypeError) as exc:
+        message = str(exc)
+        params = latest_params(name)
+        status = FELL_BACK if params is not None else FAILED
+
+    residual_norm: float = float("nan")
+    if params is not None and len(y_values):
+        with numpy.errstate(all="ignore"):
+            residuals: numpy.ndarray = numpy.asarray(y_values) - power_model(
+                numpy.asarray(x_values, dtype=numpy.float64), *params
+            )
+        residual_norm = float(numpy.linalg.norm(residuals))
+
+    return FitReport(
+        name,
+        status,
+        params,
+        covariance,
+        time.perf_counter() - start,
+        model.evaluations,
+        residual_norm,
+        message,
+    )
+
+
+def resolve_timeout(timeout: Timeout) -> Optional[float]:
+    """Return the time limit that ``timeout`` stands for, None for no limit."""
+
+    return settings.FIT_TIMEOUT if timeout is DEFAULT_TIMEOUT else timeout
+
+
+def _fit_position_job(
+    job: Tuple[str, numpy.ndarray, numpy.ndarray, Optional[float]],
+) -> FitReport:
+    return fit_position(*job)
+
+
+def fit_curves(
+    points: Dict[str, Tuple[Sequence[float], Sequence[float]]],
+    num_workers: Optional[int] = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+) -> Dict[str, FitReport]:
+    """Fit every position's curve concurrently and report on each fit.
+
+    Args:
+        points: Mapping from position to its (x, y) points.
+        num_workers: Size of the process pool; ``settings.NUM_WORKERS`` by
+            default. Positions are fitted in this process when it is 1.
+        timeout: Per-fit time limit in seconds; ``settings.FIT_TIMEOUT`` by
+            default, and no limit if None. A fit that runs over falls back
+            like a failed one, so one diverging position cannot hold up the
+            others.
+
+    Returns:
+        A ``FitReport`` for each position, in the order of ``points``.
+    """
+
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+    limit: Optional[float] = resolve_timeout(timeout)
+
+    jobs: List[Tuple[str, numpy.ndarray, numpy.ndarray, Optional[float]]] = [
+        (name, numpy.asarray(x_values), numpy.asarray(y_values), limit)
+        for name, (x_values, y_values) in points.items()
+    ]
+    # Cached fits are read here; only the rest are worth a worker process.
+    reports: Dict[str, FitReport] = {}
+    misses: List[Tuple[str, numpy.ndarray, numpy.ndarray, Optional[float]]] = []
+    for job in jobs:
+        if _is_cached(job[1], job[2]):
+            reports[job[0]] = _fit_position_job(job)
+        else:
+            misses.append(job)
+
+    if num_workers > 1 and len(misses) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(misses))
+        ) as executor:
+            reports.update(
+                (report.name, report)
+                for report in executor.map(_fit_position_job, misses)
+            )
+    else:
+        reports.update((job[0], _fit_position_job(job)) for job in misses)
+    return {name: reports[name] for name in points}
+
+
+def _is_cached(x_values: numpy.ndarray, y_values: numpy.ndarray) -> bool:
+    # Only checks for the entry; the job that follows is what unpickles it.
+    return cache.contains("fit", _fit_key(x_values, y_values))
+
+
+def fitting_points(
+    name: str, x_values: Sequence[float], y_values: Sequence[float]
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the (x, y) points of position ``name`` that its curve is fitted to."""
+
+    x_array: numpy.ndarray = numpy.asarray(x_values, dtype=numpy.float64)
+    y_array: numpy.ndarray = numpy.asarray(y_values, dtype=numpy.float64)
+    if name != "QB":
+        return x_array, y_array
+    keep: numpy.ndarray = y_array >= MIN_QB_PPG
+    return x_array[keep], y_array[keep]
+
+
+def table_points(
+    table: PlayerTable, positions: Optional[Iterable[str]] = None
+) -> Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Return the fitting points of every position in ``table``.
+
+    If ``positions`` is given, only those of them that are in ``table`` are
+    included.
+    """
+
+    return {
+        position: fitting_points(position, *table.points(position))
+        for position in table.positions
+        if positions is None or position in positions
+    }
+
+
+def fit_table(
+    table: PlayerTable,
+    num_workers: Optional[int] = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    positions: Optional[Iterable[str]] = None,
+) -> Dict[str, FitReport]:
+    """Fit the curve of every position in ``table``; see ``fit_curves``.
+
+    If ``positions`` is given, only those of them that are in ``table`` are
+    fitted.
+    """
+
+    return fit_curves(table_points(table, positions), num_workers, timeout)
+
+
+def season_points(
+    seasons: Iterable[int], sources: Optional[Sequence[str]] = None
+) -> Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Return every position's fitting points, pooled over several stored seasons.
+
+    Only the rank, PPG and position columns of ``sources`` (all by default)
+    are read from the store; see ``store.points``.
+    """
+
+    season_list: List[int] = list(seasons)
+    positions: Iterable[str] = dict.fromkeys(
+        position
+        for season in season_list
+        for position in store.Season(season).positions
+    )
+    return {
+        position: fitting_points(
+            position, *store.points(season_list, position, sources)
+        )
+        for position in positions
+    }
+
+
+def fit_seasons(
+    seasons: Iterable[int],
+    sources: Optional[Sequence[str]] = None,
+    num_workers: Optional[int] = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+) -> Dict[str, FitReport]:
+    """Fit every position's curve to the points of several stored seasons."""
+
+    return fit_curves(season_points(seasons, sources), num_workers, timeout)
+
+
+def fitted_functions(
+    reports: Dict[str, FitReport],
+) -> Dict[str, Tuple[Callable[..., Any], Any]]:
+    """Return the curve function and parameters of every position that has them."""
+
+    return {
+        name: (power_model, report.params)
+        for name, report in reports.items()
+        if report.params is not None
+    }
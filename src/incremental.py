@@ -0,0 +1,255 @@
+"""Defines an incremental loader that re-parses only the source files that changed.
+
+The loader remembers, for every merged player, which records of which
+``(source, kind, path)`` file it was built from. On ``refresh`` each file is
+checked by size and modification time first, and by content hash only when
+those changed. Then the old records of each changed or deleted file are
+retracted from the players they were merged into, and the new records are
+matched and merged as ``infra.load_players`` would. A player is always rebuilt
+from its remaining records in merge order, so the result does not depend on
+which files changed first.
+
+``refresh`` reports which positions' players changed, so that callers refit
+only those curves. ``watch`` polls for changes for long-running workflows.
+"""
+
+import os
+import threading
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from . import infra
+from . import instrumentation
+from .infra import ParseJob, Player, PlayerIndex, PlayerRecord
+
+# (source, kind, path) of one source file.
+FileKey = Tuple[str, str, str]
+
+
+class FileState(NamedTuple):
+    size: int
+    mtime_ns: int
+    # Content hash of the file (the parse cache key of its records).
+    digest: str
+
+
+class ReloadResult(NamedTuple):
+    # Files that were added, changed or deleted since the last refresh.
+    changed_files: List[FileKey]
+    # Positions that gained, lost or changed a player.
+    changed_positions: Set[str]
+
+
+class _Contribution(NamedTuple):
+    file_key: FileKey
+    # Position of the record within its file, to restore merge order.
+    index: int
+    player_class: Type[Player]
+    record: PlayerRecord
+
+
+class _MergedPlayer:
+    """A merged player along with the records it was built from."""
+
+    __slots__ = ("contributions", "player")
+
+    def __init__(self, player: Player) -> None:
+        self.contributions: List[_Contribution] = []
+        self.player = player
+
+
+class IncrementalLoader:
+    """Keeps the merged players of some sources up to date with their files.
+
+    Args:
+        kinds: The kinds of files to read; see ``infra.load_players``.
+        sources: Names of the registered sources to read, all by default.
+        num_workers: Size of the parsing process pool; see
+            ``infra.parse_files``.
+    """
+
+    def __init__(
+        self,
+        kinds: Sequence[str] = infra.KINDS,
+        sources: Optional[Sequence[str]] = None,
+        num_workers: Optional[int] = None,
+    ) -> None:
+        self.kinds = tuple(kinds)
+        self.sources = None if sources is None else tuple(sources)
+        self.num_workers = num_workers
+        self._files: Dict[FileKey, FileState] = {}
+        self._file_order: Dict[FileKey, int] = {}
+        # The merged players each file contributed to, one per record.
+        self._owners: Dict[FileKey, List[_MergedPlayer]] = {}
+        self._merged: List[_MergedPlayer] = []
+
+    @property
+    def players(self) -> List[Player]:
+        """The merged players, in the order ``infra.load_players`` returns them."""
+
+        return [merged.player for merged in self._merged]
+
+    def _has_changed(self, job: ParseJob, key: FileKey) -> bool:
+        source, kind, path = job
+        stat: os.stat_result = os.stat(path)
+        old: Optional[FileState] = self._files.get(key)
+        if old and (old.size, old.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return False
+        state = FileState(
+            stat.st_size, stat.st_mtime_ns, source.records_cache_key(kind, path)
+        )
+        self._files[key] = state
+        # A touched but identical file is not a change.
+        return not old or old.digest != state.digest
+
+    @instrumentation.timed("refresh players")
+    def refresh(self) -> ReloadResult:
+        """Re-parse the files that changed and update the merged players."""
+
+        jobs: List[ParseJob] = infra.list_jobs(self.kinds, self.sources)
+        keys: List[FileKey] = [(str(source), kind, path) for source, kind, path in jobs]
+        self._file_order = {key: order for order, key in enumerate(keys)}
+
+        changed: List[int] = [
+            i
+            for i, (job, key) in enumerate(zip(jobs, keys))
+            if self._has_changed(job, key)
+        ]
+        deleted: List[FileKey] = [
+            key for key in self._files if key not in self._file_order
+        ]
+        for key in deleted:
+            del self._files[key]
+        if not changed and not deleted:
+            return ReloadResult([], set())
+        instrumentation.count("files reparsed", len(changed))
+
+        parsed: List[List[PlayerRecord]] = infra.parse_files(
+            [jobs[i] for i in changed], self.num_workers
+        )
+
+        affected: Dict[int, _MergedPlayer] = {}
+        old_records: List[PlayerRecord] = []
+
+        def touch(merged: _MergedPlayer) -> None:
+            if id(merged) not in affected:
+                affected[id(merged)] = merged
+                old_records.append(merged.player.to_record())
+
+        # Retract what the changed and deleted files contributed.
+        for key in [keys[i] for i in changed] + deleted:
+            for merged in self._owners.pop(key, []):
+                touch(merged)
+                merged.contributions = [
+                    contribution
+                    for contribution in merged.contributions
+                    if contribution.file_key != key
+                ]
+        for merged in affected.values():
+            self._rebuild(merged)
+        self._merged = [merged for merged in self._merged if merged.contributions]
+
+        # Apply the new records on top of what is left.
+        index: PlayerIndex = PlayerIndex()
+        owners: Dict[int, _MergedPlayer] = {}
+        for merged in self._merged:
+            index.add(merged.player)
+            owners[id(merged.player)] = merged
+        with instrumentation.timer("merge players"):
+            for i, records in zip(changed, parsed):
+                source, _, _ = jobs[i]
+                file_owners: List[_MergedPlayer] = []
+                for record_index, record in enumerate(records):
+                    player: Player = source.player_class.from_record(record)
+                    match: Optional[Player] = index.find_match(player)
+                    if match is None:
+                        merged = _MergedPlayer(player)
+                        index.add(player)
+                        owners[id(player)] = merged
+                        self._merged.append(merged)
+                        affected[id(merged)] = merged
+                    else:
+                        merged = owners[id(match)]
+                        touch(merged)
+                    merged.contributions.append(
+                        _Contribution(
+                            keys[i], record_index, source.player_class, record
+                        )
+                    )
+                    file_owners.append(merged)
+                self._owners[keys[i]] = file_owners
+
+            for merged in affected.values():
+                self._rebuild(merged)
+        self._merged.sort(key=lambda merged: self._order(merged.contributions[0]))
+
+        return ReloadResult(
+            sorted([keys[i] for i in changed] + deleted),
+            _changed_positions(
+                old_records,
+                [
+                    merged.player.to_record()
+                    for merged in affected.values()
+                    if merged.contributions
+                ],
+            ),
+        )
+
+    def _order(self, contribution: _Contribution) -> Tuple[int, int]:
+        return self._file_order[contribution.file_key], contribution.index
+
+    def _rebuild(self, merged: _MergedPlayer) -> None:
+        """Re-merge a player from its records, in the order a full load would."""
+
+        if not merged.contributions:
+            return
+        merged.contributions.sort(key=self._order)
+        first: _Contribution = merged.contributions[0]
+        player: Player = first.player_class.from_record(first.record)
+        for contribution in merged.contributions[1:]:
+            player.merge(contribution.player_class.from_record(contribution.record))
+        merged.player = player
+
+    def watch(
+        self,
+        on_change: Callable[[ReloadResult], None],
+        interval: float = 1.0,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Refresh every ``interval`` seconds until ``stop`` is set."""
+
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            result: ReloadResult = self.refresh()
+            if result.changed_files:
+                on_change(result)
+            stop.wait(interval)
+
+
+def _changed_positions(
+    old_records: List[PlayerRecord], new_records: List[PlayerRecord]
+) -> Set[str]:
+    # Compared by name, since a player whose only file changed is retracted
+    # and then merged anew.
+    old_by_name: Dict[str, PlayerRecord] = {
+        record.name: record for record in old_records
+    }
+    new_by_name: Dict[str, PlayerRecord] = {
+        record.name: record for record in new_records
+    }
+    return {
+        record.position
+        for name in old_by_name.keys() | new_by_name.keys()
+        if old_by_name.get(name) != new_by_name.get(name)
+        for record in (old_by_name.get(name), new_by_name.get(name))
+        if record is not None and record.position
+    }
@@ -1,17 +1,67 @@
 """Defines classes and functions for managing player data."""
 
+import concurrent.futures
+import functools
+import itertools
 import os
 import re
-from typing import Dict, List, Optional, Tuple, Type
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
-import bs4
 import numpy
-from bs4 import BeautifulSoup, Tag
 
+from . import cache
+from . import instrumentation
+from . import names
+from . import parsing
 from . import settings
 from . import util
+from .parsing import BlockSpec, Cell, Element, Row, TableSpec
 
-DATA_DIR_PATH: str = os.path.join(os.path.dirname(__file__), "..", "data")
+DATA_DIR_PATH: str = os.path.join(os.path.dirname(__file__), "..", "Data")
+
+# Bump whenever a change to the row parsers would alter their output, so that
+# rows cached by an older parser are never served.
+PARSER_VERSION: int = 3
+
+_PROFILE_URL_PATTERN: re.Pattern = re.compile(r"/players/\d+/([\w-]+)")
+# Position of each CBS projections table, by the start of its title.
+_CBS_POSITIONS: Dict[str, str] = {
+    "Quarterbacks": "QB",
+    "Running Backs": "RB",
+    "Wide Receivers": "WR",
+    "Tight Ends": "TE",
+    "Kickers": "K",
+    "Defense": "DST",
+}
+
+# Kinds of source files.
+RANKINGS: str = "rankings"
+PPG: str = "ppg"
+KINDS: Tuple[str, ...] = (RANKINGS, PPG)
+
+
+class PlayerRecord(NamedTuple):
+    """Plain-data snapshot of a parsed player, cheap to pickle and cache."""
+
+    name: str
+    position: Optional[str]
+    team: Optional[str]
+    rank_map: Dict[str, int]
+    position_rank_map: Dict[str, int]
+    projected_ppg_map: Dict[str, float]
 
 
 class Player:
@@ -47,8 +97,7 @@ class Player:
         return numpy.mean(list(self.projected_ppg_map.values()))
 
     def merge(self, other: "Player") -> None:
-        if settings.VERBOSE:
-            print(f"Merging {self.name} and {other.name}")
+        instrumentation.count("merges")
 
         self.position = self.position or other.position
         self.team = self.team or other.team
@@ -60,6 +109,24 @@ class Player:
         for source, projected_ppg in other.projected_ppg_map.items():
             self.set_projected_ppg(source, projected_ppg)
 
+    def to_record(self) -> PlayerRecord:
+        return PlayerRecord(
+            self.name,
+            self.position,
+            self.team,
+            dict(self.rank_map),
+            dict(self.position_rank_map),
+            dict(self.projected_ppg_map),
+        )
+
+    @classmethod
+    def from_record(cls, record: PlayerRecord) -> "Player":
+        player = cls(record.name, record.position, record.team)
+        player.rank_map.update(record.rank_map)
+        player.position_rank_map.update(record.position_rank_map)
+        player.projected_ppg_map.update(record.projected_ppg_map)
+        return player
+
     def __repr__(self) -> str:
         return (
             f"{self.__class__.__name__}(\n"
@@ -73,26 +140,18 @@ class Player:
         )
 
     def similarity(self, other: "Player") -> float:
-        def simplify(name: str) -> str:
-            # General name simplifications
-            name = re.sub(r" (Jr\.|Sr\.|II|III)$", "", name)
-            # D/ST simplifications
-            name = name.replace(" D/ST", "").replace(" D/STD/ST", "")
-            # Team name simplifications
-            for team_name in settings.TEAM_NAMES:
-                name = name.replace(f"{team_name} ", "")
-            return name
-
         if self.name == other.name:
             return 0.0
 
-        simplified_self: str = simplify(self.name)
-        simplified_other: str = simplify(other.name)
+        simplified_self: str = names.simplify(self.name)
+        simplified_other: str = names.simplify(other.name)
 
         if simplified_self == other.name or simplified_other == self.name:
             return 1.0
         if simplified_self == simplified_other:
             return 2.0
+        if names.slug(self.name) == names.slug(other.name):
+            return 3.0
 
         return float("inf")
 
@@ -108,18 +167,18 @@ class Player:
         return match[0] if match[1] != float("inf") else None
 
     @classmethod
-    def from_rankings_row(cls, row: Tag) -> "Player":
+    def from_rankings_row(cls, row: Row) -> "Player":
         raise NotImplementedError("Subclasses should override.")
 
     @classmethod
-    def from_ppg_row(cls, row: Tag) -> "Player":
+    def from_ppg_row(cls, row: Row) -> "Player":
         raise NotImplementedError("Subclasses should override.")
 
 
 class ESPNPlayer(Player):
     @classmethod
-    def from_rankings_row(cls, row: Tag) -> "ESPNPlayer":
-        cells: bs4.element.ResultSet[bs4.element.Tag] = row.find_all("td")
+    def from_rankings_row(cls, row: Row) -> "ESPNPlayer":
+        cells: Tuple[Cell, ...] = row.cells
         rank_name: str = cells[0].get_text()
         rank: int = int(rank_name.split(".")[0])
         name: str = rank_name.split(". ", 1)[1]
@@ -134,9 +193,9 @@ class ESPNPlayer(Player):
         return player
 
     @classmethod
-    def from_ppg_row(cls, row: Tag) -> "ESPNPlayer":
+    def from_ppg_row(cls, row: Row) -> "ESPNPlayer":
         try:
-            cells: bs4.element.ResultSet[bs4.element.Tag] = row.find_all("td")
+            cells: Tuple[Cell, ...] = row.cells
             name_text: str = util.aggressively_sanitize(cells[1].get_text())
             name: str = name_text.split(",")[0]
             projected_ppg: float = float(cells[-1].get_text())
@@ -145,6 +204,7 @@ class ESPNPlayer(Player):
             player.set_projected_ppg("ESPN", projected_ppg)
             return player
         except (AttributeError, ValueError, IndexError) as e:
+            instrumentation.count("rows skipped")
             if settings.VERBOSE:
                 print(f"Skipping ppg row because of a parsing error: {e}")
             return None
@@ -152,15 +212,15 @@ class ESPNPlayer(Player):
 
 class FantasyProsPlayer(Player):
     @classmethod
-    def from_rankings_row(cls, row: Tag) -> "FantasyProsPlayer":
+    def from_rankings_row(cls, row: Row) -> "FantasyProsPlayer":
         try:
-            cells: bs4.element.ResultSet[bs4.element.Tag] = row.find_all("td")
+            cells: Tuple[Cell, ...] = row.cells
             rank: int = int(cells[0].get_text())
-            player_label: Tag = cells[1]
-            name: str = player_label.find("span", class_="full-name").get_text()
+            player_label: Cell = cells[1]
+            name: str = player_label.find("span", class_="full-name").text
             position: str = re.search(r"([A-Z]+)\d+", cells[3].get_text()).group(1)
-            team_tag: Tag = player_label.find("small", class_="grey")
-            team: Optional[str] = team_tag.get_text() if team_tag else None
+            team_element: Optional[Element] = player_label.find("small", class_="grey")
+            team: Optional[str] = team_element.text if team_element else None
             position_rank: int = int(
                 re.search(r"[A-Z]+(\d+)", cells[3].get_text()).group(1)
             )
@@ -170,134 +230,535 @@ class FantasyProsPlayer(Player):
             player.set_position_rank("FantasyPros", position_rank)
             return player
         except (AttributeError, ValueError, IndexError) as e:
+            instrumentation.count("rows skipped")
             if settings.VERBOSE:
                 print(f"Skipping rankings row because of a parsing error: {e}")
             return None
 
     @classmethod
-    def from_ppg_row(cls, row: Tag) -> "FantasyProsPlayer":
+    def from_ppg_row(cls, row: Row) -> "FantasyProsPlayer":
         try:
-            player_label: Tag = row.find("td", class_="player-label")
-            name: str = player_label.find("a").get_text()
-            ppg: float = float(row.find_all("td")[-1].get_text())
+            player_label: Cell = row.find_cell("player-label")
+            name: str = player_label.find("a").text
+            ppg: float = float(row.cells[-1].get_text())
 
             player = cls(name)
             player.set_projected_ppg("FantasyPros", ppg)
             return player
-        except (AttributeError, ValueError) as e:
+        except (AttributeError, ValueError, IndexError) as e:
+            instrumentation.count("rows skipped")
             if settings.VERBOSE:
                 print(f"Skipping ppg row because of a parsing error: {e}")
             return None
 
 
+class CBSPlayer(Player):
+    @classmethod
+    def from_rankings_row(cls, row: Row) -> "CBSPlayer":
+        try:
+            block: Cell = row.cells[0]
+            rank: int = int(block.find("div", class_="rank").text)
+            # e.g. "LAR RB $35", or "DST $3" for defenses, which have no team.
+            team_position: List[str] = [
+                token
+                for token in block.find("span", class_="position").text.split()
+                if not token.startswith("$")
+            ]
+            position: str = team_position[-1]
+            team: Optional[str] = team_position[0] if len(team_position) > 1 else None
+            # Names are abbreviated ("T. Gurley"), so players other than
+            # defenses are named after the slug of their profile URL instead.
+            name: str = (
+                block.find("span", class_="player-name").text.strip()
+                if position == "DST"
+                else _name_from_profile_url(block.find("a").href)
+            )
+
+            player = cls(name, position, team)
+            player.set_rank("CBS", rank)
+            return player
+        except (AttributeError, ValueError, IndexError) as e:
+            instrumentation.count("rows skipped")
+            if settings.VERBOSE:
+                print(f"Skipping rankings row because of a parsing error: {e}")
+            return None
+
+    @classmethod
+    def from_ppg_row(cls, row: Row) -> "CBSPlayer":
+        try:
+            cells: Tuple[Cell, ...] = row.cells
+            name: str = util.aggressively_sanitize(cells[0].find("a").text)
+            team_text: str = cells[0].get_text().rsplit(",", 1)[1].strip()
+            projected_ppg: float = float(cells[-1].get_text())
+
+            player = cls(name, team=team_text or None)
+            player.set_projected_ppg("CBS", projected_ppg)
+            return player
+        except (AttributeError, ValueError, IndexError) as e:
+            instrumentation.count("rows skipped")
+            if settings.VERBOSE:
+                print(f"Skipping ppg row because of a parsing error: {e}")
+            return None
+
+
+def _name_from_profile_url(url: str) -> str:
+    """Turn ".../players/2000877/todd-gurley/" into "Todd Gurley"."""
+
+    slug: str = _PROFILE_URL_PATTERN.search(url).group(1)
+    return " ".join(part.capitalize() for part in slug.split("-"))
+
+
+class PlayerIndex:
+    """Resolves player identities through dict lookups.
+
+    Equivalent to ``Player.find_match`` against ``players`` (the players added so
+    far, in order) but each name is simplified once when added, so a lookup is
+    O(1) instead of a ``similarity`` computation against every known player.
+    """
+
+    def __init__(self, players: Iterable[Player] = ()) -> None:
+        self.players: List[Player] = []
+        # Map each key to the position of the first player that produced it,
+        # which is the one ``find_match`` would pick among equally similar ones.
+        self._by_name: Dict[str, int] = {}
+        self._by_simplified_name: Dict[str, int] = {}
+        self._by_slug: Dict[str, int] = {}
+        for player in players:
+            self.add(player)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def add(self, player: Player) -> None:
+        position: int = len(self.players)
+        self.players.append(player)
+        name_keys: names.NameKeys = names.keys(player.name)
+        self._by_name.setdefault(name_keys.raw, position)
+        self._by_simplified_name.setdefault(name_keys.simplified, position)
+        self._by_slug.setdefault(name_keys.slug, position)
+
+    def find_match(self, player: Player) -> Optional[Player]:
+        instrumentation.count("player lookups")
+        # Similarity 0: identical names.
+        position: Optional[int] = self._by_name.get(player.name)
+        if position is not None:
+            return self.players[position]
+
+        # Similarity 1: one name simplifies to the other.
+        simplified_name: str = names.simplify(player.name)
+        positions: List[int] = [
+            position
+            for position in (
+                self._by_name.get(simplified_name),
+                self._by_simplified_name.get(player.name),
+            )
+            if position is not None
+        ]
+        if positions:
+            return self.players[min(positions)]
+
+        # Similarity 2: both names simplify to the same name.
+        position = self._by_simplified_name.get(simplified_name)
+        if position is not None:
+            return self.players[position]
+
+        # Similarity 3: both names have the same slug.
+        position = self._by_slug.get(names.slug(player.name))
+        return self.players[position] if position is not None else None
+
+
 class FantasyDataSource:
-    def __init__(self) -> None:
-        self.dir_path: str = os.path.join(DATA_DIR_PATH, self.__class__.__name__)
+    """A provider of rankings and projections, saved as HTML under ``Data/``.
+
+    Subclasses declare their files (``rankings_file_name`` and the
+    ``Projections`` directory), how to find the rows in them (the table specs)
+    and how to read the rows (``player_class`` and the ``_parse_*`` methods).
+    Sources whose pages change too often to be worth caching can set
+    ``cache_records`` to ``False``.
+    """
+
+    player_class: Type[Player] = Player
+    rankings_file_name: str = "Rankings.htm"
+    rankings_table: Union[TableSpec, BlockSpec]
+    ppg_table: Union[TableSpec, BlockSpec]
+    cache_records: bool = True
+
+    @property
+    def dir_path(self) -> str:
+        return os.path.join(DATA_DIR_PATH, self.__class__.__name__)
 
     def __repr__(self) -> str:
         return self.__class__.__name__
 
-    def parse_rankings(self) -> List[Player]:
-        html_file_path: str = os.path.join(self.dir_path, "Rankings.htm")
-        try:
-            with open(html_file_path, "r", encoding="utf-8") as f:
-                html: str = f.read()
-        except FileNotFoundError:
+    def rankings_file_paths(self) -> List[str]:
+        html_file_path: str = os.path.join(self.dir_path, self.rankings_file_name)
+        if not os.path.isfile(html_file_path):
             print(f"Skipping {self} rankings because file was not found")
             return []
-        soup: BeautifulSoup = bs4.BeautifulSoup(html, "html5lib")
-        return self._parse_rankings(soup)
+        return [html_file_path]
+
+    def ppg_file_paths(self) -> List[str]:
+        projections_path: str = os.path.join(self.dir_path, "Projections")
+        return [
+            os.path.join(projections_path, filename)
+            for filename in sorted(os.listdir(projections_path))
+            if filename.endswith((".html", ".htm"))
+        ]
+
+    def file_paths(self, kinds: Sequence[str] = KINDS) -> List[Tuple[str, str]]:
+        """Return ``(kind, path)`` for this source's files of ``kinds``, in merge order.
 
-    def _parse_rankings(self, soup: BeautifulSoup) -> List[Player]:
+        Only the requested kinds are looked up, so a source's projections
+        directory is never listed when only rankings are needed.
+        """
+
+        paths: List[Tuple[str, str]] = []
+        if RANKINGS in kinds:
+            paths.extend((RANKINGS, path) for path in self.rankings_file_paths())
+        if PPG in kinds:
+            paths.extend((PPG, path) for path in self.ppg_file_paths())
+        return paths
+
+    def parse_rankings(self) -> List[Player]:
+        return [
+            self.player_class.from_record(record)
+            for path in self.rankings_file_paths()
+            for record in self.load_records(RANKINGS, path)
+        ]
+
+    def _parse_rankings(self, rows: Iterator[Row]) -> List[Player]:
         raise NotImplementedError("Subclasses should override.")
 
     def parse_ppg(self) -> List[Player]:
-        players: List[Player] = []
-        projections_path: str = os.path.join(self.dir_path, "Projections")
-        for filename in os.listdir(projections_path):
-            if filename.endswith((".html", ".htm")):
-                html_file_path: str = os.path.join(projections_path, filename)
-                with open(html_file_path, "r", encoding="utf-8") as f:
-                    html: str = f.read()
-                soup: BeautifulSoup = bs4.BeautifulSoup(html, "html5lib")
-                players.extend(self._parse_ppg(soup))
-        return players
+        return [
+            self.player_class.from_record(record)
+            for path in self.ppg_file_paths()
+            for record in self.load_records(PPG, path)
+        ]
 
-    def _parse_ppg(self, soup: BeautifulSoup) -> List[Player]:
+    def _parse_ppg(self, rows: Iterator[Row]) -> List[Player]:
         raise NotImplementedError("Subclasses should override.")
 
+    def records_cache_key(self, kind: str, html_file_path: str) -> str:
+        return cache.file_digest(html_file_path, str(self), kind, PARSER_VERSION)
+
+    def load_records(self, kind: str, html_file_path: str) -> List[PlayerRecord]:
+        """Return the records in one HTML file, going through the parse cache.
+
+        Records are cached as plain tuples keyed by the file's content hash, the
+        source, the kind of file and ``PARSER_VERSION``, so an unchanged file is
+        served without reading its HTML at all.
+        """
+
+        if not self.cache_records:
+            return self.parse_records(kind, html_file_path)
+        key: str = self.records_cache_key(kind, html_file_path)
+        records: Optional[List[PlayerRecord]] = load_cached_records(key)
+        if records is None:
+            records = self.parse_records(kind, html_file_path)
+            store_cached_records(key, records)
+        return records
+
+    def parse_records(self, kind: str, html_file_path: str) -> List[PlayerRecord]:
+        """Parse one HTML file into records, bypassing the parse cache."""
+
+        table: Union[TableSpec, BlockSpec] = (
+            self.rankings_table if kind == RANKINGS else self.ppg_table
+        )
+        parse: Callable[[Iterator[Row]], List[Player]] = (
+            self._parse_rankings if kind == RANKINGS else self._parse_ppg
+        )
+        with instrumentation.timer(f"parse {self} {kind}"):
+            html: str = read_html(html_file_path)
+            try:
+                players: List[Player] = parse(
+                    parsing.iter_rows(html, table, settings.HTML_PARSER_BACKEND)
+                )
+            except parsing.TableNotFoundError:
+                if settings.VERBOSE:
+                    print(f"Skipping {html_file_path} because the table was not found")
+                return []
+        instrumentation.count("rows parsed", len(players))
+        return [player.to_record() for player in players]
+
+
+def read_html(html_file_path: str) -> str:
+    """Read a saved page, falling back to Windows-1252 for pages that aren't UTF-8."""
+
+    with open(html_file_path, "rb") as f:
+        content: bytes = f.read()
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="replace")
+
+
+_SOURCE_CLASSES: Dict[str, Type[FantasyDataSource]] = {}
+
+
+def register_source(
+    source_class: Type[FantasyDataSource],
+) -> Type[FantasyDataSource]:
+    """Class decorator that makes a source available to ``load_players``.
+
+    Sources are registered by class name and merged in registration order.
+    Registering only records the class: it is instantiated, and its files
+    listed and parsed, only once its data is requested.
+    """
+
+    name: str = source_class.__name__
+    if name in _SOURCE_CLASSES and _SOURCE_CLASSES[name] is not source_class:
+        raise ValueError(f"A different source is already registered as {name}")
+    _SOURCE_CLASSES[name] = source_class
+    return source_class
+
+
+def source_names() -> List[str]:
+    return list(_SOURCE_CLASSES)
+
+
+def source_classes() -> List[Type[FantasyDataSource]]:
+    return list(_SOURCE_CLASSES.values())
+
+
+@functools.lru_cache(maxsize=None)
+def get_source(name: str) -> FantasyDataSource:
+    """Return the one instance of the source registered as ``name``."""
+
+    try:
+        return _SOURCE_CLASSES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown source {name!r}; expected one of {', '.join(_SOURCE_CLASSES)}"
+        ) from None
+
+
+def load_cached_records(key: str) -> Optional[List[PlayerRecord]]:
+    rows: Optional[List[Tuple]] = cache.load("parse", key)
+    return None if rows is None else [PlayerRecord._make(row) for row in rows]
+
+
+def store_cached_records(key: str, records: List[PlayerRecord]) -> None:
+    cache.store("parse", key, [tuple(record) for record in records])
 
+
+@register_source
 class ESPN(FantasyDataSource):
-    def _parse_rankings(self, soup: BeautifulSoup) -> List[Player]:
+    player_class = ESPNPlayer
+    rankings_table = TableSpec("inline-table", index=1)
+    ppg_table = TableSpec("playerTableTable tableBody")
+
+    def _parse_rankings(self, rows: Iterator[Row]) -> List[Player]:
         players: List[Player] = []
-        table: Tag = soup.find_all("table", class_="inline-table")[1]
-        for row in table.find_all("tr")[1:]:
+        for row in itertools.islice(rows, 1, None):
             player: Player = ESPNPlayer.from_rankings_row(row)
             players.append(player)
         return players
 
-    def _parse_ppg(self, soup: BeautifulSoup) -> List[Player]:
+    def _parse_ppg(self, rows: Iterator[Row]) -> List[Player]:
         players: List[Player] = []
-        try:
-            table: Tag = soup.find("table", class_="playerTableTable tableBody")
-            for row in table.find_all("tr")[2:]:
-                player: Player = ESPNPlayer.from_ppg_row(row)
-                if player:
-                    players.append(player)
-        except AttributeError:
-            if settings.VERBOSE:
-                print("Skipping ppg because the table was not found")
+        for row in itertools.islice(rows, 2, None):
+            player: Player = ESPNPlayer.from_ppg_row(row)
+            if player:
+                players.append(player)
         return players
 
 
+@register_source
 class FantasyPros(FantasyDataSource):
-    def _parse_rankings(self, soup: BeautifulSoup) -> List[Player]:
+    player_class = FantasyProsPlayer
+    rankings_table = TableSpec("table-bordered")
+    ppg_table = TableSpec("table-bordered")
+
+    def _parse_rankings(self, rows: Iterator[Row]) -> List[Player]:
         players: List[Player] = []
-        try:
-            table: Tag = soup.find("table", class_="table-bordered")
-            for row in table.find_all("tr")[2:]:
-                if "Tier" not in row.get_text() and len(row.find_all("td")) == 11:
-                    player: Player = FantasyProsPlayer.from_rankings_row(row)
-                    if player:
-                        players.append(player)
-        except AttributeError:
-            if settings.VERBOSE:
-                print("Skipping rankings because the table was not found")
+        for row in itertools.islice(rows, 2, None):
+            if "Tier" not in row.get_text() and len(row.cells) == 11:
+                player: Player = FantasyProsPlayer.from_rankings_row(row)
+                if player:
+                    players.append(player)
         return players
 
-    def _parse_ppg(self, soup: BeautifulSoup) -> List[Player]:
+    def _parse_ppg(self, rows: Iterator[Row]) -> List[Player]:
         players: List[Player] = []
-        try:
-            table: Tag = soup.find("table", class_="table-bordered")
-            should_ignore: bool = True
-            for row in table.find_all("tr")[1:]:
-                if should_ignore:
-                    if "Player" in row.get_text():
-                        should_ignore = False
-                else:
-                    player: Player = FantasyProsPlayer.from_ppg_row(row)
-                    if player:
-                        players.append(player)
-        except AttributeError:
-            if settings.VERBOSE:
-                print("Skipping ppg because the table was not found")
+        should_ignore: bool = True
+        for row in itertools.islice(rows, 1, None):
+            if should_ignore:
+                if "Player" in row.get_text():
+                    should_ignore = False
+            else:
+                player: Player = FantasyProsPlayer.from_ppg_row(row)
+                if player:
+                    players.append(player)
         return players
 
 
-SOURCES: List[Type[FantasyDataSource]] = [ESPN, FantasyPros]
-
+@register_source
+class CBS(FantasyDataSource):
+    player_class = CBSPlayer
+    rankings_file_name = "Rankings.html"
+    # Rankings are a list of blocks per expert rather than a table.
+    rankings_table = BlockSpec("div", "player-row")
+    ppg_table = TableSpec("data compact")
+
+    def _parse_rankings(self, rows: Iterator[Row]) -> List[Player]:
+        # Each expert ranks players separately; the CBS ranks are the order of
+        # each player's mean rank across the experts who rank them.
+        players: Dict[str, Player] = {}
+        expert_ranks: Dict[str, List[int]] = {}
+        for row in rows:
+            player: Optional[Player] = CBSPlayer.from_rankings_row(row)
+            if player:
+                players.setdefault(player.name, player)
+                expert_ranks.setdefault(player.name, []).append(player.rank_map["CBS"])
+
+        ordered: List[Player] = sorted(
+            players.values(),
+            key=lambda player: numpy.mean(expert_ranks[player.name]),
+        )
+        position_counts: Dict[Optional[str], int] = {}
+        for rank, player in enumerate(ordered, start=1):
+            position_counts[player.position] = (
+                position_counts.get(player.position, 0) + 1
+            )
+            player.set_rank("CBS", rank)
+            player.set_position_rank("CBS", position_counts[player.position])
+        return ordered
 
-def load_players() -> List[Player]:
-    players: List[Player] = []
-    for source_class in SOURCES:
-        source: FantasyDataSource = source_class()
-        for player in source.parse_rankings() + source.parse_ppg():
-            old_player: Optional[Player] = player.find_match(players)
-            if old_player:
-                old_player.merge(player)
-            else:
+    def _parse_ppg(self, rows: Iterator[Row]) -> List[Player]:
+        players: List[Player] = []
+        position: Optional[str] = None
+        for row in rows:
+            if len(row.cells) == 1 and "Projections" in row.get_text():
+                position = _CBS_POSITIONS.get(row.get_text().split(" - ")[0].strip())
+                continue
+            link: Optional[Element] = row.cells[0].find("a") if row.cells else None
+            if link is None or not _PROFILE_URL_PATTERN.search(link.href):
+                continue
+            player: Optional[Player] = CBSPlayer.from_ppg_row(row)
+            if player:
+                player.position = position
                 players.append(player)
-    return players
+        return players
+
+
+ParseJob = Tuple[FantasyDataSource, str, str]
+
+
+def _parse_job(job: ParseJob) -> List[PlayerRecord]:
+    source, kind, html_file_path = job
+    return source.parse_records(kind, html_file_path)
+
+
+def parse_files(
+    jobs: List[ParseJob], num_workers: Optional[int] = None
+) -> List[List[PlayerRecord]]:
+    """Return the records of every ``(source, kind, path)`` job, in job order.
+
+    Files found in the parse cache are served directly. The rest are parsed in
+    a pool of ``num_workers`` processes (``settings.NUM_WORKERS`` by default),
+    largest file first so that the slowest file starts as early as possible.
+    Workers only ever return plain ``PlayerRecord``s, which are cheap to pickle.
+    """
+
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+
+    keys: List[Optional[str]] = [
+        source.records_cache_key(kind, path) if source.cache_records else None
+        for source, kind, path in jobs
+    ]
+    results: List[Optional[List[PlayerRecord]]] = [
+        None if key is None else load_cached_records(key) for key in keys
+    ]
+    misses: List[int] = [i for i, records in enumerate(results) if records is None]
+    instrumentation.count("parse cache hits", len(jobs) - len(misses))
+
+    if num_workers > 1 and len(misses) > 1:
+        misses.sort(key=lambda i: os.path.getsize(jobs[i][2]), reverse=True)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(misses))
+        ) as executor:
+            parsed = executor.map(
+                functools.partial(
+                    instrumentation.collect,
+                    _parse_job,
+                    instrumentation.is_enabled(),
+                ),
+                [jobs[i] for i in misses],
+            )
+            for i, (records, worker_snapshot) in zip(misses, parsed):
+                results[i] = records
+                if worker_snapshot is not None:
+                    instrumentation.merge(worker_snapshot)
+    else:
+        for i in misses:
+            results[i] = _parse_job(jobs[i])
+
+    all_records: List[List[PlayerRecord]] = []
+    for job_records in results:
+        # Every miss has been parsed by now.
+        assert job_records is not None
+        all_records.append(job_records)
+    for i in misses:
+        key: Optional[str] = keys[i]
+        if key is not None:
+            store_cached_records(key, all_records[i])
+    return all_records
+
+
+def list_jobs(
+    kinds: Sequence[str] = KINDS, sources: Optional[Sequence[str]] = None
+) -> List[ParseJob]:
+    """Return a parse job for every file of ``kinds`` of ``sources``, in merge order.
+
+    ``sources`` are names of registered sources, all of them by default.
+    Sources are merged in registration order either way.
+    """
+
+    if sources is not None:
+        unknown: Set[str] = set(sources) - set(_SOURCE_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+    return [
+        (get_source(name), kind, path)
+        for name in source_names()
+        if sources is None or name in sources
+        for kind, path in get_source(name).file_paths(kinds)
+    ]
+
+
+@instrumentation.timed("load_players")
+def load_players(
+    num_workers: Optional[int] = None,
+    kinds: Sequence[str] = KINDS,
+    sources: Optional[Sequence[str]] = None,
+) -> List[Player]:
+    """Parse and merge the players of every requested source.
+
+    Args:
+        num_workers: Size of the parsing process pool; see ``parse_files``.
+        kinds: The kinds of files to read. Pass ``(RANKINGS,)`` to skip
+            projections entirely when only ranks are needed.
+        sources: Names of the registered sources to read; see ``list_jobs``.
+    """
+
+    jobs: List[ParseJob] = list_jobs(kinds, sources)
+
+    with instrumentation.timer("parse_files"):
+        parsed: List[List[PlayerRecord]] = parse_files(jobs, num_workers)
+
+    index: PlayerIndex = PlayerIndex()
+    with instrumentation.timer("merge players"):
+        for (source, _, _), records in zip(jobs, parsed):
+            for record in records:
+                player: Player = source.player_class.from_record(record)
+                old_player: Optional[Player] = index.find_match(player)
+                if old_player:
+                    old_player.merge(player)
+                else:
+                    index.add(player)
+    return index.players
 
 
 def main() -> None:
@@ -0,0 +1,216 @@
+"""Defines lightweight timers and counters for the hot paths.
+
+Instrumentation is off unless ``settings.INSTRUMENT`` is set or ``enable`` is
+called. While off, ``timer`` hands back one shared no-op context manager and
+``count`` returns after checking a flag, so calls can stay in hot loops.
+
+While on, every timed block becomes a trace event and every count is added to
+a named counter. The results can be printed as a summary table or saved as
+Chrome trace-event JSON (open it in chrome://tracing or Perfetto). Worker
+processes take a ``snapshot`` of what they recorded, and the parent ``merge``s
+it into its own.
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import types
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+)
+
+from . import settings
+
+
+class Event(NamedTuple):
+    name: str
+    # Both in nanoseconds; start is on the system-wide monotonic clock, so
+    # events from worker processes line up with the parent's.
+    start: int
+    duration: int
+    pid: int
+    tid: int
+
+
+class Snapshot(NamedTuple):
+    events: List[Event]
+    counters: Dict[str, int]
+
+
+_enabled: bool = settings.INSTRUMENT
+_events: List[Event] = []
+_counters: Dict[str, int] = collections.Counter()
+_NULL_TIMER: ContextManager[None] = contextlib.nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    """Forget every recorded event and counter."""
+
+    _events.clear()
+    _counters.clear()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start: int = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[types.TracebackType],
+    ) -> None:
+        _events.append(
+            Event(
+                self.name,
+                self.start,
+                time.perf_counter_ns() - self.start,
+                os.getpid(),
+                threading.get_ident(),
+            )
+        )
+
+
+def timer(name: str) -> ContextManager[None]:
+    """Return a context manager that records how long its block takes."""
+
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorate a function so that every call is timed, under ``name`` if given."""
+
+    def decorator(func: Callable) -> Callable:
+        timer_name: str = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(timer_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, amount: int = 1) -> None:
+    if _enabled:
+        _counters[name] += amount
+
+
+def snapshot() -> Snapshot:
+    return Snapshot(list(_events), dict(_counters))
+
+
+def merge(other: Snapshot) -> None:
+    """Add what another process recorded to this process's events and counters."""
+
+    _events.extend(other.events)
+    for name, amount in other.counters.items():
+        _counters[name] += amount
+
+
+def collect(func: Callable[..., Any], enabled: bool, *args: Any) -> Any:
+    """Run ``func(*args)`` in a worker and return its result and a snapshot.
+
+    The worker records only if ``enabled``; the snapshot is ``None`` otherwise.
+    """
+
+    if not enabled:
+        return func(*args), None
+    enable()
+    reset()
+    return func(*args), snapshot()
+
+
+def summary() -> str:
+    """Return a table of time spent per timer and the value of every counter."""
+
+    totals: Dict[str, List[int]] = collections.defaultdict(list)
+    for event in _events:
+        totals[event.name].append(event.duration)
+
+    lines: List[str] = [
+        (
+            f"{'timer':<36} {'calls':>8} {'total (s)':>12} {'mean (ms)':>12} "
+            f"{'max (ms)':>12}"
+        )
+    ]
+    for name, durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+        lines.append(
+            f"{name:<36} {len(durations):>8} {sum(durations) / 1e9:>12.4f} "
+            f"{sum(durations) / len(durations) / 1e6:>12.3f} "
+            f"{max(durations) / 1e6:>12.3f}"
+        )
+    if _counters:
+        lines.append("")
+        lines.append(f"{'counter':<36} {'value':>8}")
+        for name, value in sorted(_counters.items()):
+            lines.append(f"{name:<36} {value:>8}")
+    return "\n".join(lines)
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Return the recorded events in Chrome's trace-event format."""
+
+    trace_events: List[Dict[str, Any]] = [
+        {
+            "name": event.name,
+            "ph": "X",
+            "ts": event.start / 1e3,
+            "dur": event.duration / 1e3,
+            "pid": event.pid,
+            "tid": event.tid,
+        }
+        for event in _events
+    ]
+    end: float = max((event.start + event.duration for event in _events), default=0)
+    trace_events.extend(
+        {
+            "name": name,
+            "ph": "C",
+            "ts": end / 1e3,
+            "pid": os.getpid(),
+            "args": {name: value},
+        }
+        for name, value in _counters.items()
+    )
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(file_path: str) -> None:
+    with open(file_path, "w") as trace_file:
+        json.dump(chrome_trace(), trace_file)
@@ -0,0 +1,221 @@
+"""Defines a pick recommender that looks ahead to my next few picks.
+
+Instead of comparing a player against a single point of the fitted curves, the
+recommender asks how my starting lineup is expected to look over the next
+``rounds`` picks. Each candidate's chance of surviving until a later pick of
+mine comes from a normal model of when they will be drafted: it is centred on
+their consensus rank, and its width is how much the sources disagree about
+them. From those survival chances it computes the expected PPG of the best,
+second best, ... player of each position still available at each of my picks.
+It then searches over which position to fill at each pick, memoizing
+subproblems by (pick, players taken per position).
+
+The search assumes that whenever I take a position, I take the best player
+left at that position. Only the top ``_CANDIDATES_PER_POSITION`` available
+players of each position are considered, since players beyond them almost
+never matter to the expected lineup.
+"""
+
+import functools
+import math
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy
+
+from . import settings
+from .draft import DraftState, consensus_ranks, snake_order
+
+_CANDIDATES_PER_POSITION: int = 30
+_ERFC = numpy.vectorize(math.erfc, otypes=[float])
+
+
+class Recommendation(NamedTuple):
+    row: int
+    name: str
+    position: str
+    projected_ppg: float
+    # Chance the player is still available at my next pick.
+    survival: float
+    # Expected starters' PPG gained over the lookahead if the player is taken now.
+    value: float
+
+
+def _drafted_after(
+    pick: numpy.ndarray, consensus: numpy.ndarray, spread: numpy.ndarray
+) -> numpy.ndarray:
+    """Probability that a player is still undrafted by overall ``pick``."""
+
+    return 0.5 * _ERFC((pick - consensus) / (spread * math.sqrt(2.0)))
+
+
+def survival_probabilities(
+    state: DraftState,
+    picks: numpy.ndarray,
+    rows: Optional[numpy.ndarray] = None,
+) -> numpy.ndarray:
+    """Return the chance that each of ``rows`` survives until each of ``picks``.
+
+    The result has one row per pick and one column per player, and is
+    conditioned on the players still being available at the current pick.
+    ``rows`` defaults to every remaining player.
+    """
+
+    if rows is None:
+        rows = state.remaining()
+    consensus, spread = consensus_ranks(state.table)
+    now: numpy.ndarray = _drafted_after(
+        numpy.float64(state.pick_number), consensus[rows], spread[rows]
+    )
+    later: numpy.ndarray = _drafted_after(
+        numpy.asarray(picks, dtype=float)[:, numpy.newaxis],
+        consensus[rows],
+        spread[rows],
+    )
+    with numpy.errstate(all="ignore"):
+        survival: numpy.ndarray = later / now
+    return numpy.clip(numpy.nan_to_num(survival), 0.0, 1.0)
+
+
+def _expected_order_statistics(
+    ppg: numpy.ndarray, survival: numpy.ndarray, count: int
+) -> numpy.ndarray:
+    """Expected PPG of the 1st..``count``-th best survivor at each pick.
+
+    ``ppg`` is sorted best first and ``survival`` has one row per pick.
+    Survivals are treated as independent, and a missing survivor counts as 0.
+    """
+
+    num_picks: int = survival.shape[0]
+    expected: numpy.ndarray = numpy.zeros((num_picks, count))
+    # none_before[:, m]: probability that exactly m better players survive.
+    none_before: numpy.ndarray = numpy.zeros((num_picks, count + 1))
+    none_before[:, 0] = 1.0
+    for i in range(ppg.size):
+        chance: numpy.ndarray = survival[:, i, numpy.newaxis]
+        expected += ppg[i] * chance * none_before[:, :count]
+        none_before[:, 1:] = (
+            none_before[:, 1:] * (1.0 - chance) + none_before[:, :-1] * chance
+        )
+        none_before[:, 0] *= 1.0 - survival[:, i]
+    return expected
+
+
+def recommend(
+    state: DraftState,
+    draft_slot: int,
+    rounds: int = 3,
+    top_k: Optional[int] = None,
+) -> List[Recommendation]:
+    """Rank the remaining players for my current pick by lookahead value.
+
+    Args:
+        state: The draft so far. Picks made at ``draft_slot``'s turns are
+            treated as my roster.
+        draft_slot: My 1-based position in the first round.
+        rounds: Number of my picks, starting with the current one, to plan for.
+        top_k: If given, only the best ``top_k`` recommendations are returned.
+    """
+
+    table = state.table
+    num_teams: int = settings.LEAGUE_SIZE
+    my_picks: numpy.ndarray = snake_order(draft_slot, num_teams, settings.DRAFT_ROUNDS)
+    my_pick_numbers: Set[int] = set(my_picks.tolist())
+    my_rows: List[int] = [
+        pick.row
+        for pick in state.history
+        if pick.number in my_pick_numbers and pick.row is not None
+    ]
+    picks: numpy.ndarray = my_picks[my_picks >= state.pick_number][:rounds]
+    if picks.size == 0:
+        return []
+    if picks[0] != state.pick_number:
+        # Recommending out of turn: plan from the current pick onwards.
+        picks = numpy.concatenate([[state.pick_number], picks[:-1]])
+
+    positions: List[str] = table.positions
+    limits: Tuple[int, ...] = tuple(
+        settings.POSITION_LIMITS.get(position, 0) for position in positions
+    )
+    starters: Tuple[int, ...] = tuple(
+        settings.ROSTER_SLOTS.get(position, 0) for position in positions
+    )
+    initial_counts: List[int] = [0] * len(positions)
+    for row in my_rows:
+        if table.position_codes[row] >= 0:
+            initial_counts[table.position_codes[row]] += 1
+
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    candidates: Dict[int, numpy.ndarray] = {}
+    for code in range(len(positions)):
+        rows: numpy.ndarray = numpy.flatnonzero(
+            state.available & (table.position_codes == code) & ~numpy.isnan(average_ppg)
+        )
+        candidates[code] = rows[numpy.argsort(-average_ppg[rows], kind="stable")][
+            :_CANDIDATES_PER_POSITION
+        ]
+
+    all_candidates: numpy.ndarray = numpy.concatenate(
+        [numpy.zeros(0, dtype=numpy.intp), *candidates.values()]
+    )
+    survival: numpy.ndarray = survival_probabilities(state, picks, all_candidates)
+    # Everyone available now is available for the current pick.
+    survival[0] = 1.0
+    expected: Dict[int, numpy.ndarray] = {}
+    survival_next: Dict[int, numpy.ndarray] = {}
+    start: int = 0
+    for code, rows in candidates.items():
+        position_survival: numpy.ndarray = survival[:, start : start + rows.size]
+        start += rows.size
+        survival_next[code] = position_survival[min(1, picks.size - 1)]
+        expected[code] = _expected_order_statistics(
+            average_ppg[rows], position_survival, max(1, limits[code])
+        )
+
+    def gain(step: int, code: int, counts: Tuple[int, ...]) -> float:
+        if counts[code] >= starters[code]:
+            return 0.0
+        taken: int = counts[code] - initial_counts[code]
+        return float(expected[code][step, taken])
+
+    @functools.lru_cache(maxsize=None)
+    def best_value(step: int, counts: Tuple[int, ...]) -> float:
+        if step == picks.size:
+            return 0.0
+        best: float = 0.0
+        for code in range(len(positions)):
+            if counts[code] >= limits[code] or not candidates[code].size:
+                continue
+            taken: int = counts[code] - initial_counts[code]
+            if taken >= min(candidates[code].size, expected[code].shape[1]):
+                continue
+            next_counts: Tuple[int, ...] = (
+                counts[:code] + (counts[code] + 1,) + counts[code + 1 :]
+            )
+            best = max(
+                best, gain(step, code, counts) + best_value(step + 1, next_counts)
+            )
+        return best
+
+    counts: Tuple[int, ...] = tuple(initial_counts)
+    recommendations: List[Recommendation] = []
+    for code, rows in candidates.items():
+        if counts[code] >= limits[code]:
+            continue
+        next_counts = counts[:code] + (counts[code] + 1,) + counts[code + 1 :]
+        future: float = best_value(1, next_counts)
+        starting: bool = counts[code] < starters[code]
+        for i, row in enumerate(rows):
+            ppg: float = float(average_ppg[row])
+            recommendations.append(
+                Recommendation(
+                    int(row),
+                    table.names[row],
+                    positions[code],
+                    ppg,
+                    float(survival_next[code][i]),
+                    (ppg if starting else 0.0) + future,
+                )
+            )
+
+    recommendations.sort(key=lambda r: (-r.value, -r.projected_ppg))
+    return recommendations if top_k is None else recommendations[:top_k]
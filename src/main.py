@@ -1,21 +1,36 @@
-"""Defines the main executable."""
+"""Defines the main executable.
 
+Each subcommand imports the heavy modules it needs (matplotlib, SciPy) itself,
+so text-only commands such as ``rank`` start without loading the plotting
+stack. Run without a subcommand to plot, as before.
+"""
+
+import argparse
 import collections
 import logging
-from typing import Any, Callable, Dict, List, Tuple
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-import matplotlib
 import numpy
-import scipy.optimize
 
-import charting
-import infra
-import settings
-from infra import Player
+from . import bootstrap
+from . import charting
+from . import draft
+from . import fitting
+from . import infra
+from . import instrumentation
+from . import models
+from . import settings
+from . import store
+from .infra import Player
+from .table import PlayerTable
 
 
 logger = logging.getLogger(__name__)
 
+# Axis labels of the draft order / projected PPG charts.
+AXES: Tuple[str, str] = ("Overall rank", "Projected points")
+
 
 def build_position_map(players: List[Player]) -> Dict[str, List[Player]]:
     position_map: Dict[str, List[Player]] = collections.defaultdict(list)
@@ -41,29 +56,16 @@ def rank_players_by_draft_value(
             its learned parameters.
     """
 
-    taken_players: List[Player] = []
+    state: draft.DraftState = draft.DraftState(PlayerTable.from_players(players))
     for name in taken_player_names:
-        match: Player = infra.Player(name).find_match(players)
-        if match:
-            taken_players.append(match)
-
-    remaining_players: List[Player] = [
-        player for player in players if player not in taken_players
-    ]
-
-    pairs: List[Tuple[Player, float]] = []
-    for player in remaining_players:
-        if player.position not in functions:
-            continue
-        func, params = functions[player.position]
-        value: float = calculate_draft_value(player, draft_position, func, params)
-        pairs.append((player, value))
-    pairs.sort(key=lambda pair: pair[1], reverse=True)
+        state.take(name)
 
     print("Ranking:")
     print("========")
-    for player, value in pairs:
-        print(f"{player} (draft value = {value})")
+    for ranked_player in state.rank(functions, draft_position):
+        print(
+            f"{players[ranked_player.row]} (draft value = {ranked_player.draft_value})"
+        )
 
 
 def calculate_draft_value(
@@ -99,138 +101,485 @@ def find_optimal_draft_position(
     def error(x_value: float) -> float:
         return func(x_value, *params) - target_ppg
 
+    import scipy.optimize
+
     try:
         return float(scipy.optimize.newton(error, guess))
     except (RuntimeError, OverflowError):
         return float("nan")
 
 
+def fitting_points(
+    point_set: charting.PointSet,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the (x, y) values of ``point_set`` that its curve is fitted to."""
+
+    return fitting.fitting_points(
+        point_set.name, point_set.x_values(), point_set.y_values()
+    )
+
+
 def fit_curve(
     point_set: charting.PointSet,
 ) -> Tuple[Callable[..., Any], Any]:
-    def func(
-        x_value: float,
-        coefficient1: float,
-        coefficient2: float,
-        x_intercept: float,
-        exponent: float,
-        y_intercept: float,
-    ) -> Any:
-        return (
-            coefficient1 / numpy.power(coefficient2 * (x_value + x_intercept), exponent)
-            + y_intercept
-        )
-
-    x_values: List[float] = point_set.x_values()
-    y_values: List[float] = point_set.y_values()
-
-    # Exclude outlier QB points that negatively impact curve fitting.
-    filtered_x_values: List[float] = [
-        x
-        for i, x in enumerate(x_values)
-        if point_set.name != "QB" or y_values[i] >= 200
-    ]
-    filtered_y_values: List[float] = [
-        y
-        for i, y in enumerate(y_values)
-        if point_set.name != "QB" or y >= 200
-    ]
+    result: fitting.CurveFit = fitting.fit_curve(
+        point_set.name, *fitting_points(point_set)
+    )
+    return fitting.power_model, result.params
 
-    try:
-        params, _ = scipy.optimize.curve_fit(
-            func,
-            filtered_x_values,
-            filtered_y_values,
-            maxfev=10000,
+
+def load_functions(table: PlayerTable) -> draft.Functions:
+    """Fit every position's curve, reusing cached fits, and log how each went.
+
+    Unless ``settings.CURVE_MODELS`` is just the power model, each position's
+    curve is the best of them by cross-validation.
+    """
+
+    if not models.power_only():
+        with instrumentation.timer("select curves"):
+            selections: Dict[str, models.Selection] = models.select_table(table)
+        for selection in selections.values():
+            log_selection(selection)
+        return models.selected_functions(selections)
+
+    with instrumentation.timer("fit curves"):
+        reports: Dict[str, fitting.FitReport] = fitting.fit_table(table)
+    for report in reports.values():
+        log_fit_report(report)
+    return fitting.fitted_functions(reports)
+
+
+def log_fit_report(report: fitting.FitReport) -> None:
+    instrumentation.count("fit evaluations", report.function_evaluations)
+    logger.debug(
+        "Fitting %s %s in %.3fs (%d evaluations, residual norm %.3f)",
+        report.name,
+        report.status,
+        report.wall_time,
+        report.function_evaluations,
+        report.residual_norm,
+    )
+    if report.params is None:
+        logger.warning(
+            "Skipping %s due to curve-fitting error: %s", report.name, report.message
         )
-    except RuntimeError as exc:
-        raise RuntimeError(f"curve fitting failed for {point_set.name}: {exc}") from exc
+    elif report.status == fitting.FELL_BACK:
+        logger.warning(
+            "Using the last good %s curve due to curve-fitting error: %s",
+            report.name,
+            report.message,
+        )
+
 
-    return func, params
+def log_selection(selection: models.Selection) -> None:
+    logger.debug(
+        "Selected the %s curve for %s%s (cross-validated errors %s, failed folds %s)",
+        selection.model,
+        selection.name,
+        " from the cache" if selection.cached else "",
+        selection.errors,
+        selection.fold_failures,
+    )
+    if selection.model is None:
+        logger.warning(
+            "Skipping %s: no candidate curve could be fitted: %s",
+            selection.name,
+            selection.message,
+        )
 
 
-def main() -> None:
-    logging.basicConfig(level=logging.DEBUG if settings.VERBOSE else logging.INFO)
+def load_table(
+    args: argparse.Namespace, kinds: Sequence[str] = infra.KINDS
+) -> PlayerTable:
+    """Load the players of the sources picked on the command line.
 
-    players: List[Player] = infra.load_players()
+    Players are read from the store instead of ``Data/`` when a past
+    ``--season`` is given.
+    """
 
-    plot_data: charting.ScatterPlotData = charting.ScatterPlotData()
-    for position in build_position_map(players).keys():
-        point_set: charting.PointSet = charting.PointSet(position)
-        plot_data.append(point_set)
+    season: Optional[int] = getattr(args, "season", None)
+    if season is not None:
+        return store.Season(season).table(args.sources)
+    return PlayerTable.from_players(
+        infra.load_players(kinds=kinds, sources=args.sources)
+    )
 
-    for player in players:
-        for source in player.rank_map:
-            if source in player.projected_ppg_map:
-                point: charting.Point = charting.Point(
-                    player.get_rank(source), player.get_projected_ppg(source)
+
+def archive(args: argparse.Namespace) -> None:
+    table: PlayerTable = load_table(args)
+    with instrumentation.timer("archive season"):
+        season_path: str = store.write_season(args.season_to_archive, table)
+    print(f"Stored {len(table)} players for {args.season_to_archive} in {season_path}")
+
+
+def consensus(args: argparse.Namespace) -> None:
+    # Only ranks are needed, so no projections are parsed.
+    table: PlayerTable = load_table(args, kinds=(infra.RANKINGS,))
+    consensus_rank, spread = draft.consensus_ranks(table)
+    rows: numpy.ndarray = numpy.argsort(consensus_rank, kind="stable")
+    if args.position:
+        rows = rows[table.position_mask(args.position)[rows]]
+
+    print("Consensus ranking:")
+    print("==================")
+    for row in rows[: args.top_k]:
+        print(
+            f"{consensus_rank[row]:6.1f} (+/- {spread[row]:4.1f}) "
+            f"{table.names[row]} ({table[row].position})"
+        )
+
+
+def rank(args: argparse.Namespace) -> None:
+    table: PlayerTable = load_table(args)
+    functions: draft.Functions = load_functions(table)
+
+    state: draft.DraftState = draft.DraftState(table)
+    for name in args.taken:
+        if state.take(name) is None:
+            logger.warning("No player matches %s; counting it as a pick", name)
+            state.skip(name)
+
+    with instrumentation.timer("rank"):
+        ranking: List[draft.RankedPlayer] = state.rank(functions, args.pick, args.top_k)
+
+    bands: Optional[bootstrap.Band] = None
+    if args.bands:
+        with instrumentation.timer("bootstrap curves"):
+            fits: Dict[str, bootstrap.BootstrapFit] = bootstrap.bootstrap_table(
+                table, args.resamples, seed=args.seed
+            )
+        for bootstrap_fit in fits.values():
+            instrumentation.count("fit evaluations", bootstrap_fit.function_evaluations)
+            if bootstrap_fit.failures:
+                logger.debug(
+                    "%d of the %s resamples failed to fit",
+                    bootstrap_fit.failures,
+                    bootstrap_fit.name,
                 )
-                plot_data.add_point(point, player.position)
+        bands = bootstrap.draft_value_bands(table, args.pick, fits)
+
+    print("Ranking:")
+    print("========")
+    for ranked_player in ranking:
+        band: str = ""
+        if bands is not None:
+            band = (
+                f", {settings.BOOTSTRAP_CONFIDENCE:.0%} band "
+                f"{bands.lower[ranked_player.row]:.2f} to "
+                f"{bands.upper[ranked_player.row]:.2f}"
+            )
+        print(
+            f"{table[ranked_player.row]} "
+            f"(draft value = {ranked_player.draft_value}{band})"
+        )
+
+
+def fit(args: argparse.Namespace) -> None:
+    candidates: Sequence[str] = args.models or settings.CURVE_MODELS
+    if not models.power_only(candidates):
+        select(args, candidates)
+        return
+
+    reports: Dict[str, fitting.FitReport]
+    if args.seasons:
+        with instrumentation.timer("fit curves"):
+            reports = fitting.fit_seasons(args.seasons, args.sources)
+    else:
+        table: PlayerTable = load_table(args)
+        with instrumentation.timer("fit curves"):
+            reports = fitting.fit_table(table)
+    for report in reports.values():
+        log_fit_report(report)
+        print(
+            f"{report.name}: {report.status} in {report.wall_time:.3f}s, "
+            f"{report.function_evaluations} evaluations, "
+            f"residual norm {report.residual_norm:.3f}, params {report.params}"
+        )
+
+
+def select(args: argparse.Namespace, candidates: Sequence[str]) -> None:
+    with instrumentation.timer("select curves"):
+        selections: Dict[str, models.Selection] = models.select_curves(
+            fitting.season_points(args.seasons, args.sources)
+            if args.seasons
+            else fitting.table_points(load_table(args)),
+            candidates,
+            args.folds,
+        )
+    for selection in selections.values():
+        log_selection(selection)
+        errors: str = ", ".join(
+            f"{model} {error:.2f}"
+            + (
+                f" ({selection.fold_failures[model]} folds failed)"
+                if selection.fold_failures.get(model)
+                else ""
+            )
+            for model, error in selection.errors.items()
+        )
+        print(
+            f"{selection.name}: {selection.model}"
+            f"{' (cached)' if selection.cached else ''}, "
+            f"cross-validated errors {errors}, params {selection.params}"
+        )
+
+
+def simulate(args: argparse.Namespace) -> None:
+    from . import simulation
+
+    table: PlayerTable = load_table(args)
+    functions: draft.Functions = load_functions(table)
+    with instrumentation.timer("simulate drafts"):
+        results: Dict[str, simulation.SimulationResult] = simulation.simulate_drafts(
+            table, functions, args.draft_slot, args.simulations, seed=args.seed
+        )
+    for result in results.values():
+        print(
+            f"{result.strategy}: mean {result.mean_roster_ppg:.1f} "
+            f"(std {result.std_roster_ppg:.1f}), percentiles {result.percentiles}"
+        )
+
+
+def watch(args: argparse.Namespace) -> None:
+    from . import incremental
 
-    functions: Dict[str, Callable[..., Any]] = {}
-    parameters: Dict[str, Any] = {}
+    loader: incremental.IncrementalLoader = incremental.IncrementalLoader(
+        sources=args.sources
+    )
+    loader.refresh()
+    load_functions(PlayerTable.from_players(loader.players))
+    logger.info("Watching %d source files", len(infra.list_jobs(sources=args.sources)))
+
+    def on_change(result: incremental.ReloadResult) -> None:
+        for source, kind, path in result.changed_files:
+            logger.info("%s %s changed: %s", source, kind, path)
+        table: PlayerTable = PlayerTable.from_players(loader.players)
+        if not models.power_only():
+            with instrumentation.timer("select curves"):
+                selections: Dict[str, models.Selection] = models.select_table(
+                    table, positions=result.changed_positions
+                )
+            for selection in selections.values():
+                log_selection(selection)
+                print(
+                    f"Refitted {selection.name}: {selection.model}"
+                    f"{' (cached)' if selection.cached else ''}, "
+                    f"params {selection.params}"
+                )
+            return
 
-    for point_set in plot_data:
-        try:
-            func, params = fit_curve(point_set)
-        except RuntimeError as exc:
-            logger.warning(
-                "Skipping %s due to curve-fitting error: %s", point_set.name, exc
+        with instrumentation.timer("fit curves"):
+            reports: Dict[str, fitting.FitReport] = fitting.fit_table(
+                table, positions=result.changed_positions
             )
+        for report in reports.values():
+            log_fit_report(report)
+            print(f"Refitted {report.name}: {report.status}, params {report.params}")
+
+    try:
+        loader.watch(on_change, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def position_charts(
+    table: PlayerTable, functions: draft.Functions, source: Optional[str] = None
+) -> charting.ScatterPlotData:
+    """Return one point set per position, each with its fitted curve if any."""
+
+    plot_data: charting.ScatterPlotData = charting.ScatterPlotData()
+    for position in table.positions:
+        x_values, y_values = table.points(position, source)
+        if not x_values.size:
             continue
+        point_set: charting.PointSet = charting.PointSet(
+            position, curve=functions.get(position)
+        )
+        point_set.extend_from_arrays(x_values, y_values)
+        plot_data.append(point_set)
+    return plot_data
 
-        functions[point_set.name] = func
-        parameters[point_set.name] = params
-
-        def additional_charting_behavior(
-            ps: charting.PointSet,
-            x_min: float,
-            x_max: float,
-            x_range: float,
-            x_step: float,
-            y_min: float,
-            y_max: float,
-            y_range: float,
-            color: str,
-        ) -> None:
-            if ps.name not in functions:
-                return
-
-            func: Callable[..., Any] = functions[ps.name]
-            params: Any = parameters[ps.name]
-            lsrl_x_values: numpy.ndarray = numpy.arange(
-                x_min - x_range * 0.2, x_max + x_range * 0.2 + x_step / 2.0, x_step
+
+def plot(args: argparse.Namespace) -> None:
+    table: PlayerTable = load_table(args)
+    plot_data: charting.ScatterPlotData = position_charts(table, load_functions(table))
+
+    with instrumentation.timer("plot"):
+        charting.plot(
+            plot_data, chart_title="Position-Specific PPG/Draft Order Trade Off Curves"
+        )
+
+
+def charts(args: argparse.Namespace) -> None:
+    table: PlayerTable = load_table(args)
+    functions: draft.Functions = load_functions(table)
+
+    specs: List[charting.ChartSpec] = []
+    for source in [None] + table.sources:
+        all_positions: charting.ScatterPlotData = position_charts(
+            table, functions, source
+        )
+        suffix: str = f" ({source})" if source else ""
+        if all_positions:
+            specs.append(
+                charting.ChartSpec(all_positions, f"All Positions{suffix}", *AXES)
             )
-            lsrl_y_values: List[Any] = [
-                func(x_value, *params) for x_value in lsrl_x_values
-            ]
-
-            logger.debug("%s", ps.name)
-            logger.debug("%s", lsrl_x_values)
-            logger.debug("%s", lsrl_y_values)
-            logger.debug("")
-
-            # Removing points outside first quadrant
-            filtered_lsrl_x_values: List[float] = [
-                x
-                for i, x in enumerate(lsrl_x_values)
-                if x >= 0 and lsrl_y_values[i] >= 0 and lsrl_y_values[i] < 1000.0
-            ]
-            filtered_lsrl_y_values: List[float] = [
-                y
-                for i, y in enumerate(lsrl_y_values)
-                if lsrl_x_values[i] >= 0 and y >= 0 and y < 1000.0
-            ]
-
-            matplotlib.pyplot.plot(
-                filtered_lsrl_x_values, filtered_lsrl_y_values, "--", c=color
+        specs.extend(
+            charting.ChartSpec(
+                charting.ScatterPlotData([point_set]),
+                f"{point_set.name}{suffix}",
+                *AXES,
             )
+            for point_set in all_positions
+        )
+
+    with instrumentation.timer("render charts"):
+        written: List[List[str]] = charting.render_batch(
+            specs, args.output_dir, args.formats or charting.DEFAULT_FORMATS
+        )
+    for file_paths in written:
+        for file_path in file_paths:
+            print(file_path)
+
 
-        point_set.additional_charting_behavior = additional_charting_behavior
+def positive_int(value: str) -> int:
+    """Parse a command-line integer that must be at least 1."""
 
-    charting.plot(
-        plot_data, chart_title="Position-Specific PPG/Draft Order Trade Off Curves"
+    number: int = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fantasy football draft insights.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-stage timers and counters to stderr when done",
+    )
+    parser.add_argument("--trace", help="write a Chrome trace of the run to this file")
+    parser.add_argument(
+        "--source",
+        action="append",
+        dest="sources",
+        choices=infra.source_names(),
+        help="only read this data source; repeat for more (all by default)",
     )
+    subparsers = parser.add_subparsers(dest="command")
+
+    consensus_parser = subparsers.add_parser(
+        "consensus", help="list players by consensus rank, without projections"
+    )
+    consensus_parser.add_argument("--position", help="only list this position")
+    consensus_parser.add_argument("--top-k", type=int, help="only list the best")
+    consensus_parser.set_defaults(handler=consensus)
+
+    rank_parser = subparsers.add_parser("rank", help="rank players by draft value")
+    rank_parser.add_argument("--pick", type=int, default=1, help="overall pick")
+    rank_parser.add_argument(
+        "--taken", nargs="*", default=[], help="names of players already drafted"
+    )
+    rank_parser.add_argument("--top-k", type=int, help="only show the best players")
+    rank_parser.add_argument(
+        "--season", type=int, help="rank a stored season instead of Data/"
+    )
+    rank_parser.add_argument(
+        "--bands",
+        action="store_true",
+        help="bootstrap the curves and show each draft value's confidence band",
+    )
+    rank_parser.add_argument(
+        "--resamples",
+        type=int,
+        help=f"resamples per curve ({settings.BOOTSTRAP_RESAMPLES} by default)",
+    )
+    rank_parser.add_argument("--seed", type=int)
+    rank_parser.set_defaults(handler=rank)
+
+    fit_parser = subparsers.add_parser("fit", help="fit and report position curves")
+    fit_parser.add_argument(
+        "--seasons",
+        type=int,
+        nargs="+",
+        help="fit to these stored seasons' points instead of Data/",
+    )
+    fit_parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=models.model_names(),
+        help="candidate curve families to choose between by cross-validation "
+        f"({', '.join(settings.CURVE_MODELS)} by default)",
+    )
+    fit_parser.add_argument(
+        "--folds",
+        type=int,
+        help=f"cross-validation folds ({settings.CV_FOLDS} by default)",
+    )
+    fit_parser.set_defaults(handler=fit)
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="store the players in Data/ as one season"
+    )
+    archive_parser.add_argument(
+        "--season",
+        type=int,
+        dest="season_to_archive",
+        default=settings.SEASON,
+        help=f"season the files are for ({settings.SEASON} by default)",
+    )
+    archive_parser.set_defaults(handler=archive)
+
+    plot_parser = subparsers.add_parser("plot", help="plot the fitted curves")
+    plot_parser.set_defaults(handler=plot)
+
+    simulate_parser = subparsers.add_parser(
+        "simulate", help="compare draft strategies by simulation"
+    )
+    simulate_parser.add_argument(
+        "--draft-slot", type=int, required=True, help="my slot in the first round"
+    )
+    simulate_parser.add_argument("--simulations", type=positive_int, default=10000)
+    simulate_parser.add_argument("--seed", type=int)
+    simulate_parser.set_defaults(handler=simulate)
+
+    charts_parser = subparsers.add_parser(
+        "charts", help="render every position and source's chart to files"
+    )
+    charts_parser.add_argument("--output-dir", default="charts")
+    charts_parser.add_argument(
+        "--format",
+        action="append",
+        dest="formats",
+        choices=("png", "svg", "pdf"),
+        help="file format to write; repeat for more (png by default)",
+    )
+    charts_parser.set_defaults(handler=charts)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="refit the curves whose players change in the source files"
+    )
+    watch_parser.add_argument(
+        "--interval", type=float, default=1.0, help="seconds between checks"
+    )
+    watch_parser.set_defaults(handler=watch)
+
+    parser.set_defaults(handler=plot)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.DEBUG if settings.VERBOSE else logging.INFO)
+
+    args: argparse.Namespace = build_parser().parse_args(argv)
+    if args.profile or args.trace:
+        instrumentation.enable()
+    args.handler(args)
+
+    if args.profile:
+        print(instrumentation.summary(), file=sys.stderr)
+    if args.trace:
+        instrumentation.write_chrome_trace(args.trace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,630 @@
+"""Defines the candidate curve families and cross-validated selection among them.
+
+Every family is a ``CurveModel`` registered by name. Its curve function is
+vectorized over x like ``fitting.power_model``, so the ``(func, params)``
+pairs that ``selected_functions`` returns work anywhere a fitted power curve
+does. Besides the power model, there are three families that fit in closed
+form or with a little linear algebra:
+
+* ``exponential``: ``a * exp(-b * x) + c``. For a fixed decay rate, ``a`` and
+  ``c`` are a linear least-squares fit, so every rate on a grid is scored at
+  once.
+* ``piecewise_linear``: a continuous line with knots at the quartiles of x,
+  fitted by one least-squares solve.
+* ``isotonic``: the best non-increasing fit, by pool-adjacent-violators,
+  interpolated linearly between the points.
+
+Each position's candidates are scored by k-fold cross-validation. All
+(position, model) full-data fits run in one batch on a process pool, then all
+(position, model, fold) fits run in a second batch. Fold fits see nothing but
+their training points: the power model starts from a guess computed from
+them (falling back to a cold start) rather than from a fit that included the
+held-out points, so no family gets a head start. A candidate's error is its
+mean squared error over the held-out points of the folds it could be fitted
+to; folds it could not are counted separately, and only a candidate that
+failed every fold scores inf. The position's curve is the candidate with the
+lowest error, and this choice is cached, keyed by the points, the candidates
+and the folds.
+"""
+
+import concurrent.futures
+import functools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+import numpy
+
+from . import cache
+from . import fitting
+from . import settings
+from .table import PlayerTable
+
+# Bump whenever cross-validation or the selection rule changes.
+SELECTION_VERSION: int = 3
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+class CurveModel:
+    """A family of draft position/PPG trade-off curves.
+
+    Subclasses set ``name`` and ``func`` and implement ``fit``, and
+    ``fit_independently`` if ``fit`` draws on anything but the given points.
+    Bump ``version`` whenever the fit changes, so cached selections are redone.
+    """
+
+    name: str = ""
+    version: str = "v1"
+    # func(x_value, *params), vectorized over x_value.
+    func: Callable[..., Any]
+
+    def fit(
+        self,
+        name: str,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        """Return the parameters of the curve fitted to position ``name``'s points.
+
+        Models that fit iteratively may reuse what they fitted to ``name``
+        before.
+
+        Raises:
+            RuntimeError: If no curve of this family can be fitted.
+        """
+
+        raise NotImplementedError
+
+    def fit_independently(
+        self,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        """Like ``fit``, but depending on nothing except the given points.
+
+        Used for cross-validation folds, whose held-out points must not leak
+        into the fit through a cache or an earlier fit.
+        """
+
+        return self.fit("", x_values, y_values, timeout)
+
+
+_MODEL_CLASSES: Dict[str, Type[CurveModel]] = {}
+
+
+def register_model(model_class: Type[CurveModel]) -> Type[CurveModel]:
+    """Class decorator that makes a curve family available under its ``name``."""
+
+    if (
+        model_class.name in _MODEL_CLASSES
+        and _MODEL_CLASSES[model_class.name] is not model_class
+    ):
+        raise ValueError(
+            f"A different model is already registered as {model_class.name}"
+        )
+    _MODEL_CLASSES[model_class.name] = model_class
+    return model_class
+
+
+def model_names() -> List[str]:
+    return list(_MODEL_CLASSES)
+
+
+def power_only(candidates: Optional[Sequence[str]] = None) -> bool:
+    """Whether ``candidates`` (``settings.CURVE_MODELS`` by default) is just power.
+
+    Only then are curves fitted by ``fitting`` directly, with its fit reports;
+    any other candidates go through ``select_curves``.
+    """
+
+    return list(settings.CURVE_MODELS if candidates is None else candidates) == [
+        PowerModel.name
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def get_model(name: str) -> CurveModel:
+    """Return the one instance of the model registered as ``name``."""
+
+    try:
+        return _MODEL_CLASSES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown model {name!r}; expected one of {', '.join(_MODEL_CLASSES)}"
+        ) from None
+
+
+@register_model
+class PowerModel(CurveModel):
+    name = "power"
+    version = fitting.MODEL_NAME
+    func = staticmethod(fitting.power_model)
+
+    def fit(
+        self,
+        name: str,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        # Cached, warm-started and falling back like every other power fit.
+        report: fitting.FitReport = fitting.fit_position(
+            name, x_values, y_values, timeout
+        )
+        if report.params is None:
+            raise RuntimeError(report.message)
+        return report.params
+
+    def fit_independently(
+        self,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        # Started from the points alone, falling back to a cold start as
+        # fit_position falls back from its warm start.
+        try:
+            result, _ = fitting.refit(
+                x_values,
+                y_values,
+                fitting.initial_guess(x_values, y_values),
+                timeout,
+                fitting.REFIT_TOLERANCE,
+                fitting.REFIT_MAX_FUNCTION_EVALUATIONS,
+            )
+        except RuntimeError:
+            result, _ = fitting.refit(
+                x_values,
+                y_values,
+                numpy.ones(fitting.NUM_PARAMS),
+                timeout,
+                fitting.REFIT_TOLERANCE,
+                fitting.REFIT_MAX_FUNCTION_EVALUATIONS,
+            )
+        return result.params
+
+
+def exponential_model(x_value: Any, scale: float, rate: float, offset: float) -> Any:
+    return scale * numpy.exp(-rate * x_value) + offset
+
+
+@register_model
+class ExponentialModel(CurveModel):
+    name = "exponential"
+    func = staticmethod(exponential_model)
+    # Decay rates tried, relative to the range of x: from almost linear over
+    # the range to dropping off within its first percent.
+    _RELATIVE_RATES: numpy.ndarray = numpy.logspace(-3.0, 2.0, 256)
+
+    def fit(
+        self,
+        name: str,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        x_range: float = float(numpy.ptp(x_values)) if x_values.size else 0.0
+        if x_values.size < 3 or x_range == 0.0:
+            raise RuntimeError("an exponential curve needs three points over a range")
+        rates: numpy.ndarray = self._RELATIVE_RATES / x_range
+        params: numpy.ndarray = _best_exponential(x_values, y_values, rates)
+        # Refine between the grid neighbours of the best rate.
+        step: float = float(self._RELATIVE_RATES[1] / self._RELATIVE_RATES[0])
+        return _best_exponential(
+            x_values,
+            y_values,
+            numpy.geomspace(params[1] / step, params[1] * step, 64),
+        )
+
+
+def _best_exponential(
+    x_values: numpy.ndarray, y_values: numpy.ndarray, rates: numpy.ndarray
+) -> numpy.ndarray:
+    """Return the least-squares (scale, rate, offset), trying every rate at once."""
+
+    # (rates, points) basis values, centred so that scale solves in one step.
+    basis: numpy.ndarray = numpy.exp(-rates[:, numpy.newaxis] * x_values)
+    basis_mean: numpy.ndarray = basis.mean(axis=1)
+    centred: numpy.ndarray = basis - basis_mean[:, numpy.newaxis]
+    y_mean: float = float(y_values.mean())
+    covariance: numpy.ndarray = centred @ (y_values - y_mean)
+    variance: numpy.ndarray = numpy.einsum("ij,ij->i", centred, centred)
+    with numpy.errstate(all="ignore"):
+        # The residual sum of squares, up to a constant.
+        score: numpy.ndarray = numpy.where(
+            variance > 0, -(covariance**2) / variance, numpy.inf
+        )
+    best: int = int(numpy.argmin(score))
+    if not numpy.isfinite(score[best]):
+        raise RuntimeError("no exponential curve fits these points")
+    scale: float = float(covariance[best] / variance[best])
+    return numpy.array(
+        [scale, rates[best], y_mean - scale * basis_mean[best]], dtype=numpy.float64
+    )
+
+
+def piecewise_linear_model(x_value: Any, *params: float) -> Any:
+    """Evaluate a continuous piecewise linear curve.
+
+    ``params`` are the knots, then the intercept and slope of the first
+    segment, then the change in slope at each knot.
+    """
+
+    num_knots: int = (len(params) - 2) // 2
+    knots: numpy.ndarray = numpy.asarray(params[:num_knots])
+    intercept, slope = params[num_knots : num_knots + 2]
+    changes: numpy.ndarray = numpy.asarray(params[num_knots + 2 :])
+    x_array: numpy.ndarray = numpy.asarray(x_value, dtype=numpy.float64)
+    return (
+        intercept
+        + slope * x_array
+        + numpy.sum(
+            changes * numpy.maximum(0.0, x_array[..., numpy.newaxis] - knots), axis=-1
+        )
+    )
+
+
+@register_model
+class PiecewiseLinearModel(CurveModel):
+    name = "piecewise_linear"
+    func = staticmethod(piecewise_linear_model)
+    _SEGMENTS: int = 4
+
+    def fit(
+        self,
+        name: str,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        if numpy.unique(x_values).size < 2:
+            raise RuntimeError("a line needs two distinct x values")
+        knots: numpy.ndarray = numpy.unique(
+            numpy.quantile(x_values, numpy.arange(1, self._SEGMENTS) / self._SEGMENTS)
+        )
+        # Knots at the edges add nothing, and each segment needs a point.
+        knots = knots[(knots > x_values.min()) & (knots < x_values.max())]
+        knots = knots[: max(0, x_values.size - 2)]
+        design: numpy.ndarray = numpy.column_stack(
+            [numpy.ones(x_values.size), x_values]
+            + [numpy.maximum(0.0, x_values - knot) for knot in knots]
+        )
+        coefficients: numpy.ndarray = numpy.linalg.lstsq(design, y_values, rcond=None)[
+            0
+        ]
+        return numpy.concatenate([knots, coefficients])
+
+
+def isotonic_model(x_value: Any, *params: float) -> Any:
+    """Interpolate linearly between the fitted points, flat beyond them.
+
+    ``params`` are the distinct x values, then the fitted value at each.
+    """
+
+    num_points: int = len(params) // 2
+    return numpy.interp(x_value, params[:num_points], params[num_points:])
+
+
+@register_model
+class IsotonicModel(CurveModel):
+    """The non-increasing curve closest to the points; PPG never rises with rank."""
+
+    name = "isotonic"
+    func = staticmethod(isotonic_model)
+
+    def fit(
+        self,
+        name: str,
+        x_values: numpy.ndarray,
+        y_values: numpy.ndarray,
+        timeout: Optional[float] = None,
+    ) -> numpy.ndarray:
+        if not x_values.size:
+            raise RuntimeError("no points to fit")
+        distinct_x, inverse, counts = numpy.unique(
+            x_values, return_inverse=True, return_counts=True
+        )
+        means: numpy.ndarray = numpy.bincount(inverse, y_values) / counts
+        return numpy.concatenate(
+            [distinct_x, _pool_adjacent_violators(means, counts.astype(float))]
+        )
+
+
+def _pool_adjacent_violators(
+    values: numpy.ndarray, weights: numpy.ndarray
+) -> numpy.ndarray:
+    """Return the weighted least-squares non-increasing fit to ``values``."""
+
+    block_values: List[float] = []
+    block_weights: List[float] = []
+    block_sizes: List[int] = []
+    for value, weight in zip(values.tolist(), weights.tolist()):
+        block_values.append(value)
+        block_weights.append(weight)
+        block_sizes.append(1)
+        # Merge backwards while the last block rises above the one before it.
+        while len(block_values) > 1 and block_values[-2] < block_values[-1]:
+            weight = block_weights[-2] + block_weights[-1]
+            block_values[-2] = (
+                block_values[-2] * block_weights[-2]
+                + block_values[-1] * block_weights[-1]
+            ) / weight
+            block_weights[-2] = weight
+            block_sizes[-2] += block_sizes[-1]
+            del block_values[-1], block_weights[-1], block_sizes[-1]
+    return numpy.repeat(block_values, block_sizes)
+
+
+class Selection(NamedTuple):
+    name: str
+    # The chosen model, or None if no candidate could be fitted.
+    model: Optional[str]
+    params: Optional[numpy.ndarray]
+    # Held-out mean squared error of every candidate over the folds it could
+    # be fitted to, inf for those that could not be fitted to any. Empty when
+    # there was only one candidate to choose from.
+    errors: Dict[str, float]
+    # Folds of every candidate that could not be fitted or predicted NaN.
+    fold_failures: Dict[str, int]
+    cached: bool = False
+    message: str = ""
+
+
+class _FitJob(NamedTuple):
+    name: str
+    model: str
+    x_values: numpy.ndarray
+    y_values: numpy.ndarray
+    timeout: Optional[float]
+
+
+class _FoldJob(NamedTuple):
+    name: str
+    model: str
+    train: Tuple[numpy.ndarray, numpy.ndarray]
+    test: Tuple[numpy.ndarray, numpy.ndarray]
+    timeout: Optional[float]
+
+
+def _fit_job(job: _FitJob) -> Tuple[Optional[numpy.ndarray], str]:
+    try:
+        return (
+            get_model(job.model).fit(
+                job.name, job.x_values, job.y_values, timeout=job.timeout
+            ),
+            "",
+        )
+    except (RuntimeError, fitting.FitTimeoutError, ValueError, TypeError) as exc:
+        return None, f"{job.model}: {exc}"
+
+
+def _fold_job(job: _FoldJob) -> Optional[float]:
+    """Return the squared error summed over the fold's held-out points.
+
+    Returns None if the model could not be fitted to the training set (SciPy
+    raises ``TypeError`` when there are fewer points than parameters) or its
+    curve is not finite at every held-out point.
+    """
+
+    model: CurveModel = get_model(job.model)
+    try:
+        params: numpy.ndarray = model.fit_independently(*job.train, job.timeout)
+    except (RuntimeError, fitting.FitTimeoutError, ValueError, TypeError):
+        return None
+    x_test, y_test = job.test
+    with numpy.errstate(all="ignore"):
+        error: float = float(numpy.sum((model.func(x_test, *params) - y_test) ** 2))
+    return error if numpy.isfinite(error) else None
+
+
+def _run(func: Callable[[_T], _R], jobs: List[_T], num_workers: int) -> List[_R]:
+    if num_workers > 1 and len(jobs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(jobs))
+        ) as executor:
+            return list(executor.map(func, jobs))
+    return [func(job) for job in jobs]
+
+
+def fold_indices(size: int, folds: int, seed: int = 0) -> List[numpy.ndarray]:
+    """Split ``range(size)`` into ``folds`` shuffled held-out sets.
+
+    There are never more folds than points.
+    """
+
+    order: numpy.ndarray = numpy.random.default_rng(seed).permutation(size)
+    return numpy.array_split(order, max(1, min(folds, size)))
+
+
+def _selection_key(
+    candidates: Sequence[str],
+    folds: int,
+    seed: int,
+    x_values: numpy.ndarray,
+    y_values: numpy.ndarray,
+) -> str:
+    return cache.digest(
+        SELECTION_VERSION,
+        [(name, get_model(name).version) for name in candidates],
+        folds,
+        seed,
+        x_values.tobytes(),
+        y_values.tobytes(),
+    )
+
+
+def select_curves(
+    points: Dict[str, Tuple[Sequence[float], Sequence[float]]],
+    models: Optional[Sequence[str]] = None,
+    folds: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    timeout: fitting.Timeout = fitting.DEFAULT_TIMEOUT,
+    seed: int = 0,
+) -> Dict[str, Selection]:
+    """Pick and fit the best candidate curve of every position.
+
+    Args:
+        points: Mapping from position to its (x, y) points.
+        models: Names of the candidate models; ``settings.CURVE_MODELS`` by
+            default. With a single candidate, it is fitted without
+            cross-validation.
+        folds: Number of cross-validation folds; ``settings.CV_FOLDS`` by
+            default. Positions with fewer points use one fold per point.
+        num_workers: Size of the process pool; ``settings.NUM_WORKERS`` by
+            default.
+        timeout: Per-fit time limit in seconds; ``settings.FIT_TIMEOUT`` by
+            default, and no limit if None.
+        seed: Seed of the shuffle that splits points into folds.
+
+    Returns:
+        A ``Selection`` for each position, in the order of ``points``.
+    """
+
+    candidates: List[str] = list(settings.CURVE_MODELS if models is None else models)
+    for model in candidates:
+        get_model(model)
+    if folds is None:
+        folds = settings.CV_FOLDS
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+    limit: Optional[float] = fitting.resolve_timeout(timeout)
+
+    arrays: Dict[str, Tuple[numpy.ndarray, numpy.ndarray]] = {
+        name: (
+            numpy.asarray(x_values, dtype=numpy.float64),
+            numpy.asarray(y_values, dtype=numpy.float64),
+        )
+        for name, (x_values, y_values) in points.items()
+    }
+    cross_validate: bool = len(candidates) > 1
+    selections: Dict[str, Selection] = {}
+    keys: Dict[str, str] = {}
+    for name, (x_values, y_values) in arrays.items():
+        if not cross_validate:
+            continue
+        keys[name] = _selection_key(candidates, folds, seed, x_values, y_values)
+        cached: Optional[Tuple[Any, ...]] = cache.load("model-selection", keys[name])
+        if cached is not None:
+            selections[name] = Selection(*cached)._replace(cached=True)
+    misses: List[str] = [name for name in arrays if name not in selections]
+
+    fit_jobs: List[_FitJob] = [
+        _FitJob(name, model, *arrays[name], limit)
+        for name in misses
+        for model in candidates
+    ]
+    full_fits: Dict[Tuple[str, str], Tuple[Optional[numpy.ndarray], str]] = {
+        (job.name, job.model): result
+        for job, result in zip(fit_jobs, _run(_fit_job, fit_jobs, num_workers))
+    }
+
+    fold_jobs: List[_FoldJob] = []
+    if cross_validate:
+        for name in misses:
+            x_values, y_values = arrays[name]
+            for test in fold_indices(x_values.size, folds, seed):
+                train: numpy.ndarray = numpy.ones(x_values.size, dtype=bool)
+                train[test] = False
+                for model in candidates:
+                    if full_fits[name, model][0] is not None and train.any():
+                        fold_jobs.append(
+                            _FoldJob(
+                                name,
+                                model,
+                                (x_values[train], y_values[train]),
+                                (x_values[test], y_values[test]),
+                                limit,
+                            )
+                        )
+    # Squared error and held-out points summed over the folds that fitted.
+    squared_errors: Dict[Tuple[str, str], Tuple[float, int]] = {}
+    fold_failures: Dict[Tuple[str, str], int] = {}
+    for job, error in zip(fold_jobs, _run(_fold_job, fold_jobs, num_workers)):
+        key: Tuple[str, str] = (job.name, job.model)
+        if error is None:
+            fold_failures[key] = fold_failures.get(key, 0) + 1
+            continue
+        total, count = squared_errors.get(key, (0.0, 0))
+        squared_errors[key] = (total + error, count + job.test[0].size)
+
+    for name in misses:
+        errors: Dict[str, float] = {}
+        failures: Dict[str, int] = {}
+        if cross_validate:
+            errors = {
+                model: squared_errors[name, model][0] / squared_errors[name, model][1]
+                if (name, model) in squared_errors
+                else numpy.inf
+                for model in candidates
+            }
+            failures = {
+                model: fold_failures.get((name, model), 0) for model in candidates
+            }
+        fitted: List[str] = [
+            model for model in candidates if full_fits[name, model][0] is not None
+        ]
+        best: Optional[str] = (
+            min(fitted, key=lambda model: errors.get(model, 0.0)) if fitted else None
+        )
+        selections[name] = Selection(
+            name,
+            best,
+            None if best is None else full_fits[name, best][0],
+            errors,
+            failures,
+            message="; ".join(
+                full_fits[name, model][1] for model in candidates if model not in fitted
+            ),
+        )
+        if name in keys:
+            cache.store("model-selection", keys[name], tuple(selections[name]))
+    return {name: selections[name] for name in points}
+
+
+def select_table(
+    table: PlayerTable,
+    models: Optional[Sequence[str]] = None,
+    folds: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    timeout: fitting.Timeout = fitting.DEFAULT_TIMEOUT,
+    positions: Optional[Iterable[str]] = None,
+) -> Dict[str, Selection]:
+    """Select the curve of every position in ``table``; see ``select_curves``.
+
+    If ``positions`` is given, only those of them that are in ``table`` are
+    selected.
+    """
+
+    return select_curves(
+        fitting.table_points(table, positions),
+        models,
+        folds,
+        num_workers,
+        timeout,
+    )
+
+
+def selected_functions(
+    selections: Dict[str, Selection],
+) -> Dict[str, Tuple[Callable[..., Any], Any]]:
+    """Return the curve function and parameters of every position that has them."""
+
+    return {
+        name: (get_model(selection.model).func, selection.params)
+        for name, selection in selections.items()
+        if selection.model is not None
+    }
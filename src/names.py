@@ -0,0 +1,73 @@
+"""Defines the canonicalization of player names used by every matching path.
+
+All patterns are compiled once at import time and results are memoized, since
+the same few thousand names are canonicalized over and over while merging
+sources and resolving drafted players.
+"""
+
+import functools
+import re
+import unicodedata
+from typing import NamedTuple
+
+from . import settings
+
+_CACHE_SIZE: int = 1 << 14
+
+# Removed in this order, as each removal can expose the next: a generational
+# suffix at the end of the name, D/ST markers, then team names wherever they
+# are followed by a space (e.g. "Chicago Bears D/ST").
+_SUFFIX_PATTERN: re.Pattern = re.compile(r" (?:Jr\.|Sr\.|II|III)$")
+_TEAM_NAME_PATTERN: re.Pattern = re.compile(
+    "(?:"
+    + "|".join(
+        re.escape(team_name)
+        for team_name in sorted(settings.TEAM_NAMES, key=len, reverse=True)
+    )
+    + ") "
+)
+_MOJIBAKE_TABLE = str.maketrans({"Â": None, "Ã": None})
+_SLUG_DROP_PATTERN: re.Pattern = re.compile(r"[^a-z0-9]+")
+
+
+class NameKeys(NamedTuple):
+    """Keys a name is matched by: the name, its simplified form and its slug."""
+
+    raw: str
+    simplified: str
+    slug: str
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def sanitize(text: str) -> str:
+    """Remove stray Unicode characters and normalize ``text`` to ASCII."""
+
+    if text.isascii():
+        return text
+    normalized: str = unicodedata.normalize("NFKD", text.translate(_MOJIBAKE_TABLE))
+    return normalized.replace("\u00a0", " ").encode("ascii", "ignore").decode()
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def simplify(name: str) -> str:
+    """Strip suffixes, D/ST markers and team names that vary between sources."""
+
+    name = _SUFFIX_PATTERN.sub("", name).replace(" D/ST", "")
+    return _TEAM_NAME_PATTERN.sub("", name)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def slug(name: str) -> str:
+    """Return the simplified name's letters and digits in lowercase.
+
+    For example, "Le'Veon Bell" becomes "leveonbell".
+
+    Slugs ignore case, spacing and punctuation, so they also match names that
+    were rebuilt from a URL (like CBS's), which lose all three.
+    """
+
+    return _SLUG_DROP_PATTERN.sub("", sanitize(simplify(name)).lower())
+
+
+def keys(name: str) -> NameKeys:
+    return NameKeys(name, simplify(name), slug(name))
@@ -0,0 +1,448 @@
+"""Defines pluggable HTML backends that extract the rows of a single table.
+
+Every backend yields the same backend-neutral ``Row`` objects, so the player
+row parsers in ``infra`` never depend on how a page was parsed. Pages that lay
+players out as repeated blocks (e.g. ``<div class="player-row">``) rather than
+as a table are read the same way, with one ``Row`` per block:
+
+- ``"stream"`` locates the target table's start tag with a regular expression
+  and runs an event-based parser over that table only, stopping as soon as it
+  closes. Blocks are located the same way, and their ends are found by
+  counting nested start and end tags, so only the blocks themselves are
+  tokenized. Nothing outside the target is ever tokenized or built into a tree.
+- Any BeautifulSoup tree builder name (``"html5lib"``, ``"lxml"``,
+  ``"html.parser"``) builds the full document and walks it, which is slower
+  but tolerant of arbitrarily broken markup.
+"""
+
+import html.parser
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+STREAM_BACKEND: str = "stream"
+
+_TABLE_START_PATTERN: re.Pattern = re.compile(r"<table\b[^>]*>", re.IGNORECASE)
+_CLASS_ATTR_PATTERN: re.Pattern = re.compile(
+    r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+_FEED_CHUNK_SIZE: int = 1 << 16
+
+# Elements that never have an end tag, so they are never left open.
+_VOID_ELEMENTS: frozenset = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+_CELL_TAGS: frozenset = frozenset({"td", "th"})
+_RAW_TEXT_TAGS: frozenset = frozenset({"script", "style"})
+
+
+class TableNotFoundError(LookupError):
+    pass
+
+
+class TableSpec(NamedTuple):
+    """Identifies the ``index``-th ``<table>`` whose class matches ``class_``.
+
+    Class matching follows BeautifulSoup: either one of the element's classes
+    equals ``class_`` or its whole ``class`` attribute does.
+    """
+
+    class_: str
+    index: int = 0
+
+
+class BlockSpec(NamedTuple):
+    """Identifies every ``<tag>`` element whose class matches ``class_``.
+
+    Each block is read as a ``Row`` with a single ``Cell``: the block itself.
+    """
+
+    tag: str
+    class_: str
+
+
+class Element(NamedTuple):
+    tag: str
+    classes: Tuple[str, ...]
+    text: str
+    href: str = ""
+
+
+class Cell(NamedTuple):
+    """A ``<td>`` with its text and the elements nested inside it, in order."""
+
+    text: str
+    classes: Tuple[str, ...]
+    elements: Tuple[Element, ...]
+
+    def get_text(self) -> str:
+        return self.text
+
+    def find(self, tag: str, class_: Optional[str] = None) -> Optional[Element]:
+        for element in self.elements:
+            if element.tag == tag and (
+                class_ is None or _matches_class(element.classes, class_)
+            ):
+                return element
+        return None
+
+
+class Row(NamedTuple):
+    """A ``<tr>``: its full text (header cells included) and its ``<td>`` cells."""
+
+    text: str
+    cells: Tuple[Cell, ...]
+
+    def get_text(self) -> str:
+        return self.text
+
+    def find_cell(self, class_: str) -> Optional[Cell]:
+        for cell in self.cells:
+            if _matches_class(cell.classes, class_):
+                return cell
+        return None
+
+
+def _matches_class(classes: Tuple[str, ...], class_: str) -> bool:
+    return class_ in classes or " ".join(classes) == class_
+
+
+def iter_rows(
+    html_text: str, table: Union[TableSpec, BlockSpec], backend: str
+) -> Iterator[Row]:
+    """Yield the rows of the table (or the blocks) identified by ``table``.
+
+    Raises:
+        TableNotFoundError: If the document has no such table or block.
+    """
+
+    if isinstance(table, BlockSpec):
+        if backend == STREAM_BACKEND:
+            return _iter_blocks_streaming(html_text, table)
+        return _iter_blocks_soup(html_text, table, backend)
+    if backend == STREAM_BACKEND:
+        return _iter_rows_streaming(html_text, table)
+    return _iter_rows_soup(html_text, table, backend)
+
+
+def _iter_rows_soup(html_text: str, table: TableSpec, backend: str) -> Iterator[Row]:
+    import bs4
+
+    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(html_text, backend)
+    tables: List[bs4.Tag] = soup.find_all("table", class_=table.class_)
+    if len(tables) <= table.index:
+        raise TableNotFoundError(f"No table matching {table}")
+    found: bs4.Tag = tables[table.index]
+    # Rows and cells of tables nested in a cell belong to that cell.
+    for tr in found.find_all("tr"):
+        if tr.find_parent("table") is not found:
+            continue
+        yield Row(
+            tr.get_text(),
+            tuple(
+                Cell(
+                    td.get_text(),
+                    tuple(td.get("class", ())),
+                    tuple(_soup_element(element) for element in td.find_all(True)),
+                )
+                for td in tr.find_all("td")
+                if td.find_parent("tr") is tr
+            ),
+        )
+
+
+def _iter_blocks_soup(html_text: str, block: BlockSpec, backend: str) -> Iterator[Row]:
+    import bs4
+
+    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(html_text, backend)
+    tags: List[bs4.Tag] = soup.find_all(block.tag, class_=block.class_)
+    if not tags:
+        raise TableNotFoundError(f"No block matching {block}")
+    for tag in tags:
+        yield Row(
+            tag.get_text(),
+            (
+                Cell(
+                    tag.get_text(),
+                    tuple(tag.get("class", ())),
+                    tuple(_soup_element(element) for element in tag.find_all(True)),
+                ),
+            ),
+        )
+
+
+def _soup_element(element: Any) -> Element:
+    return Element(
+        element.name,
+        tuple(element.get("class", ())),
+        element.get_text(),
+        element.get("href", ""),
+    )
+
+
+def _find_table_start(html_text: str, table: TableSpec) -> int:
+    matches_seen: int = 0
+    for match in _TABLE_START_PATTERN.finditer(html_text):
+        if _matches_class(_start_tag_classes(match.group(0)), table.class_):
+            if matches_seen == table.index:
+                return match.start()
+            matches_seen += 1
+    raise TableNotFoundError(f"No table matching {table}")
+
+
+def _start_tag_classes(start_tag: str) -> Tuple[str, ...]:
+    class_match: Optional[re.Match] = _CLASS_ATTR_PATTERN.search(start_tag)
+    if not class_match:
+        return ()
+    return tuple(
+        next(group for group in class_match.groups() if group is not None).split()
+    )
+
+
+def _iter_blocks_streaming(html_text: str, block: BlockSpec) -> Iterator[Row]:
+    tag_pattern: re.Pattern = re.compile(
+        rf"<(/?){re.escape(block.tag)}\b[^>]*>", re.IGNORECASE
+    )
+    found: bool = False
+    position: int = 0
+    while True:
+        match: Optional[re.Match] = tag_pattern.search(html_text, position)
+        if match is None:
+            break
+        position = match.end()
+        if match.group(1) or not _matches_class(
+            _start_tag_classes(match.group(0)), block.class_
+        ):
+            continue
+
+        # The block ends where as many end tags as start tags have been seen.
+        depth: int = 1
+        end: int = len(html_text)
+        for inner in tag_pattern.finditer(html_text, position):
+            depth += -1 if inner.group(1) else 1
+            if depth == 0:
+                end = inner.end()
+                break
+
+        extractor = _BlockExtractor()
+        extractor.feed(
+            html_text[match.start() : end].replace("\r\n", "\n").replace("\r", "\n")
+        )
+        extractor.close()
+        found = True
+        yield extractor.row()
+        position = end
+    if not found:
+        raise TableNotFoundError(f"No block matching {block}")
+
+
+def _iter_rows_streaming(html_text: str, table: TableSpec) -> Iterator[Row]:
+    start: int = _find_table_start(html_text, table)
+    extractor = _TableRowExtractor()
+    for offset in range(start, len(html_text), _FEED_CHUNK_SIZE):
+        chunk: str = html_text[offset : offset + _FEED_CHUNK_SIZE]
+        extractor.feed(chunk.replace("\r\n", "\n").replace("\r", "\n"))
+        yield from extractor.pop_rows()
+        if extractor.done:
+            return
+    extractor.close()
+    extractor.end_row()
+    yield from extractor.pop_rows()
+
+
+class _OpenElement:
+    __slots__ = ("tag", "classes", "href", "parts")
+
+    def __init__(self, tag: str, classes: Tuple[str, ...], href: str = "") -> None:
+        self.tag = tag
+        self.classes = classes
+        self.href = href
+        self.parts: List[str] = []
+
+    def to_element(self) -> Element:
+        return Element(self.tag, self.classes, "".join(self.parts), self.href)
+
+
+class _TableRowExtractor(html.parser.HTMLParser):
+    """Event-based extractor for the rows of the table whose start it is fed.
+
+    Mirrors the implicit end tags an HTML5 parser would insert inside tables:
+    a new row closes the open row, a new cell closes the open cell, and the
+    end of the table closes everything. Tables nested in a cell are part of
+    that cell: their rows and cells are recorded as elements, not split out.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.done: bool = False
+        self._table_depth: int = 0
+        self._raw_text_depth: int = 0
+        self._rows: List[Row] = []
+        self._row_parts: Optional[List[str]] = None
+        self._cells: List[Cell] = []
+        self._cell: Optional[_OpenElement] = None
+        self._elements: List[_OpenElement] = []
+        self._stack: List[_OpenElement] = []
+
+    def pop_rows(self) -> List[Row]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.done:
+            return
+        if tag == "table":
+            self._table_depth += 1
+            if self._table_depth == 1:
+                return
+        elif self._table_depth > 1:
+            # Inside a nested table, rows and cells are ordinary elements.
+            pass
+        elif tag == "tr":
+            self.end_row()
+            self._row_parts = []
+            return
+        elif tag in _CELL_TAGS:
+            self.end_cell()
+            if self._row_parts is None:
+                self._row_parts = []
+            self._cell = _OpenElement(tag, _classes(attrs))
+            return
+        if tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth += 1
+        if self._cell is None:
+            return
+        element = _OpenElement(tag, _classes(attrs), _href(attrs))
+        self._elements.append(element)
+        if tag not in _VOID_ELEMENTS:
+            self._stack.append(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self.end_row()
+                self.done = True
+                return
+        elif self._table_depth > 1:
+            pass
+        elif tag == "tr":
+            self.end_row()
+            return
+        elif tag in _CELL_TAGS:
+            self.end_cell()
+            return
+        if tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth = max(0, self._raw_text_depth - 1)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self.done or self._raw_text_depth or self._row_parts is None:
+            return
+        self._row_parts.append(data)
+        if self._cell is not None:
+            self._cell.parts.append(data)
+            for element in self._stack:
+                element.parts.append(data)
+
+    def end_cell(self) -> None:
+        if self._cell is None:
+            return
+        if self._cell.tag == "td":
+            self._cells.append(
+                Cell(
+                    "".join(self._cell.parts),
+                    self._cell.classes,
+                    tuple(element.to_element() for element in self._elements),
+                )
+            )
+        self._cell = None
+        self._elements = []
+        self._stack = []
+
+    def end_row(self) -> None:
+        self.end_cell()
+        if self._row_parts is None:
+            return
+        self._rows.append(Row("".join(self._row_parts), tuple(self._cells)))
+        self._row_parts = None
+        self._cells = []
+
+
+class _BlockExtractor(html.parser.HTMLParser):
+    """Event-based extractor for one block, fed exactly the block's markup."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._block: Optional[_OpenElement] = None
+        self._raw_text_depth: int = 0
+        self._elements: List[_OpenElement] = []
+        self._stack: List[_OpenElement] = []
+
+    def row(self) -> Row:
+        assert self._block is not None
+        text: str = "".join(self._block.parts)
+        return Row(
+            text,
+            (
+                Cell(
+                    text,
+                    self._block.classes,
+                    tuple(element.to_element() for element in self._elements),
+                ),
+            ),
+        )
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self._block is None:
+            self._block = _OpenElement(tag, _classes(attrs))
+            return
+        if tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth += 1
+        element = _OpenElement(tag, _classes(attrs), _href(attrs))
+        self._elements.append(element)
+        if tag not in _VOID_ELEMENTS:
+            self._stack.append(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth = max(0, self._raw_text_depth - 1)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self._block is None or self._raw_text_depth:
+            return
+        self._block.parts.append(data)
+        for element in self._stack:
+            element.parts.append(data)
+
+
+def _classes(attrs: List[Tuple[str, Optional[str]]]) -> Tuple[str, ...]:
+    values: Dict[str, Optional[str]] = dict(attrs)
+    return tuple((values.get("class") or "").split())
+
+
+def _href(attrs: List[Tuple[str, Optional[str]]]) -> str:
+    return dict(attrs).get("href") or ""
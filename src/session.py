@@ -0,0 +1,314 @@
+"""Defines a long-running draft session that answers queries from memory.
+
+Players are loaded and curves are fitted once, when the session starts. After
+that, each message only updates the draft state or reads from it, so it is
+answered in milliseconds instead of paying for a full start-up.
+
+Messages are JSON objects, one per line, read from stdin or from a local TCP
+socket. Each message gets exactly one JSON line in reply, with ``"ok": true``
+on success, or ``"ok": false`` and an ``"error"`` otherwise. The commands are:
+
+* ``{"command": "take", "player": NAME, "unknown": U}``: record the next pick.
+  With ``"unknown": true``, a player missing from the sources is recorded
+  under ``NAME`` instead of failing, so the pick count keeps up with the draft.
+* ``{"command": "undo"}``: take back the most recent pick.
+* ``{"command": "rank", "pick": N, "top_k": K}``: rank the remaining players by
+  draft value at pick ``N`` (the next pick by default).
+* ``{"command": "recommend", "draft_slot": S, "rounds": R, "top_k": K}``: rank
+  them by lookahead value for the team drafting from slot ``S``.
+* ``{"command": "status"}``: the picks so far.
+* ``{"command": "reset"}``: start the draft over.
+* ``{"command": "reload"}``: pick up changed source files, keeping the picks.
+
+Run with ``python -m src.session`` to serve stdin/stdout, or add ``--port`` to
+listen on 127.0.0.1 instead. With ``--watch SECONDS``, source files are also
+checked for changes before a message whenever that long has passed since the
+last check. Only the changed files are re-parsed and only the positions whose
+players changed are refitted (see ``incremental``).
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import socketserver
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, TextIO
+
+from . import fitting
+from . import incremental
+from . import lookahead
+from . import models
+from . import settings
+from .draft import DraftState, Functions, Pick
+from .table import PlayerTable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K: int = 10
+
+
+class SessionError(Exception):
+    """A message that could not be handled; reported back to the client."""
+
+
+class DraftSession:
+    """In-memory draft state plus the fitted curves used to rank players."""
+
+    def __init__(
+        self,
+        table: PlayerTable,
+        functions: Functions,
+        draft_slot: Optional[int] = None,
+        loader: Optional[incremental.IncrementalLoader] = None,
+        watch_interval: Optional[float] = None,
+    ) -> None:
+        self.table = table
+        self.functions = functions
+        self.draft_slot = draft_slot
+        self.loader = loader
+        self.watch_interval = watch_interval
+        self._last_refresh: float = time.monotonic()
+        self.state: DraftState = DraftState(table)
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "take": self._take,
+            "undo": self._undo,
+            "rank": self._rank,
+            "recommend": self._recommend,
+            "status": self._status,
+            "reset": self._reset,
+            "reload": self._reload,
+        }
+
+    @classmethod
+    def load(
+        cls, draft_slot: Optional[int] = None, watch_interval: Optional[float] = None
+    ) -> "DraftSession":
+        """Load every player and fit every position's curve."""
+
+        loader: incremental.IncrementalLoader = incremental.IncrementalLoader()
+        loader.refresh()
+        table: PlayerTable = PlayerTable.from_players(loader.players)
+        return cls(
+            table, _fit(table), draft_slot, loader=loader, watch_interval=watch_interval
+        )
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one message and return the reply. Never raises."""
+
+        if (
+            self.watch_interval is not None
+            and time.monotonic() - self._last_refresh >= self.watch_interval
+        ):
+            try:
+                self._reload({})
+            except SessionError as exc:
+                logger.warning("%s", exc)
+
+        try:
+            if not isinstance(message, dict):
+                raise SessionError("Messages must be JSON objects")
+            command: Any = message.get("command")
+            if command not in self._handlers:
+                raise SessionError(f"Unknown command: {command}")
+            reply: Dict[str, Any] = {"ok": True}
+            reply.update(self._handlers[command](message))
+            return reply
+        except (SessionError, TypeError, ValueError) as exc:
+            return {"ok": False, "error": str(exc)}
+
+    def handle_line(self, line: str) -> str:
+        try:
+            message: Any = json.loads(line)
+        except ValueError as exc:
+            return json.dumps({"ok": False, "error": f"Invalid JSON: {exc}"})
+        return json.dumps(self.handle(message))
+
+    def _take(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        name: Any = message.get("player")
+        if not isinstance(name, str):
+            raise SessionError('"take" needs a "player" name')
+        pick_number: int = self.state.pick_number
+        row: Optional[int] = self.state.take(name)
+        if row is None:
+            if not message.get("unknown"):
+                raise SessionError(
+                    f'No player matches {name!r}; add "unknown": true to '
+                    "record the pick anyway"
+                )
+            return {"pick": self.state.skip(name), "player": name, "unknown": True}
+        if self.state.pick_number == pick_number:
+            raise SessionError(f"{self.table.names[row]} was already drafted")
+        return {"pick": pick_number, "player": self.table.names[row]}
+
+    def _undo(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        pick: Optional[Pick] = self.state.undo()
+        if pick is None:
+            raise SessionError("Nothing to undo")
+        return {
+            "pick": self.state.pick_number,
+            "player": pick.name if pick.row is None else self.table.names[pick.row],
+        }
+
+    def _rank(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        pick: int = int(message.get("pick") or self.state.pick_number)
+        ranking = self.state.rank(
+            self.functions, pick, int(message.get("top_k", DEFAULT_TOP_K))
+        )
+        return {"pick": pick, "players": [player._asdict() for player in ranking]}
+
+    def _recommend(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        draft_slot: Any = message.get("draft_slot", self.draft_slot)
+        if draft_slot is None:
+            raise SessionError('"recommend" needs a "draft_slot"')
+        if not 1 <= int(draft_slot) <= settings.LEAGUE_SIZE:
+            raise SessionError(
+                f"Draft slot must be between 1 and {settings.LEAGUE_SIZE}"
+            )
+        recommendations = lookahead.recommend(
+            self.state,
+            int(draft_slot),
+            int(message.get("rounds", 3)),
+            int(message.get("top_k", DEFAULT_TOP_K)),
+        )
+        return {
+            "pick": self.state.pick_number,
+            "players": [player._asdict() for player in recommendations],
+        }
+
+    def _status(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "pick": self.state.pick_number,
+            "picks": [
+                pick.name if pick.row is None else self.table.names[pick.row]
+                for pick in self.state.history
+            ],
+        }
+
+    def _reset(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.state = DraftState(self.table)
+        return {"pick": self.state.pick_number}
+
+    def _reload(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if self.loader is None:
+            raise SessionError("This session was not loaded from source files")
+        self._last_refresh = time.monotonic()
+        # Parsing reports progress on stdout, which may carry the replies.
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                result: incremental.ReloadResult = self.loader.refresh()
+            except OSError as exc:
+                # Most likely a file that is still being written.
+                raise SessionError(f"Could not reload: {exc}") from exc
+        if result.changed_files:
+            picked: List[str] = [
+                pick.name if pick.row is None else self.table.names[pick.row]
+                for pick in self.state.history
+            ]
+            self.table = PlayerTable.from_players(self.loader.players)
+            # A changed position whose refit fails must lose its stale curve.
+            for position in result.changed_positions:
+                self.functions.pop(position, None)
+            self.functions.update(_fit(self.table, result.changed_positions))
+            self.state = DraftState(self.table)
+            # Picks that no longer resolve (say, a file caught half-written)
+            # stay as placeholders, to be matched again by a later reload.
+            for name in picked:
+                pick_number: int = self.state.pick_number
+                if self.state.take(name) is None:
+                    logger.warning("%s is not in the sources", name)
+                if self.state.pick_number == pick_number:
+                    self.state.skip(name)
+            logger.info(
+                "Reloaded %d files; refitted %s",
+                len(result.changed_files),
+                ", ".join(sorted(result.changed_positions)) or "nothing",
+            )
+        return {
+            "changed_files": [path for _, _, path in result.changed_files],
+            "changed_positions": sorted(result.changed_positions),
+            "pick": self.state.pick_number,
+        }
+
+
+def _fit(table: PlayerTable, positions: Optional[Set[str]] = None) -> Functions:
+    """Fit the curves of ``positions`` (all by default), warning about failures.
+
+    Unless ``settings.CURVE_MODELS`` is just the power model, each position's
+    curve is the best of them by cross-validation.
+    """
+
+    if not models.power_only():
+        selections: Dict[str, models.Selection] = models.select_table(
+            table, positions=positions
+        )
+        for selection in selections.values():
+            if selection.model is None:
+                logger.warning("No %s curve: %s", selection.name, selection.message)
+        return models.selected_functions(selections)
+
+    reports: Dict[str, fitting.FitReport] = fitting.fit_table(
+        table, positions=positions
+    )
+    for report in reports.values():
+        if report.params is None:
+            logger.warning("No %s curve: %s", report.name, report.message)
+    return fitting.fitted_functions(reports)
+
+
+def serve_stream(session: DraftSession, input: TextIO, output: TextIO) -> None:
+    """Answer each line of ``input`` with one line on ``output`` until EOF."""
+
+    for line in input:
+        if not line.strip():
+            continue
+        output.write(session.handle_line(line) + "\n")
+        output.flush()
+
+
+class _Server(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def serve_socket(session: DraftSession, port: int, host: str = "127.0.0.1") -> None:
+    """Answer JSON lines from TCP clients, one connection at a time."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw_line in self.rfile:
+                line: str = raw_line.decode("utf-8")
+                if not line.strip():
+                    continue
+                self.wfile.write((session.handle_line(line) + "\n").encode("utf-8"))
+
+    with _Server((host, port), Handler) as server:
+        logger.info("Listening on %s:%d", host, port)
+        server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, help="listen on this local TCP port")
+    parser.add_argument("--draft-slot", type=int, help="my slot in the first round")
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="reload changed source files at most this often",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    # Loading reports progress on stdout, which carries the replies.
+    with contextlib.redirect_stdout(sys.stderr):
+        session: DraftSession = DraftSession.load(args.draft_slot, args.watch)
+    logger.info("Session ready with %d players", len(session.table))
+    if args.port is None:
+        serve_stream(session, sys.stdin, sys.stdout)
+    else:
+        serve_socket(session, args.port)
+
+
+if __name__ == "__main__":
+    main()
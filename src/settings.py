@@ -1,8 +1,60 @@
-from typing import List
+import os
+from typing import Dict, List, Optional, Tuple
 
 LEAGUE_SIZE: int = 10
+DRAFT_ROUNDS: int = 16
+
+# Starting lineup scored by the draft simulator, and the most players of each
+# position a simulated team will draft.
+ROSTER_SLOTS: Dict[str, int] = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "K": 1, "DST": 1}
+POSITION_LIMITS: Dict[str, int] = {
+    "QB": 2,
+    "RB": 5,
+    "WR": 5,
+    "TE": 2,
+    "K": 1,
+    "DST": 1,
+}
 VERBOSE: bool = True
 
+# Record per-stage timers and counters (see src/instrumentation.py). The CLI's
+# --profile and --trace options turn this on for a single run.
+INSTRUMENT: bool = False
+
+# Number of worker processes used by parallel stages such as HTML parsing.
+# Set to 1 to run everything in the current process.
+NUM_WORKERS: int = os.cpu_count() or 1
+
+# Seconds a single position's curve fit may run before it is abandoned in
+# favor of that position's last good parameters. None disables the limit.
+FIT_TIMEOUT: Optional[float] = 30.0
+
+# Candidate curve families for every position (see src/models.py). With more
+# than one, each position's best is chosen by CV_FOLDS-fold cross-validation.
+CURVE_MODELS: Tuple[str, ...] = ("power",)
+CV_FOLDS: int = 5
+
+# Resamples each position's curve is refitted on for bootstrap bands, and the
+# share of them the bands cover (see src/bootstrap.py).
+BOOTSTRAP_RESAMPLES: int = 200
+BOOTSTRAP_CONFIDENCE: float = 0.9
+
+# Derived data (parsed rows, fitted curves, ...) is cached here, keyed by a
+# digest of its inputs. Delete the directory to force everything to rebuild.
+CACHE_DIR_PATH: str = os.path.join(os.path.dirname(__file__), "..", ".cache")
+USE_CACHE: bool = True
+
+# Season the HTML files under Data/ were saved for.
+SEASON: int = 2018
+
+# Past seasons' players are archived here, one directory of memory-mapped
+# .npy columns per season (see src/store.py).
+STORE_DIR_PATH: str = os.path.join(os.path.dirname(__file__), "..", "Store")
+
+# "stream" extracts only the target table without building a document tree.
+# Any BeautifulSoup tree builder ("html5lib", "lxml", "html.parser") also works.
+HTML_PARSER_BACKEND: str = "stream"
+
 TEAM_NAMES: List[str] = [
     "Jacksonville",
     "Minnesota",
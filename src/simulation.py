@@ -0,0 +1,284 @@
+"""Defines a Monte Carlo simulator of full snake drafts.
+
+Every simulated draft is a row of NumPy state (availability, roster counts,
+picks), and a batch of drafts advances one pick at a time with whole-array
+operations, so no ``Player`` objects are touched inside the loop.
+
+Opponents draw one noisy ranking per draft around each player's consensus
+rank, with noise set by how much the sources disagree about that player, and
+always take the best available player in that ranking. My team picks by one of
+``STRATEGIES`` while respecting ``settings.POSITION_LIMITS``. Every strategy
+faces the same opponent rankings, so differences between strategies are not
+drowned out by sampling noise.
+"""
+
+import concurrent.futures
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy
+
+from . import settings
+from .draft import Functions, consensus_ranks, snake_order
+from .table import PlayerTable
+
+DRAFT_VALUE: str = "draft_value"
+BEST_AVAILABLE: str = "best_available"
+BEST_PPG: str = "best_ppg"
+STRATEGIES: Tuple[str, ...] = (DRAFT_VALUE, BEST_AVAILABLE, BEST_PPG)
+
+# Drafts simulated together in one batch; bounds the (drafts, players) arrays.
+_BATCH_SIZE: int = 2000
+# Score given to players whose position has no fitted curve, so that the
+# draft-value strategy only falls back on them (best PPG first) when needed.
+_NO_CURVE_SCORE: float = -1e9
+
+
+class SimulationResult(NamedTuple):
+    strategy: str
+    num_simulations: int
+    mean_roster_ppg: float
+    std_roster_ppg: float
+    percentiles: Dict[int, float]
+
+
+class _DraftPool(NamedTuple):
+    """Plain arrays describing the draftable players, cheap to send to workers."""
+
+    rows: numpy.ndarray
+    projected_ppg: numpy.ndarray
+    consensus_rank: numpy.ndarray
+    rank_spread: numpy.ndarray
+    position_codes: numpy.ndarray
+    # curve_values[pick, position]: the position's curve at that overall pick,
+    # NaN for positions without a fitted curve.
+    curve_values: numpy.ndarray
+    position_limits: numpy.ndarray
+    starter_slots: numpy.ndarray
+    # Copied from settings so that workers need not share this process's.
+    num_teams: int
+    num_rounds: int
+
+
+def _build_pool(table: PlayerTable, functions: Functions) -> _DraftPool:
+    average_ppg: numpy.ndarray = table.average_projected_ppg()
+    rows: numpy.ndarray = numpy.flatnonzero(
+        (table.position_codes >= 0) & ~numpy.isnan(average_ppg)
+    )
+    consensus_rank, rank_spread = consensus_ranks(table)
+
+    num_picks: int = settings.LEAGUE_SIZE * settings.DRAFT_ROUNDS
+    pick_numbers: numpy.ndarray = numpy.arange(num_picks + settings.LEAGUE_SIZE + 1)
+    curve_values: numpy.ndarray = numpy.full(
+        (pick_numbers.size, len(table.positions)), numpy.nan
+    )
+    for code, position in enumerate(table.positions):
+        if position in functions:
+            func, params = functions[position]
+            with numpy.errstate(all="ignore"):
+                curve_values[:, code] = func(pick_numbers.astype(float), *params)
+
+    return _DraftPool(
+        rows,
+        average_ppg[rows],
+        consensus_rank[rows],
+        rank_spread[rows],
+        table.position_codes[rows].astype(numpy.intp),
+        curve_values,
+        numpy.array(
+            [settings.POSITION_LIMITS.get(p, 0) for p in table.positions], dtype=int
+        ),
+        numpy.array(
+            [settings.ROSTER_SLOTS.get(p, 0) for p in table.positions], dtype=int
+        ),
+        settings.LEAGUE_SIZE,
+        settings.DRAFT_ROUNDS,
+    )
+
+
+def _strategy_scores(pool: _DraftPool, strategy: str, pick: int) -> numpy.ndarray:
+    if strategy == DRAFT_VALUE:
+        curve: numpy.ndarray = pool.curve_values[
+            pick + pool.num_teams, pool.position_codes
+        ]
+        return numpy.where(
+            numpy.isnan(curve),
+            _NO_CURVE_SCORE + pool.projected_ppg,
+            pool.projected_ppg - curve,
+        )
+    if strategy == BEST_AVAILABLE:
+        return -pool.consensus_rank
+    if strategy == BEST_PPG:
+        return pool.projected_ppg
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def _simulate_batch(
+    pool: _DraftPool,
+    strategy: str,
+    draft_slot: int,
+    num_simulations: int,
+    seed: numpy.random.SeedSequence,
+) -> numpy.ndarray:
+    """Play ``num_simulations`` drafts and return my roster PPG for each."""
+
+    rng: numpy.random.Generator = numpy.random.default_rng(seed)
+    num_players: int = pool.rows.size
+    if num_players == 0:
+        return numpy.zeros(num_simulations)
+    num_teams: int = pool.num_teams
+    num_rounds: int = pool.num_rounds
+    drafts: numpy.ndarray = numpy.arange(num_simulations)
+
+    # Each opponent ranking is fixed for a whole draft, so opponents simply walk
+    # their ranking in order, skipping players that are already gone.
+    noisy_ranks: numpy.ndarray = pool.consensus_rank + pool.rank_spread * (
+        rng.standard_normal((num_simulations, num_players))
+    )
+    opponent_order: numpy.ndarray = numpy.argsort(noisy_ranks, axis=1)
+    cursor: numpy.ndarray = numpy.zeros(num_simulations, dtype=numpy.intp)
+
+    available: numpy.ndarray = numpy.ones((num_simulations, num_players), dtype=bool)
+    counts: numpy.ndarray = numpy.zeros(
+        (num_simulations, pool.position_limits.size), dtype=int
+    )
+    my_picks: numpy.ndarray = numpy.full((num_simulations, num_rounds), -1)
+    my_pick_numbers: Set[int] = set(
+        snake_order(draft_slot, num_teams, num_rounds).tolist()
+    )
+
+    my_round: int = 0
+    for pick in range(1, num_teams * num_rounds + 1):
+        if pick in my_pick_numbers:
+            scores: numpy.ndarray = _strategy_scores(pool, strategy, pick)
+            open_positions: numpy.ndarray = (
+                counts[:, pool.position_codes]
+                < pool.position_limits[pool.position_codes]
+            )
+            eligible: numpy.ndarray = available & open_positions
+            # Drafts whose open positions are exhausted take anyone available.
+            stuck: numpy.ndarray = ~eligible.any(axis=1)
+            eligible[stuck] = available[stuck]
+            choice: numpy.ndarray = numpy.argmax(
+                numpy.where(eligible, scores, -numpy.inf), axis=1
+            )
+            valid: numpy.ndarray = eligible[drafts, choice]
+            available[drafts[valid], choice[valid]] = False
+            counts[drafts[valid], pool.position_codes[choice[valid]]] += 1
+            my_picks[valid, my_round] = choice[valid]
+            my_round += 1
+        else:
+            choice = opponent_order[drafts, numpy.minimum(cursor, num_players - 1)]
+            taken: numpy.ndarray = ~available[drafts, choice] & (cursor < num_players)
+            while taken.any():
+                cursor[taken] += 1
+                choice = opponent_order[drafts, numpy.minimum(cursor, num_players - 1)]
+                taken = ~available[drafts, choice] & (cursor < num_players)
+            valid = cursor < num_players
+            available[drafts[valid], choice[valid]] = False
+            cursor[valid] += 1
+
+    return _roster_ppg(pool, my_picks)
+
+
+def _roster_ppg(pool: _DraftPool, picks: numpy.ndarray) -> numpy.ndarray:
+    """Sum the projected PPG of each roster's starters."""
+
+    drafted: numpy.ndarray = picks >= 0
+    ppg: numpy.ndarray = numpy.where(drafted, pool.projected_ppg[picks], -numpy.inf)
+    codes: numpy.ndarray = numpy.where(drafted, pool.position_codes[picks], -1)
+    totals: numpy.ndarray = numpy.zeros(picks.shape[0])
+    for code, slots in enumerate(pool.starter_slots):
+        if slots == 0:
+            continue
+        position_ppg: numpy.ndarray = -numpy.sort(
+            -numpy.where(codes == code, ppg, -numpy.inf), axis=1
+        )[:, :slots]
+        totals += numpy.where(numpy.isfinite(position_ppg), position_ppg, 0.0).sum(
+            axis=1
+        )
+    return totals
+
+
+def _simulate_job(
+    job: Tuple[_DraftPool, str, int, int, numpy.random.SeedSequence],
+) -> numpy.ndarray:
+    return _simulate_batch(*job)
+
+
+def simulate_drafts(
+    table: PlayerTable,
+    functions: Functions,
+    draft_slot: int,
+    num_simulations: int = 10000,
+    strategies: Sequence[str] = STRATEGIES,
+    num_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, SimulationResult]:
+    """Simulate full drafts from ``draft_slot`` and score each strategy.
+
+    Args:
+        table: The full player pool.
+        functions: Mapping from position to the fitted curve function and
+            its learned parameters, used by the draft-value strategy.
+        draft_slot: My 1-based position in the first round.
+        num_simulations: Drafts to simulate per strategy.
+        strategies: Names of the strategies to compare (see ``STRATEGIES``).
+        num_workers: Size of the process pool; ``settings.NUM_WORKERS`` by
+            default.
+        seed: Seed for reproducible results.
+
+    Returns:
+        Mapping from strategy to the distribution of my starters' total
+        projected PPG.
+    """
+
+    if not 1 <= draft_slot <= settings.LEAGUE_SIZE:
+        raise ValueError(f"Draft slot must be between 1 and {settings.LEAGUE_SIZE}")
+    if num_simulations < 1:
+        raise ValueError("At least one draft must be simulated")
+    if num_workers is None:
+        num_workers = settings.NUM_WORKERS
+
+    pool: _DraftPool = _build_pool(table, functions)
+    batch_sizes: List[int] = [
+        min(_BATCH_SIZE, num_simulations - start)
+        for start in range(0, num_simulations, _BATCH_SIZE)
+    ]
+    # The same seeds are reused for every strategy so they face identical
+    # opponents.
+    seeds: List[numpy.random.SeedSequence] = numpy.random.SeedSequence(seed).spawn(
+        len(batch_sizes)
+    )
+    jobs: List[Tuple[_DraftPool, str, int, int, numpy.random.SeedSequence]] = [
+        (pool, strategy, draft_slot, batch_size, batch_seed)
+        for strategy in strategies
+        for batch_size, batch_seed in zip(batch_sizes, seeds)
+    ]
+
+    batches: List[numpy.ndarray]
+    if num_workers > 1 and len(jobs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(num_workers, len(jobs))
+        ) as executor:
+            batches = list(executor.map(_simulate_job, jobs))
+    else:
+        batches = [_simulate_job(job) for job in jobs]
+
+    results: Dict[str, SimulationResult] = {}
+    for i, strategy in enumerate(strategies):
+        roster_ppg: numpy.ndarray = numpy.concatenate(
+            batches[i * len(batch_sizes) : (i + 1) * len(batch_sizes)]
+        )
+        results[strategy] = SimulationResult(
+            strategy,
+            int(roster_ppg.size),
+            float(roster_ppg.mean()) if roster_ppg.size else float("nan"),
+            float(roster_ppg.std()) if roster_ppg.size else float("nan"),
+            {
+                q: float(numpy.percentile(roster_ppg, q))
+                if roster_ppg.size
+                else float("nan")
+                for q in (5, 50, 95)
+            },
+        )
+    return results
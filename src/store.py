@@ -0,0 +1,227 @@
+"""Defines a season-partitioned columnar store of player tables.
+
+Each season lives in its own directory under ``settings.STORE_DIR_PATH``::
+
+    Store/
+    └── 2018/
+        ├── meta.json               names, sources, positions and teams
+        ├── position_codes.npy
+        ├── team_codes.npy
+        ├── rank/ESPN.npy           one column per (metric, source)
+        ├── projected_ppg/ESPN.npy
+        └── ...
+
+Every column is a plain ``.npy`` file opened memory-mapped, so reading a
+subset of seasons and sources only touches those columns' files, and only the
+pages that are actually read. Seasons are written to a temporary directory
+and then swapped into place, so readers never see a half-written season.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy
+
+from . import settings
+from .table import METRICS, PROJECTED_PPG, RANK, PlayerTable
+
+# Bump whenever the layout changes; seasons of another format are not read.
+FORMAT_VERSION: int = 1
+_META_FILE_NAME: str = "meta.json"
+
+
+class StoreError(Exception):
+    """A season that is missing or was written in an unreadable format."""
+
+
+def _root(root: Optional[str]) -> str:
+    return root if root is not None else settings.STORE_DIR_PATH
+
+
+def _season_path(season: int, root: Optional[str]) -> str:
+    return os.path.join(_root(root), str(season))
+
+
+def seasons(root: Optional[str] = None) -> List[int]:
+    """Return every stored season, oldest first."""
+
+    if not os.path.isdir(_root(root)):
+        return []
+    return sorted(
+        int(entry)
+        for entry in os.listdir(_root(root))
+        if entry.isdigit()
+        and os.path.isfile(os.path.join(_root(root), entry, _META_FILE_NAME))
+    )
+
+
+def write_season(season: int, table: PlayerTable, root: Optional[str] = None) -> str:
+    """Store ``table`` as ``season``, replacing what was stored for it before.
+
+    Returns the season's directory.
+    """
+
+    os.makedirs(_root(root), exist_ok=True)
+    tmp_path: str = tempfile.mkdtemp(dir=_root(root), prefix=f".{season}-")
+    try:
+        for metric in METRICS:
+            os.mkdir(os.path.join(tmp_path, metric))
+            for source in table.sources:
+                numpy.save(
+                    os.path.join(tmp_path, metric, f"{source}.npy"),
+                    numpy.ascontiguousarray(table.column(metric, source)),
+                )
+        numpy.save(os.path.join(tmp_path, "position_codes.npy"), table.position_codes)
+        numpy.save(os.path.join(tmp_path, "team_codes.npy"), table.team_codes)
+        with open(os.path.join(tmp_path, _META_FILE_NAME), "w") as meta_file:
+            json.dump(
+                {
+                    "format": FORMAT_VERSION,
+                    "season": season,
+                    "names": table.names,
+                    "sources": table.sources,
+                    "positions": table.positions,
+                    "teams": table.teams,
+                },
+                meta_file,
+            )
+
+        season_path: str = _season_path(season, root)
+        old_path: Optional[str] = None
+        if os.path.exists(season_path):
+            old_path = tempfile.mkdtemp(dir=_root(root), prefix=f".{season}-old-")
+            os.rmdir(old_path)
+            os.rename(season_path, old_path)
+        os.rename(tmp_path, season_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return season_path
+
+
+class Season:
+    """One stored season, read lazily.
+
+    Nothing but ``meta.json`` is read on construction; each column is mapped
+    the first time it is asked for.
+    """
+
+    def __init__(self, season: int, root: Optional[str] = None) -> None:
+        self.season = season
+        self.path: str = _season_path(season, root)
+        try:
+            with open(os.path.join(self.path, _META_FILE_NAME), "r") as meta_file:
+                meta: Dict[str, Any] = json.load(meta_file)
+        except FileNotFoundError:
+            raise StoreError(f"Season {season} is not stored") from None
+        if meta.get("format") != FORMAT_VERSION:
+            raise StoreError(
+                f"Season {season} was stored in format {meta.get('format')}, "
+                f"not {FORMAT_VERSION}; archive it again"
+            )
+        self.names: List[str] = meta["names"]
+        self.sources: List[str] = meta["sources"]
+        self.positions: List[str] = meta["positions"]
+        self.teams: List[str] = meta["teams"]
+        self._arrays: Dict[str, numpy.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _array(self, *parts: str) -> numpy.ndarray:
+        relative_path: str = os.path.join(*parts) + ".npy"
+        if relative_path not in self._arrays:
+            self._arrays[relative_path] = numpy.load(
+                os.path.join(self.path, relative_path), mmap_mode="r"
+            )
+        return self._arrays[relative_path]
+
+    @property
+    def position_codes(self) -> numpy.ndarray:
+        return self._array("position_codes")
+
+    @property
+    def team_codes(self) -> numpy.ndarray:
+        return self._array("team_codes")
+
+    def column(self, metric: str, source: str) -> numpy.ndarray:
+        """Return the memory-mapped column; NaN everywhere for unknown sources."""
+
+        if source not in self.sources:
+            return numpy.full(len(self), numpy.nan)
+        return self._array(metric, source)
+
+    def points(
+        self, position: Optional[str] = None, sources: Optional[Iterable[str]] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return (rank, projected PPG) pairs like ``PlayerTable.points``.
+
+        Only the rank and PPG columns of ``sources`` (every source by default)
+        and, if ``position`` is given, the position codes are read.
+        """
+
+        mask: Optional[numpy.ndarray] = None
+        if position is not None:
+            if position not in self.positions:
+                return numpy.zeros(0), numpy.zeros(0)
+            mask = self.position_codes == self.positions.index(position)
+        x_values: List[numpy.ndarray] = []
+        y_values: List[numpy.ndarray] = []
+        for source in self.sources if sources is None else sources:
+            ranks: numpy.ndarray = self.column(RANK, source)
+            ppg: numpy.ndarray = self.column(PROJECTED_PPG, source)
+            keep: numpy.ndarray = ~numpy.isnan(ranks) & ~numpy.isnan(ppg)
+            if mask is not None:
+                keep &= mask
+            x_values.append(ranks[keep])
+            y_values.append(ppg[keep])
+        return (
+            numpy.concatenate([numpy.zeros(0)] + x_values),
+            numpy.concatenate([numpy.zeros(0)] + y_values),
+        )
+
+    def table(self, sources: Optional[Sequence[str]] = None) -> PlayerTable:
+        """Return the season as a ``PlayerTable`` of ``sources``, all by default.
+
+        Only the columns of those sources are read into memory.
+        """
+
+        table_sources: List[str] = list(self.sources if sources is None else sources)
+        return PlayerTable(
+            list(self.names),
+            table_sources,
+            list(self.positions),
+            numpy.array(self.position_codes),
+            list(self.teams),
+            numpy.array(self.team_codes),
+            {
+                metric: numpy.column_stack(
+                    [numpy.zeros((len(self), 0))]
+                    + [self.column(metric, source) for source in table_sources]
+                )
+                for metric in METRICS
+            },
+        )
+
+
+def points(
+    seasons: Iterable[int],
+    position: Optional[str] = None,
+    sources: Optional[Iterable[str]] = None,
+    root: Optional[str] = None,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the (rank, projected PPG) pairs of every season in ``seasons``."""
+
+    source_list: Optional[List[str]] = None if sources is None else list(sources)
+    pairs: List[Tuple[numpy.ndarray, numpy.ndarray]] = [
+        Season(season, root).points(position, source_list) for season in seasons
+    ]
+    return (
+        numpy.concatenate([numpy.zeros(0)] + [x_values for x_values, _ in pairs]),
+        numpy.concatenate([numpy.zeros(0)] + [y_values for _, y_values in pairs]),
+    )
@@ -0,0 +1,233 @@
+"""Defines a columnar store of player data backed by NumPy arrays."""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy
+
+from .infra import Player
+
+RANK: str = "rank"
+POSITION_RANK: str = "position_rank"
+PROJECTED_PPG: str = "projected_ppg"
+METRICS: Tuple[str, ...] = (RANK, POSITION_RANK, PROJECTED_PPG)
+
+
+class PlayerTable:
+    """One row per player and one column per (metric, source).
+
+    Missing values are NaN. Positions and teams are stored as integer codes
+    into ``positions``/``teams`` (-1 when unknown), so per-position filtering,
+    averaging and point extraction are whole-array operations.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        sources: List[str],
+        positions: List[str],
+        position_codes: numpy.ndarray,
+        teams: List[str],
+        team_codes: numpy.ndarray,
+        values: Dict[str, numpy.ndarray],
+    ) -> None:
+        self.names = names
+        self.sources = sources
+        self.positions = positions
+        self.position_codes = position_codes
+        self.teams = teams
+        self.team_codes = team_codes
+        # Each metric is a (players, sources) array; column(metric, source) is
+        # a view of one of its columns.
+        self.values = values
+        self._source_columns: Dict[str, int] = {
+            source: i for i, source in enumerate(sources)
+        }
+        self._average_projected_ppg: Optional[numpy.ndarray] = None
+
+    @classmethod
+    def from_players(cls, players: Sequence[Player]) -> "PlayerTable":
+        sources: List[str] = []
+        for player in players:
+            for source_map in (
+                player.rank_map,
+                player.position_rank_map,
+                player.projected_ppg_map,
+            ):
+                for source in source_map:
+                    if source not in sources:
+                        sources.append(source)
+        source_columns: Dict[str, int] = {source: i for i, source in enumerate(sources)}
+
+        positions, position_codes = _encode([player.position for player in players])
+        teams, team_codes = _encode([player.team for player in players])
+
+        values: Dict[str, numpy.ndarray] = {
+            metric: numpy.full((len(players), len(sources)), numpy.nan)
+            for metric in METRICS
+        }
+        for row, player in enumerate(players):
+            for metric, source_map in (
+                (RANK, player.rank_map),
+                (POSITION_RANK, player.position_rank_map),
+                (PROJECTED_PPG, player.projected_ppg_map),
+            ):
+                for source, value in source_map.items():
+                    values[metric][row, source_columns[source]] = value
+
+        return cls(
+            [player.name for player in players],
+            sources,
+            positions,
+            position_codes,
+            teams,
+            team_codes,
+            values,
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, row: int) -> "PlayerView":
+        if not -len(self) <= row < len(self):
+            raise IndexError(row)
+        return PlayerView(self, row % len(self))
+
+    def __iter__(self) -> Iterator["PlayerView"]:
+        return (PlayerView(self, row) for row in range(len(self)))
+
+    def column(self, metric: str, source: str) -> numpy.ndarray:
+        return self.values[metric][:, self._source_columns[source]]
+
+    def set_value(self, metric: str, source: str, row: int, value: float) -> None:
+        self.values[metric][row, self._source_columns[source]] = value
+        if metric == PROJECTED_PPG:
+            self._average_projected_ppg = None
+
+    def average_projected_ppg(self) -> numpy.ndarray:
+        """Return each player's mean projected PPG across sources (NaN if none)."""
+
+        if self._average_projected_ppg is None:
+            ppg: numpy.ndarray = self.values[PROJECTED_PPG]
+            counts: numpy.ndarray = numpy.sum(~numpy.isnan(ppg), axis=1)
+            totals: numpy.ndarray = numpy.nansum(ppg, axis=1)
+            with numpy.errstate(invalid="ignore", divide="ignore"):
+                self._average_projected_ppg = totals / counts
+        return self._average_projected_ppg
+
+    def position_mask(self, position: str) -> numpy.ndarray:
+        if position not in self.positions:
+            return numpy.zeros(len(self), dtype=bool)
+        return self.position_codes == self.positions.index(position)
+
+    def points(
+        self, position: Optional[str] = None, source: Optional[str] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return (rank, projected PPG) pairs for every player and source.
+
+        A pair is produced for each source that both ranks and projects a
+        player, restricted to ``position`` and ``source`` when given.
+        """
+
+        ranks: numpy.ndarray = self.values[RANK]
+        ppg: numpy.ndarray = self.values[PROJECTED_PPG]
+        if source is not None:
+            column: int = self._source_columns[source]
+            ranks, ppg = ranks[:, column : column + 1], ppg[:, column : column + 1]
+        mask: numpy.ndarray = ~numpy.isnan(ranks) & ~numpy.isnan(ppg)
+        if position is not None:
+            mask &= self.position_mask(position)[:, numpy.newaxis]
+        return ranks[mask], ppg[mask]
+
+
+class PlayerView(Player):
+    """A ``Player`` whose data lives in one row of a ``PlayerTable``.
+
+    The per-source maps are rebuilt from the row on access; setters write
+    straight through to the table.
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: PlayerTable, row: int) -> None:
+        self.table = table
+        self.row = row
+
+    @property
+    def name(self) -> str:
+        return self.table.names[self.row]
+
+    @property
+    def position(self) -> Optional[str]:
+        code: int = int(self.table.position_codes[self.row])
+        return self.table.positions[code] if code >= 0 else None
+
+    @property
+    def team(self) -> Optional[str]:
+        code: int = int(self.table.team_codes[self.row])
+        return self.table.teams[code] if code >= 0 else None
+
+    @property
+    def rank_map(self) -> Dict[str, int]:
+        return {source: int(value) for source, value in self._row_items(RANK).items()}
+
+    @property
+    def position_rank_map(self) -> Dict[str, int]:
+        return {
+            source: int(value)
+            for source, value in self._row_items(POSITION_RANK).items()
+        }
+
+    @property
+    def projected_ppg_map(self) -> Dict[str, float]:
+        return self._row_items(PROJECTED_PPG)
+
+    def _row_items(self, metric: str) -> Dict[str, float]:
+        row_values: numpy.ndarray = self.table.values[metric][self.row]
+        return {
+            source: float(value)
+            for source, value in zip(self.table.sources, row_values)
+            if not numpy.isnan(value)
+        }
+
+    def set_rank(self, source: str, rank: int) -> None:
+        self.table.set_value(RANK, source, self.row, rank)
+
+    def set_position_rank(self, source: str, position_rank: int) -> None:
+        self.table.set_value(POSITION_RANK, source, self.row, position_rank)
+
+    def set_projected_ppg(self, source: str, projected_ppg: float) -> None:
+        self.table.set_value(PROJECTED_PPG, source, self.row, projected_ppg)
+
+    def _value(self, metric: str, source: str) -> Optional[float]:
+        if source not in self.table.sources:
+            return None
+        value: float = float(self.table.column(metric, source)[self.row])
+        return None if numpy.isnan(value) else value
+
+    def get_rank(self, source: str) -> Optional[int]:
+        value: Optional[float] = self._value(RANK, source)
+        return None if value is None else int(value)
+
+    def get_position_rank(self, source: str) -> Optional[int]:
+        value: Optional[float] = self._value(POSITION_RANK, source)
+        return None if value is None else int(value)
+
+    def get_projected_ppg(self, source: str) -> Optional[float]:
+        return self._value(PROJECTED_PPG, source)
+
+    def get_average_projected_ppg(self) -> float:
+        return float(self.table.average_projected_ppg()[self.row])
+
+    def merge(self, other: Player) -> None:
+        raise TypeError("Table-backed players cannot be merged; merge before tabling.")
+
+
+def _encode(labels: List[Optional[str]]) -> Tuple[List[str], numpy.ndarray]:
+    """Return categories in order of first appearance and each label's code."""
+
+    categories: Dict[str, int] = {}
+    codes: numpy.ndarray = numpy.full(len(labels), -1, dtype=numpy.int16)
+    for i, label in enumerate(labels):
+        if label:
+            codes[i] = categories.setdefault(label, len(categories))
+    return list(categories), codes
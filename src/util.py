@@ -1,6 +1,6 @@
 """Defines utility functions."""
 
-import unicodedata
+from . import names
 
 
 def aggressively_sanitize(string: str) -> str:
@@ -13,6 +13,4 @@ def aggressively_sanitize(string: str) -> str:
     pass so that downstream parsers work with clean text.
     """
 
-    string = string.replace("Â", "").replace("Ã", "")
-    normalized = unicodedata.normalize("NFKD", string).replace("\u00a0", " ")
-    return normalized.encode("ascii", "ignore").decode()
+    return names.sanitize(string)
@@ -0,0 +1,26 @@
+from benchmarks import bench
+from src.infra import Player
+
+
+def test_scaled_players_keeps_ranks_interleaved():
+    player = Player("Player 0", "RB")
+    player.set_rank("ESPN", 3)
+    player.set_projected_ppg("ESPN", 10.0)
+
+    scaled = bench.scaled_players([player], 3)
+
+    assert [p.name for p in scaled] == ["Player 0", "Player 0 2", "Player 0 3"]
+    assert [p.get_rank("ESPN") for p in scaled] == [9, 10, 11]
+    assert len(bench._merge(scaled).players) == 3
+
+
+def test_compare_ignores_noise_and_new_stages():
+    results = [
+        bench.BenchmarkResult("slow", 2.0, 2.0, 1),
+        bench.BenchmarkResult("tiny", 0.0004, 0.0004, 1),
+        bench.BenchmarkResult("steady", 1.1, 1.1, 1),
+        bench.BenchmarkResult("new", 5.0, 5.0, 1),
+    ]
+    baseline = {"slow": 1.0, "tiny": 0.0001, "steady": 1.0}
+
+    assert bench.compare(results, baseline) == [bench.Regression("slow", 1.0, 2.0)]
@@ -0,0 +1,98 @@
+import numpy
+import pytest
+
+import src.bootstrap as bootstrap
+import src.fitting as fitting
+import src.models as models
+import src.settings as settings
+from src.infra import Player
+from src.table import PlayerTable
+
+PARAMS = (100.0, 1.0, 1.0, 0.5, 2.0)
+X_VALUES = numpy.arange(1.0, 200.0, 5.0)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR_PATH", str(tmp_path))
+
+
+def noisy_points(seed=0):
+    rng = numpy.random.default_rng(seed)
+    y_values = fitting.power_model(X_VALUES, *PARAMS) + rng.normal(
+        0, 0.2, X_VALUES.size
+    )
+    return X_VALUES, y_values
+
+
+def test_bootstrap_is_reproducible_and_independent_of_workers():
+    points = {"RB": noisy_points(0), "WR": noisy_points(1)}
+
+    serial = bootstrap.bootstrap_curves(points, 60, num_workers=1, seed=3)
+    parallel = bootstrap.bootstrap_curves(points, 60, num_workers=2, seed=3)
+
+    for name in points:
+        assert len(serial[name].samples) == 60 - serial[name].failures
+        numpy.testing.assert_array_equal(serial[name].samples, parallel[name].samples)
+    assert serial["RB"].failures == 0
+
+
+def test_resamples_are_warm_started_from_the_full_data_fit(monkeypatch):
+    starts = []
+    refit = fitting.refit
+
+    def recording_refit(x_values, y_values, initial_params, *args):
+        starts.append(initial_params)
+        return refit(x_values, y_values, initial_params, *args)
+
+    monkeypatch.setattr(fitting, "refit", recording_refit)
+    result = bootstrap.bootstrap_curves({"RB": noisy_points()}, 30, num_workers=1)
+
+    assert len(starts) == 30
+    for start in starts:
+        numpy.testing.assert_array_equal(start, result["RB"].params)
+
+
+def test_bands_cover_the_true_curve_and_bound_draft_values(monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_SIZE", 10)
+    fits = bootstrap.bootstrap_curves(
+        {"RB": noisy_points()}, 100, num_workers=1, seed=0
+    )
+
+    band = bootstrap.curve_band(fits["RB"], X_VALUES, confidence=0.99)
+    true_curve = fitting.power_model(X_VALUES, *PARAMS)
+    assert numpy.all(band.lower <= band.median)
+    assert numpy.all(band.median <= band.upper)
+    assert numpy.mean((band.lower <= true_curve) & (true_curve <= band.upper)) > 0.9
+
+    players = []
+    for name, position in (("Runner", "RB"), ("Kicker", "K")):
+        player = Player(name, position)
+        player.set_projected_ppg("ESPN", 20.0)
+        players.append(player)
+    values = bootstrap.draft_value_bands(PlayerTable.from_players(players), 12, fits)
+    curve = bootstrap.curve_band(fits["RB"], numpy.array([22.0]))
+    numpy.testing.assert_allclose(
+        [values.lower[0], values.upper[0]],
+        [20.0 - curve.upper[0], 20.0 - curve.lower[0]],
+    )
+    assert numpy.isnan(values.median[1])
+
+
+def test_the_selected_family_is_bootstrapped():
+    rng = numpy.random.default_rng(0)
+    y_values = models.exponential_model(X_VALUES, 80.0, 0.02, 10.0) + rng.normal(
+        0, 0.5, X_VALUES.size
+    )
+    candidates = models.model_names()
+
+    fits = bootstrap.bootstrap_curves(
+        {"RB": (X_VALUES, y_values)}, 40, num_workers=1, seed=0, candidates=candidates
+    )
+
+    selection = models.select_curves({"RB": (X_VALUES, y_values)}, candidates)
+    assert fits["RB"].model == selection["RB"].model == "exponential"
+    numpy.testing.assert_array_equal(fits["RB"].params, selection["RB"].params)
+    band = bootstrap.curve_band(fits["RB"], X_VALUES)
+    curve = models.exponential_model(X_VALUES, *fits["RB"].params)
+    assert numpy.all((band.lower <= curve + 1e-9) & (curve <= band.upper + 1e-9))
@@ -0,0 +1,59 @@
+import pytest
+
+import src.cache as cache
+import src.infra as infra
+import src.settings as settings
+
+PPG_HTML = """
+<html><body><table class="playerTableTable tableBody">
+<tr><th>Projections</th></tr>
+<tr><th>Rank</th><th>Player</th><th>PTS</th></tr>
+<tr><td>1</td><td>Todd Gurley II, LAR RB</td><td>21.5</td></tr>
+<tr><td>2</td><td>Le'Veon Bell, Pit RB</td><td>20.25</td></tr>
+</table></body></html>
+"""
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR_PATH", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "USE_CACHE", True)
+    return tmp_path / "cache"
+
+
+def test_store_and_load_round_trip(cache_dir):
+    assert cache.load("test", "key") is None
+    assert not cache.contains("test", "key")
+    cache.store("test", "key", [("a", 1), ("b", 2.5)])
+    assert cache.contains("test", "key")
+    assert cache.load("test", "key") == [("a", 1), ("b", 2.5)]
+
+
+def test_file_digest_depends_on_contents_and_salt(tmp_path):
+    path = tmp_path / "page.htm"
+    path.write_text("<html></html>")
+    digest = cache.file_digest(str(path), "ESPN", 1)
+    assert cache.file_digest(str(path), "ESPN", 2) != digest
+    path.write_text("<html> </html>")
+    assert cache.file_digest(str(path), "ESPN", 1) != digest
+
+
+def test_cached_ppg_rows_skip_html_parsing(cache_dir, tmp_path, monkeypatch):
+    projections_path = tmp_path / "ESPN" / "Projections"
+    projections_path.mkdir(parents=True)
+    (projections_path / "1.htm").write_text(PPG_HTML, encoding="utf-8")
+    monkeypatch.setattr(infra, "DATA_DIR_PATH", str(tmp_path))
+
+    parsed = infra.ESPN().parse_ppg()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached rows should not be re-parsed")
+
+    monkeypatch.setattr(infra.parsing, "iter_rows", fail)
+    cached = infra.ESPN().parse_ppg()
+
+    assert [player.to_record() for player in cached] == [
+        player.to_record() for player in parsed
+    ]
+    assert all(isinstance(player, infra.ESPNPlayer) for player in cached)
+    assert cached[0].get_projected_ppg("ESPN") == 21.5
@@ -0,0 +1,80 @@
+import numpy
+import pytest
+
+from src import charting
+
+
+def linear(x_value, intercept, slope):
+    return intercept - slope * x_value
+
+
+def make_points():
+    running_backs = charting.PointSet("RB", curve=(linear, (30.0, 1.0)))
+    running_backs.add_points_from_lists([1, 5, 12], [25.0, 21.0, 16.0], ["A", "", "C"])
+    receivers = charting.PointSet("WR", add_regression_line=True)
+    receivers.add_points_from_lists([3, 8, 20], [20.0, 18.0, 11.0])
+    return charting.ScatterPlotData([running_backs, receivers])
+
+
+def test_curve_points_keep_only_the_drawable_first_quadrant():
+    x_values, y_values = charting.curve_points(
+        (linear, (30.0, 1.0)), numpy.array([-5.0, 0.0, 10.0, 40.0])
+    )
+
+    assert list(x_values) == [0.0, 10.0]
+    assert list(y_values) == [30.0, 20.0]
+
+
+def test_render_batch_writes_every_format_of_every_chart(tmp_path):
+    specs = [
+        charting.ChartSpec(make_points(), "All"),
+        charting.ChartSpec(charting.ScatterPlotData([make_points()[0]]), "RB"),
+    ]
+
+    written = charting.render_batch(
+        specs, str(tmp_path), formats=("png", "svg"), num_workers=1
+    )
+
+    assert written == [
+        [str(tmp_path / "All.png"), str(tmp_path / "All.svg")],
+        [str(tmp_path / "RB.png"), str(tmp_path / "RB.svg")],
+    ]
+    assert all((tmp_path / name).stat().st_size for name in ("All.png", "RB.svg"))
+
+
+def test_render_rejects_pyplot_callbacks(tmp_path):
+    points = make_points()
+    points[0].additional_charting_behavior = lambda *args: None
+
+    with pytest.raises(ValueError):
+        charting.render(charting.ChartSpec(points, "All"), str(tmp_path))
+
+
+def test_point_sets_grow_and_expose_read_only_views():
+    point_set = charting.PointSet("RB")
+    point_set.append(charting.Point(1.0, 10.0))
+    point_set.extend_from_arrays(numpy.arange(2.0, 202.0), numpy.full(200, 5.0))
+    point_set.append(charting.Point(300.0, 1.0, "Last"))
+
+    assert len(point_set) == 202
+    x_values = point_set.x_values()
+    assert x_values[-1] == 300.0 and point_set.y_values()[0] == 10.0
+    assert numpy.shares_memory(x_values, point_set.x_values())
+    with pytest.raises(ValueError):
+        x_values[0] = 0.0
+    assert point_set.labels()[-2:] == [None, "Last"]
+    assert point_set[-1].label == "Last" and point_set[0].x_value == 1.0
+    with pytest.raises(ValueError):
+        point_set.extend_from_arrays([1.0], [1.0, 2.0])
+
+
+def test_scatter_plot_data_finds_point_sets_by_name():
+    points = make_points()
+    points.add_point(charting.Point(30.0, 8.0), "WR")
+
+    assert points.point_set("WR").x_values()[-1] == 30.0
+    assert len(points.all_points()) == 7
+    with pytest.raises(ValueError):
+        points.add_point(charting.Point(1.0, 1.0), "QB")
+    with pytest.raises(AssertionError):
+        points.append(charting.PointSet("RB"))
@@ -0,0 +1,97 @@
+import numpy
+
+from src import draft
+from src.infra import Player
+from src.main import calculate_draft_value
+from src.table import PlayerTable
+
+
+def linear(x_value, intercept, slope):
+    return intercept - slope * x_value
+
+
+FUNCTIONS = {"RB": (linear, (30.0, 0.1)), "WR": (linear, (25.0, 0.05))}
+
+
+def make_players():
+    players = []
+    for i, (position, ppg) in enumerate(
+        [("RB", 21.0), ("WR", 19.0), ("RB", 15.0), ("K", 9.0), ("WR", 22.0)]
+    ):
+        player = Player(f"Player {i}", position)
+        player.set_projected_ppg("ESPN", ppg)
+        players.append(player)
+    return players
+
+
+def test_rank_by_draft_value_matches_per_player_calculation():
+    players = make_players()
+    table = PlayerTable.from_players(players)
+
+    ranking = draft.rank_by_draft_value(table, 12, FUNCTIONS)
+
+    expected = sorted(
+        (
+            (
+                player.name,
+                calculate_draft_value(player, 12, *FUNCTIONS[player.position]),
+            )
+            for player in players
+            if player.position in FUNCTIONS
+        ),
+        key=lambda pair: pair[1],
+        reverse=True,
+    )
+    assert [(r.name, r.draft_value) for r in ranking] == expected
+
+
+def test_top_k_respects_availability():
+    table = PlayerTable.from_players(make_players())
+    available = numpy.array([True, True, True, True, False])
+
+    ranking = draft.rank_by_draft_value(table, 1, FUNCTIONS, available, top_k=2)
+
+    assert [r.name for r in ranking] == ["Player 1", "Player 0"]
+    assert draft.rank_by_draft_value(table, 1, FUNCTIONS, top_k=0) == []
+
+
+def test_draft_state_tracks_picks_incrementally():
+    players = make_players() + [Player("Odell Beckham Jr.", "WR")]
+    state = draft.DraftState(PlayerTable.from_players(players))
+
+    assert state.take("Player 4") == 4
+    assert state.take("Odell Beckham") == 5
+    assert state.take("Player 4") == 4
+    assert state.take("Nobody") is None
+    assert state.picks == [4, 5]
+    assert state.pick_number == 3
+    assert list(state.remaining()) == [0, 1, 2, 3]
+    assert "Player 4" not in [r.name for r in state.rank(FUNCTIONS)]
+
+    assert state.undo().row == 5
+    assert state.available[5]
+
+
+def test_draft_state_counts_picks_of_unknown_players():
+    state = draft.DraftState(PlayerTable.from_players(make_players()))
+
+    state.take("Player 0")
+    assert state.skip("Nobody") == 2
+    state.take("Player 1")
+
+    assert state.pick_number == 4
+    assert state.picks == [0, 1]
+    assert [pick.number for pick in state.history] == [1, 2, 3]
+    assert state.undo() == draft.Pick(3, "Player 1", 1)
+    assert state.undo() == draft.Pick(2, "Nobody", None)
+    assert state.pick_number == 2
+
+
+def test_optimal_draft_positions_invert_each_position_curve():
+    table = PlayerTable.from_players(make_players())
+
+    positions = draft.optimal_draft_positions(table, FUNCTIONS, last_pick=160)
+
+    # RB: 30 - 0.1x = 21 at x = 90; WR: 25 - 0.05x = 19 at x = 120.
+    numpy.testing.assert_allclose(positions[[0, 1, 2, 4]], [90.0, 120.0, 150.0, 60.0])
+    assert numpy.isnan(positions[3])
@@ -0,0 +1,167 @@
+import numpy
+import pytest
+import scipy.optimize
+
+import src.fitting as fitting
+import src.settings as settings
+
+X_VALUES = numpy.arange(1.0, 200.0, 5.0)
+Y_VALUES = fitting.power_model(X_VALUES, 100.0, 1.0, 1.0, 0.5, 2.0)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "USE_CACHE", True)
+
+
+@pytest.fixture
+def curve_fit_calls(monkeypatch):
+    calls = []
+    curve_fit = scipy.optimize.curve_fit
+
+    def recording_curve_fit(*args, **kwargs):
+        calls.append(kwargs.get("p0"))
+        return curve_fit(*args, **kwargs)
+
+    monkeypatch.setattr(scipy.optimize, "curve_fit", recording_curve_fit)
+    return calls
+
+
+def test_unchanged_points_are_served_from_cache(curve_fit_calls):
+    first = fitting.fit_curve("RB", X_VALUES, Y_VALUES)
+    second = fitting.fit_curve("RB", X_VALUES, Y_VALUES)
+
+    assert len(curve_fit_calls) == 1
+    numpy.testing.assert_array_equal(second.params, first.params)
+    numpy.testing.assert_allclose(
+        fitting.power_model(X_VALUES, *second.params), Y_VALUES, rtol=1e-6
+    )
+
+
+def test_changed_points_refit_from_previous_params(curve_fit_calls):
+    first = fitting.fit_curve("RB", X_VALUES, Y_VALUES)
+    fitting.fit_curve("RB", X_VALUES, Y_VALUES * 1.05)
+
+    numpy.testing.assert_array_equal(curve_fit_calls[0], numpy.ones(5))
+    numpy.testing.assert_array_equal(curve_fit_calls[1], first.params)
+
+
+def test_failures_are_cached(curve_fit_calls):
+    x_values = numpy.arange(1.0, 60.0)
+    y_values = 200.0 - x_values
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="curve fitting failed for K"):
+            fitting.fit_curve("K", x_values, y_values)
+
+    assert len(curve_fit_calls) == 1
+
+
+def test_fit_curves_reports_on_every_position():
+    points = {
+        "RB": (X_VALUES, Y_VALUES),
+        "K": (numpy.arange(1.0, 60.0), 200.0 - numpy.arange(1.0, 60.0)),
+    }
+
+    reports = fitting.fit_curves(points, num_workers=2, timeout=None)
+
+    assert list(reports) == ["RB", "K"]
+    assert reports["RB"].status == fitting.CONVERGED
+    assert reports["RB"].function_evaluations > 0
+    assert reports["RB"].residual_norm < 1e-3
+    assert reports["K"].status == fitting.FAILED
+    assert reports["K"].params is None
+
+    cached = fitting.fit_curves(points, num_workers=1, timeout=None)
+    assert cached["RB"].status == fitting.CACHED
+    assert cached["RB"].function_evaluations == 0
+
+
+def test_an_explicit_none_timeout_disables_the_limit(monkeypatch):
+    monkeypatch.setattr(settings, "USE_CACHE", False)
+    monkeypatch.setattr(settings, "FIT_TIMEOUT", 0.0)
+    points = {"RB": (X_VALUES, Y_VALUES)}
+
+    assert fitting.fit_curves(points, num_workers=1)["RB"].status == fitting.FAILED
+    assert (
+        fitting.fit_curves(points, num_workers=1, timeout=None)["RB"].status
+        == fitting.CONVERGED
+    )
+
+
+def test_timed_out_fit_falls_back_to_last_good_params():
+    first = fitting.fit_curve("RB", X_VALUES, Y_VALUES)
+
+    report = fitting.fit_position("RB", X_VALUES, Y_VALUES * 1.05, timeout=0.0)
+
+    assert report.status == fitting.FELL_BACK
+    assert "timed out" in report.message
+    numpy.testing.assert_array_equal(report.params, first.params)
+
+
+def test_invert_curve_solves_all_targets_and_clamps_to_range():
+    params = (100.0, 1.0, 1.0, 0.5, 2.0)
+    picks = numpy.array([1.0, 7.5, 42.0, 160.0])
+    targets = numpy.concatenate(
+        [fitting.power_model(picks, *params), [1000.0, 0.0, numpy.nan]]
+    )
+
+    solved = fitting.invert_curve(targets, fitting.power_model, params, 1.0, 160.0)
+
+    numpy.testing.assert_allclose(solved[:4], picks, atol=1e-5)
+    assert solved[4] == 1.0
+    assert solved[5] == 160.0
+    assert numpy.isnan(solved[6])
+
+
+def test_invert_curve_gives_nan_where_the_curve_is_not_finite():
+    def sqrt_curve(x_value, offset):
+        return -numpy.sqrt(x_value - offset)
+
+    targets = numpy.array([-1.0, -5.0])
+    # Undefined below x = 50, so nothing can be bracketed over [1, 160].
+    assert numpy.isnan(
+        fitting.invert_curve(targets, sqrt_curve, (50.0,), 1.0, 160.0)
+    ).all()
+
+    def gap_curve(x_value):
+        return numpy.where((x_value > 60.0) & (x_value < 100.0), numpy.nan, -x_value)
+
+    # The bisection cannot see past the gap, so no crossing is found.
+    assert numpy.isnan(
+        fitting.invert_curve(numpy.array([-5.0, -80.0]), gap_curve, (), 1.0, 160.0)
+    ).all()
+
+
+def test_fit_seasons_pools_the_points_of_every_season(tmp_path, monkeypatch):
+    from src import store
+    from src.infra import Player
+    from src.table import PlayerTable
+
+    monkeypatch.setattr(settings, "STORE_DIR_PATH", str(tmp_path / "store"))
+    for season, offset in ((2017, 0), (2018, 1)):
+        players = []
+        for x_value, y_value in zip(X_VALUES[offset::2], Y_VALUES[offset::2]):
+            player = Player(f"RB {x_value}", "RB")
+            player.set_rank("ESPN", x_value)
+            player.set_projected_ppg("ESPN", y_value)
+            players.append(player)
+        store.write_season(season, PlayerTable.from_players(players))
+
+    fitted = {}
+    fit_curves = fitting.fit_curves
+
+    def recording_fit_curves(points, *args):
+        fitted.update(points)
+        return fit_curves(points, *args)
+
+    monkeypatch.setattr(fitting, "fit_curves", recording_fit_curves)
+    reports = fitting.fit_seasons([2017, 2018], num_workers=1)
+
+    x_values, y_values = fitted["RB"]
+    assert sorted(x_values) == sorted(X_VALUES)
+    assert sorted(y_values) == sorted(Y_VALUES)
+    assert reports["RB"].params is not None
+
+    fitting.fit_seasons([2017, 2018], sources=["CBS"], num_workers=1)
+    assert len(fitted["RB"][0]) == 0
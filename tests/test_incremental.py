@@ -0,0 +1,65 @@
+import os
+import shutil
+
+import pytest
+
+import src.incremental as incremental
+import src.infra as infra
+import src.settings as settings
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data_path = tmp_path / "Data"
+    shutil.copytree(infra.DATA_DIR_PATH, data_path)
+    monkeypatch.setattr(infra, "DATA_DIR_PATH", str(data_path))
+    monkeypatch.setattr(settings, "CACHE_DIR_PATH", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "VERBOSE", False)
+    return data_path
+
+
+def records(players):
+    return [player.to_record() for player in players]
+
+
+def edit(path, old, new):
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    assert old in html
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html.replace(old, new))
+
+
+def test_refresh_matches_a_full_reload_after_each_change(data_dir):
+    loader = incremental.IncrementalLoader(num_workers=1)
+    first = loader.refresh()
+    assert len(first.changed_files) == len(infra.list_jobs())
+    assert records(loader.players) == records(infra.load_players(num_workers=1))
+    assert loader.refresh() == incremental.ReloadResult([], set())
+
+    rankings_path = str(data_dir / "ESPN" / "Rankings.htm")
+    edit(rankings_path, ">87. Mark Ingram<", ">88. Mark Ingram<")
+    result = loader.refresh()
+    assert result.changed_files == [("ESPN", infra.RANKINGS, rankings_path)]
+    assert result.changed_positions == {"RB"}
+    assert records(loader.players) == records(infra.load_players(num_workers=1))
+
+    projections_path = str(data_dir / "ESPN" / "Projections" / "6.htm")
+    os.remove(projections_path)
+    result = loader.refresh()
+    assert result.changed_files == [("ESPN", infra.PPG, projections_path)]
+    assert result.changed_positions
+    assert records(loader.players) == records(infra.load_players(num_workers=1))
+
+
+def test_touched_but_unchanged_files_are_not_reparsed(data_dir, monkeypatch):
+    loader = incremental.IncrementalLoader(sources=["ESPN"], num_workers=1)
+    loader.refresh()
+    rankings_path = str(data_dir / "ESPN" / "Rankings.htm")
+    os.utime(rankings_path, ns=(0, 0))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged files should not be re-parsed")
+
+    monkeypatch.setattr(infra, "parse_files", fail)
+    assert loader.refresh().changed_files == []
@@ -1,4 +1,7 @@
 import unittest
+from unittest import mock
+
+from src import infra, settings
 from src.infra import Player
 
 
@@ -20,5 +23,83 @@ class TestPlayer(unittest.TestCase):
         self.assertEqual(player5.similarity(player6), float("inf"))
 
 
+class TestPlayerIndex(unittest.TestCase):
+    def test_find_match_agrees_with_pairwise_similarity(self):
+        known = [
+            Player("Odell Beckham Jr."),
+            Player("Odell Beckham"),
+            Player("Chicago Bears D/ST"),
+            Player("Todd Gurley II"),
+            Player("Todd Gurley III"),
+            Player("Le'Veon Bell"),
+            Player("JuJu Smith-Schuster"),
+        ]
+        index = infra.PlayerIndex(known)
+
+        for name in [
+            "Odell Beckham",
+            "Odell Beckham Jr.",
+            "Odell Beckham Sr.",
+            "Chicago Bears",
+            "Bears D/ST",
+            "Todd Gurley",
+            "Todd Gurley Jr.",
+            "Le'Veon Bell",
+            "Leveon Bell",
+            "Juju Smith Schuster",
+            "Jane Smith",
+        ]:
+            with self.subTest(name=name):
+                player = Player(name)
+                self.assertIs(index.find_match(player), player.find_match(known))
+
+
+class TestParseFiles(unittest.TestCase):
+    def test_parallel_parsing_matches_serial_order(self):
+        with (
+            mock.patch.object(settings, "USE_CACHE", False),
+            mock.patch.object(settings, "VERBOSE", False),
+        ):
+            jobs = [
+                (source, kind, path)
+                for source in (
+                    source_class() for source_class in infra.source_classes()
+                )
+                for kind, path in source.file_paths()
+            ]
+            serial = infra.parse_files(jobs, num_workers=1)
+            parallel = infra.parse_files(jobs, num_workers=2)
+
+        self.assertEqual(len(serial), len(jobs))
+        self.assertEqual(parallel, serial)
+
+
+class TestSourceRegistry(unittest.TestCase):
+    def test_sources_are_registered_in_merge_order(self):
+        self.assertEqual(infra.source_names(), ["ESPN", "FantasyPros", "CBS"])
+        self.assertIs(infra.get_source("CBS"), infra.get_source("CBS"))
+        with self.assertRaises(ValueError):
+            infra.get_source("Yahoo")
+
+    def test_rankings_only_load_skips_projections(self):
+        with (
+            mock.patch.object(settings, "VERBOSE", False),
+            mock.patch.object(
+                infra.FantasyDataSource, "ppg_file_paths", side_effect=AssertionError
+            ),
+        ):
+            players = infra.load_players(
+                num_workers=1, kinds=(infra.RANKINGS,), sources=["ESPN"]
+            )
+
+        self.assertTrue(players)
+        self.assertTrue(all(set(p.rank_map) == {"ESPN"} for p in players))
+        self.assertTrue(all(not p.projected_ppg_map for p in players))
+
+    def test_unknown_sources_are_rejected(self):
+        with self.assertRaises(ValueError):
+            infra.load_players(sources=["Yahoo"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from src import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+@instrumentation.timed()
+def double(value):
+    return value * 2
+
+
+def test_nothing_is_recorded_while_disabled():
+    instrumentation.disable()
+
+    with instrumentation.timer("stage"):
+        instrumentation.count("rows")
+    assert double(2) == 4
+
+    assert instrumentation.snapshot() == instrumentation.Snapshot([], {})
+
+
+def test_timers_and_counters_are_recorded_while_enabled():
+    instrumentation.enable()
+
+    with instrumentation.timer("stage"):
+        instrumentation.count("rows", 3)
+        instrumentation.count("rows")
+    assert double(2) == 4
+
+    events, counters = instrumentation.snapshot()
+    assert [event.name for event in events] == ["stage", "double"]
+    assert counters == {"rows": 4}
+    summary = instrumentation.summary()
+    assert "stage" in summary and "double" in summary and "rows" in summary
+
+
+def test_worker_snapshots_merge_into_a_chrome_trace(tmp_path):
+    _, worker_snapshot = instrumentation.collect(double, True, 5)
+    instrumentation.reset()
+    instrumentation.merge(worker_snapshot)
+    instrumentation.merge(instrumentation.Snapshot([], {"rows": 2}))
+
+    instrumentation.write_chrome_trace(str(tmp_path / "trace.json"))
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    phases = {event["name"]: event["ph"] for event in trace["traceEvents"]}
+    assert phases == {"double": "X", "rows": "C"}
+    assert instrumentation.collect(double, False, 5) == (10, None)
+
+
+def test_player_lookups_are_counted():
+    from src.infra import Player, PlayerIndex
+
+    index = PlayerIndex([Player("Odell Beckham Jr.", "WR")])
+    instrumentation.enable()
+
+    assert index.find_match(Player("Odell Beckham")) is not None
+    assert index.find_match(Player("Nobody")) is None
+
+    assert instrumentation.snapshot().counters == {"player lookups": 2}
@@ -0,0 +1,97 @@
+import itertools
+
+import numpy
+import pytest
+
+from src import draft, lookahead, settings
+from src.infra import Player
+from src.table import PlayerTable
+
+
+@pytest.fixture(autouse=True)
+def small_league(monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_SIZE", 4)
+    monkeypatch.setattr(settings, "DRAFT_ROUNDS", 4)
+    monkeypatch.setattr(settings, "ROSTER_SLOTS", {"QB": 1, "RB": 2})
+    monkeypatch.setattr(settings, "POSITION_LIMITS", {"QB": 1, "RB": 3})
+
+
+def make_state(players):
+    table_players = []
+    for i, (position, ppg, ranks) in enumerate(players):
+        player = Player(f"Player {i}", position)
+        for source, rank in zip(("ESPN", "FantasyPros"), ranks):
+            player.set_rank(source, rank)
+        player.set_projected_ppg("ESPN", ppg)
+        table_players.append(player)
+    return draft.DraftState(PlayerTable.from_players(table_players))
+
+
+def test_expected_order_statistics_match_enumeration():
+    ppg = numpy.array([10.0, 8.0, 5.0])
+    survival = numpy.array([[0.3, 0.6, 0.9]])
+
+    expected = lookahead._expected_order_statistics(ppg, survival, 2)
+
+    brute_force = numpy.zeros(2)
+    for outcome in itertools.product([False, True], repeat=3):
+        chance = numpy.prod(numpy.where(outcome, survival[0], 1 - survival[0]))
+        survivors = ppg[list(outcome)]
+        for m in range(min(2, survivors.size)):
+            brute_force[m] += chance * survivors[m]
+    numpy.testing.assert_allclose(expected[0], brute_force)
+
+
+def test_survival_falls_with_later_picks():
+    state = make_state([("RB", 20.0, (1, 3)), ("RB", 18.0, (10, 12))])
+
+    survival = lookahead.survival_probabilities(state, numpy.array([1, 8, 20]))
+
+    numpy.testing.assert_allclose(survival[0], 1.0)
+    assert numpy.all(numpy.diff(survival, axis=0) <= 0)
+    assert survival[1, 0] < survival[1, 1]
+
+
+def test_recommend_takes_the_player_who_will_not_last():
+    # The only good QB goes early, while good RBs will still be there later.
+    players = [("QB", 25.0, (2, 2))] + [
+        ("RB", 26.0 - i, (20 + i, 20 + i)) for i in range(10)
+    ]
+    state = make_state(players)
+
+    recommendations = lookahead.recommend(state, 1, rounds=3)
+
+    assert recommendations[0].name == "Player 0"
+    assert recommendations[0].survival < 0.01
+    assert recommendations[1].projected_ppg > recommendations[0].projected_ppg
+
+
+def test_recommend_accounts_for_my_roster():
+    players = [("QB", 25.0, (2, 2)), ("QB", 24.0, (3, 3))] + [
+        ("RB", 20.0 - i, (20 + i, 20 + i)) for i in range(10)
+    ]
+    state = make_state(players)
+    for i in (0, 2, 3, 4, 5, 6, 7, 8):
+        state.take(f"Player {i}")
+
+    # Picks 1 and 8 were mine, so I already have my one QB at pick 9.
+    recommendations = lookahead.recommend(state, 1)
+
+    assert all(r.position == "RB" for r in recommendations)
+
+
+def test_recommend_finds_my_roster_by_overall_pick_number():
+    players = [("QB", 25.0, (2, 2)), ("QB", 24.0, (3, 3))] + [
+        ("RB", 20.0 - i, (20 + i, 20 + i)) for i in range(10)
+    ]
+    state = make_state(players)
+    # Pick 1 went to a player missing from the sources, so the QB taken at
+    # pick 2 is another team's, and I still need a QB at pick 8.
+    state.skip("Someone Else")
+    for i in (0, 2, 3, 4, 5, 6):
+        state.take(f"Player {i}")
+
+    recommendations = lookahead.recommend(state, 1, rounds=1)
+
+    assert state.pick_number == 8
+    assert recommendations[0].position == "QB"
@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+from src import main
+from src.infra import Player
+
+# Seconds a fresh interpreter may spend importing everything `rank` needs.
+RANK_STARTUP_BUDGET = 1.0
+HEAVY_MODULES = ("matplotlib", "scipy")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RANK_SCRIPT = textwrap.dedent(
+    """
+    import json
+    import sys
+    import time
+
+    start = time.perf_counter()
+    from src import infra, main, settings
+    elapsed = time.perf_counter() - start
+
+    from src.infra import Player
+
+    def linear(x_value, intercept, slope):
+        return intercept - slope * x_value
+
+    def load_players(**kwargs):
+        player = Player("Player 0", "RB")
+        player.set_projected_ppg("ESPN", 20.0)
+        return [player]
+
+    settings.VERBOSE = False
+    infra.load_players = load_players
+    main.load_functions = lambda table: {"RB": (linear, (30.0, 0.1))}
+    main.main(["rank"])
+    print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+    """
+)
+
+
+def linear(x_value, intercept, slope):
+    return intercept - slope * x_value
+
+
+def test_rank_starts_within_budget_without_plotting_stack():
+    output = subprocess.run(
+        [sys.executable, "-c", RANK_SCRIPT],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+
+    assert "Player 0" in output
+    assert result["elapsed"] < RANK_STARTUP_BUDGET
+    loaded = {module.split(".")[0] for module in result["modules"]}
+    assert not loaded & set(HEAVY_MODULES)
+
+
+def test_rank_command_skips_taken_players(monkeypatch, capsys):
+    players = []
+    for i, ppg in enumerate([21.0, 19.0, 15.0]):
+        player = Player(f"Player {i}", "RB")
+        player.set_projected_ppg("ESPN", ppg)
+        players.append(player)
+    monkeypatch.setattr(main.infra, "load_players", lambda **kwargs: players)
+    monkeypatch.setattr(
+        main, "load_functions", lambda table: {"RB": (linear, (30.0, 0.1))}
+    )
+
+    main.main(["rank", "--pick", "3", "--taken", "Player 0", "--top-k", "1"])
+
+    output = capsys.readouterr().out
+    assert "Player 1" in output
+    assert "Player 0" not in output and "Player 2" not in output
+
+
+def test_consensus_command_reads_only_rankings(monkeypatch, capsys):
+    requests = []
+    players = []
+    for i, position in enumerate(["RB", "WR", "RB"]):
+        player = Player(f"Player {i}", position)
+        player.set_rank("ESPN", 3 - i)
+        players.append(player)
+
+    def load_players(**kwargs):
+        requests.append(kwargs)
+        return players
+
+    monkeypatch.setattr(main.infra, "load_players", load_players)
+
+    main.main(["--source", "ESPN", "consensus", "--position", "RB"])
+
+    assert requests == [{"kinds": ("rankings",), "sources": ["ESPN"]}]
+    output = capsys.readouterr().out
+    assert output.index("Player 2") < output.index("Player 0")
+    assert "Player 1" not in output
+
+
+def test_watch_refits_with_the_configured_curve_models(monkeypatch, capsys):
+    from src import incremental, models, settings
+
+    player = Player("Player 0", "RB")
+    player.set_projected_ppg("ESPN", 20.0)
+
+    class FakeLoader:
+        def __init__(self, sources=None):
+            self.players = [player]
+
+        def refresh(self):
+            return incremental.ReloadResult([], set())
+
+        def watch(self, on_change, interval):
+            on_change(incremental.ReloadResult([("ESPN", "ppg", "1.htm")], {"RB"}))
+
+    selected = []
+
+    def select_table(table, positions=None):
+        selected.append(positions)
+        return {"RB": models.Selection("RB", "isotonic", (1.0, 2.0), {}, {})}
+
+    def fit_table(*args, **kwargs):
+        raise AssertionError("power curves should not be fitted")
+
+    monkeypatch.setattr(settings, "CURVE_MODELS", ["power", "isotonic"])
+    monkeypatch.setattr(incremental, "IncrementalLoader", FakeLoader)
+    monkeypatch.setattr(main.infra, "list_jobs", lambda **kwargs: [])
+    monkeypatch.setattr(main, "load_functions", lambda table: {})
+    monkeypatch.setattr(models, "select_table", select_table)
+    monkeypatch.setattr(main.fitting, "fit_table", fit_table)
+
+    main.main(["watch"])
+
+    assert selected == [{"RB"}]
+    assert "Refitted RB: isotonic" in capsys.readouterr().out
@@ -0,0 +1,150 @@
+import numpy
+import pytest
+
+import src.fitting as fitting
+import src.models as models
+import src.settings as settings
+
+X_VALUES = numpy.arange(1.0, 200.0, 3.0)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "USE_CACHE", True)
+
+
+def test_closed_form_families_recover_their_own_curves():
+    exponential = models.get_model("exponential")
+    y_values = models.exponential_model(X_VALUES, 80.0, 0.02, 10.0)
+    params = exponential.fit("RB", X_VALUES, y_values)
+    numpy.testing.assert_allclose(
+        exponential.func(X_VALUES, *params), y_values, rtol=1e-3
+    )
+
+    piecewise = models.get_model("piecewise_linear")
+    y_values = numpy.where(X_VALUES < 100.0, 50.0 - 0.3 * X_VALUES, 20.0)
+    params = piecewise.fit("RB", X_VALUES, y_values)
+    # The bend falls between knots, so only the segments away from it are exact.
+    far = numpy.abs(X_VALUES - 100.0) > 50.0
+    numpy.testing.assert_allclose(
+        piecewise.func(X_VALUES, *params)[far], y_values[far], atol=1.0
+    )
+
+
+def test_isotonic_pools_violators_and_interpolates():
+    isotonic = models.get_model("isotonic")
+    params = isotonic.fit(
+        "RB",
+        numpy.array([1.0, 2.0, 3.0, 3.0, 4.0]),
+        numpy.array([10.0, 6.0, 8.0, 8.0, 1.0]),
+    )
+
+    numpy.testing.assert_allclose(params, [1, 2, 3, 4, 10, 22 / 3, 22 / 3, 1])
+    numpy.testing.assert_allclose(
+        isotonic.func(numpy.array([0.0, 1.5, 10.0]), *params), [10, 26 / 3, 1]
+    )
+
+
+def test_selection_picks_the_generating_family_and_is_cached(monkeypatch):
+    rng = numpy.random.default_rng(0)
+    y_values = models.exponential_model(X_VALUES, 80.0, 0.02, 10.0) + rng.normal(
+        0, 0.5, X_VALUES.size
+    )
+    points = {"RB": (X_VALUES, y_values)}
+
+    serial = models.select_curves(points, models.model_names(), num_workers=1)
+    assert serial["RB"].model == "exponential"
+    assert set(serial["RB"].errors) == set(models.model_names())
+    assert not serial["RB"].cached
+
+    monkeypatch.setattr(settings, "USE_CACHE", False)
+    parallel = models.select_curves(points, models.model_names(), num_workers=2)
+    assert parallel["RB"].model == "exponential"
+    assert parallel["RB"].errors == serial["RB"].errors
+
+    monkeypatch.setattr(settings, "USE_CACHE", True)
+    assert models.select_curves(points, models.model_names())["RB"].cached
+
+    func, params = models.selected_functions(serial)["RB"]
+    numpy.testing.assert_allclose(func(X_VALUES, *params), y_values, atol=2.0)
+
+
+def test_a_single_candidate_is_fitted_without_cross_validation(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("a single candidate should not be cross-validated")
+
+    monkeypatch.setattr(models, "_fold_job", fail)
+    y_values = fitting.power_model(X_VALUES, 100.0, 1.0, 1.0, 0.5, 2.0)
+
+    selections = models.select_curves({"RB": (X_VALUES, y_values)}, ["power"])
+
+    assert selections["RB"].model == "power"
+    assert selections["RB"].errors == {}
+    with pytest.raises(ValueError):
+        models.select_curves({"RB": (X_VALUES, y_values)}, ["spline"])
+
+
+def test_folds_too_small_for_a_model_score_inf():
+    x_values = numpy.arange(1.0, 7.0)
+    y_values = models.exponential_model(x_values, 30.0, 0.3, 5.0)
+
+    selections = models.select_curves(
+        {"RB": (x_values, y_values)}, models.model_names(), folds=5, num_workers=1
+    )
+
+    assert selections["RB"].errors["power"] == numpy.inf
+    assert selections["RB"].model != "power"
+
+
+def test_fold_fits_start_from_their_own_training_points(monkeypatch):
+    starts = []
+    refit = fitting.refit
+
+    def recording_refit(x_values, y_values, initial_params, *args):
+        starts.append((x_values, initial_params))
+        return refit(x_values, y_values, initial_params, *args)
+
+    monkeypatch.setattr(fitting, "refit", recording_refit)
+    y_values = fitting.power_model(X_VALUES, 100.0, 1.0, 1.0, 0.5, 2.0)
+
+    selections = models.select_curves(
+        {"RB": (X_VALUES, y_values)}, ["power", "exponential"], num_workers=1
+    )
+
+    assert len(starts) == settings.CV_FOLDS
+    for x_values, start in starts:
+        train = numpy.isin(X_VALUES, x_values)
+        numpy.testing.assert_array_equal(
+            start, fitting.initial_guess(X_VALUES[train], y_values[train])
+        )
+    assert selections["RB"].fold_failures == {"power": 0, "exponential": 0}
+
+
+def test_power_wins_where_it_fits_best_and_failed_folds_are_counted(monkeypatch):
+    rng = numpy.random.default_rng(0)
+    y_values = fitting.power_model(X_VALUES, 100.0, 1.0, 1.0, 0.5, 2.0) + rng.normal(
+        0, 0.2, X_VALUES.size
+    )
+    points = {"RB": (X_VALUES, y_values)}
+
+    selections = models.select_curves(points, models.model_names(), num_workers=1)
+
+    assert selections["RB"].model == "power"
+    assert numpy.isfinite(selections["RB"].errors["power"])
+    assert selections["RB"].fold_failures["power"] == 0
+
+    # One failed fold is counted, not scored as inf for the whole candidate.
+    fold_job = models._fold_job
+    calls = []
+
+    def failing_once(job):
+        calls.append(job)
+        return None if job.model == "power" and len(calls) == 1 else fold_job(job)
+
+    monkeypatch.setattr(settings, "USE_CACHE", False)
+    monkeypatch.setattr(models, "_fold_job", failing_once)
+    selections = models.select_curves(points, models.model_names(), num_workers=1)
+
+    assert selections["RB"].fold_failures["power"] == 1
+    assert selections["RB"].model == "power"
@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+import src.names as names
+import src.settings as settings
+
+
+def test_simplify_strips_suffixes_dst_markers_and_team_names():
+    assert names.simplify("Odell Beckham Jr.") == "Odell Beckham"
+    assert names.simplify("Todd Gurley II") == "Todd Gurley"
+    assert names.simplify("Jacksonville Jaguars D/ST") == "Jaguars"
+    assert names.simplify("New England Patriots") == "Patriots"
+    assert names.simplify("Jr. Smith") == "Jr. Smith"
+
+
+def old_simplify(name):
+    """The sequential simplification ``names.simplify`` replaced."""
+
+    name = re.sub(r" (Jr\.|Sr\.|II|III)$", "", name)
+    name = name.replace(" D/ST", "").replace(" D/STD/ST", "")
+    for team_name in settings.TEAM_NAMES:
+        name = name.replace(f"{team_name} ", "")
+    return name
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "Dwayne Washington Jr.",
+        "X Miami Sr.",
+        "Ted Ginn Jr.",
+        "Chicago D/ST",
+        "Chicago Bears D/ST",
+        "New York Giants D/ST",
+        "Los Angeles Rams",
+        "Tampa Bay Buccaneers D/ST",
+        "Robert Griffin III",
+        "Le'Veon Bell",
+        "Washington Redskins",
+        "Jr. Smith",
+    ],
+)
+def test_simplify_matches_the_sequential_implementation(name):
+    assert names.simplify(name) == old_simplify(name)
+
+
+def test_keys_expose_raw_simplified_and_slug_names():
+    assert names.keys("Chicago Bears D/ST") == names.NameKeys(
+        "Chicago Bears D/ST", "Bears", "bears"
+    )
+
+
+def test_slug_ignores_case_punctuation_and_suffixes():
+    assert names.slug("Le'Veon Bell") == names.slug("Leveon Bell") == "leveonbell"
+    assert names.slug("JuJu Smith-Schuster") == names.slug("Juju Smithschuster")
+    assert names.slug("A.J. Green") == "ajgreen"
+    assert names.slug("Todd Gurley II") == "toddgurley"
+
+
+def test_sanitize_matches_ascii_fast_path():
+    assert names.sanitize("Le'Veon Bell") == "Le'Veon Bell"
+    assert names.sanitize("ÂJosé García") == "Jose Garcia"
@@ -0,0 +1,95 @@
+import pytest
+
+import src.infra as infra
+import src.parsing as parsing
+import src.settings as settings
+
+
+def test_streaming_backend_closes_implicit_cells_and_rows():
+    html = """
+    <p>before</p>
+    <table class="other"><tr><td>ignored</td></tr></table>
+    <table class="stats wide">
+      <tr><th>Player</th><th>PTS</th>
+      <tr><td class="player-label"><a>Tom Brady</a> NE<input type="checkbox"><td>21.5
+      <tr><td class="player-label"><a>Aaron&nbsp;Rodgers</a><script>x = "<td>";</script><td>20
+    </table>
+    <table class="stats"><tr><td>after</td></tr></table>
+    """
+
+    rows = list(parsing.iter_rows(html, parsing.TableSpec("stats"), "stream"))
+
+    assert [len(row.cells) for row in rows] == [0, 2, 2]
+    assert "Player" in rows[0].get_text()
+    assert rows[1].find_cell("player-label").find("a").text == "Tom Brady"
+    assert rows[1].cells[0].find("input") is not None
+    assert rows[1].cells[-1].get_text().strip() == "21.5"
+    assert rows[2].cells[0].get_text() == "Aaron Rodgers"
+
+
+def test_streaming_backend_reads_nested_blocks():
+    html = """
+    <div class="player-row"><div class="rank">1</div>
+      <a href="/players/1/leveon-bell/"><span class="player-name">L. Bell</span></a>
+      <div><span class="team position">PIT RB $34</span></div></div>
+    <div class="player-row"><div class="rank">2</div></div>
+    """
+
+    rows = list(
+        parsing.iter_rows(html, parsing.BlockSpec("div", "player-row"), "stream")
+    )
+
+    assert len(rows) == 2
+    block = rows[0].cells[0]
+    assert block.find("div", class_="rank").text == "1"
+    assert block.find("a").href == "/players/1/leveon-bell/"
+    assert block.find("span", class_="position").text == "PIT RB $34"
+    assert rows[1].get_text().strip() == "2"
+
+
+def test_missing_table_raises():
+    with pytest.raises(parsing.TableNotFoundError):
+        list(
+            parsing.iter_rows(
+                "<table class='a'></table>", parsing.TableSpec("b"), "stream"
+            )
+        )
+
+
+def test_streaming_backend_matches_html5lib_on_nested_tables():
+    html = """
+    <table class="stats"><tbody>
+      <tr><td class="player-label"><a>Tom Brady</a>
+        <table class="inner"><tbody><tr><td>QB</td><td>NE</td></tr></tbody></table>
+      </td><td>21.5</td></tr>
+      <tr><td>Aaron Rodgers</td><td>20</td></tr>
+    </tbody></table>
+    """
+
+    expected = list(parsing.iter_rows(html, parsing.TableSpec("stats"), "html5lib"))
+    actual = list(parsing.iter_rows(html, parsing.TableSpec("stats"), "stream"))
+
+    assert [len(row.cells) for row in expected] == [2, 2]
+    assert expected[0].cells[1].text == "21.5"
+    assert actual == expected
+
+
+@pytest.mark.parametrize("source_class", infra.source_classes())
+def test_streaming_backend_matches_html5lib(source_class, monkeypatch):
+    monkeypatch.setattr(settings, "USE_CACHE", False)
+    monkeypatch.setattr(settings, "VERBOSE", False)
+
+    def parse_all():
+        source = source_class()
+        return [
+            player.to_record()
+            for player in source.parse_rankings() + source.parse_ppg()
+        ]
+
+    monkeypatch.setattr(settings, "HTML_PARSER_BACKEND", "html5lib")
+    expected = parse_all()
+    monkeypatch.setattr(settings, "HTML_PARSER_BACKEND", "stream")
+    actual = parse_all()
+
+    assert expected
+    assert actual == expected
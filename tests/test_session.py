@@ -0,0 +1,170 @@
+import io
+import json
+
+from src import incremental
+from src import session
+from src.infra import Player
+from src.table import PlayerTable
+
+
+def linear(x_value, intercept, slope):
+    return intercept - slope * x_value
+
+
+FUNCTIONS = {"RB": (linear, (30.0, 0.1)), "WR": (linear, (25.0, 0.05))}
+
+
+def make_players(count=4):
+    players = []
+    for i, (position, ppg) in enumerate(
+        [("RB", 21.0), ("WR", 19.0), ("RB", 15.0), ("WR", 22.0), ("RB", 25.0)][:count]
+    ):
+        player = Player(f"Player {i}", position)
+        player.set_rank("ESPN", i + 1)
+        player.set_projected_ppg("ESPN", ppg)
+        players.append(player)
+    return players
+
+
+def make_session(loader=None):
+    return session.DraftSession(
+        PlayerTable.from_players(make_players()), dict(FUNCTIONS), 1, loader=loader
+    )
+
+
+class FakeLoader:
+    """Stands in for an IncrementalLoader whose files gained a fifth player."""
+
+    def __init__(self):
+        self.players = make_players(5)
+
+    def refresh(self):
+        return incremental.ReloadResult([("ESPN", "ppg", "1.htm")], {"RB"})
+
+
+def test_take_and_rank_update_in_memory_state():
+    draft_session = make_session()
+
+    assert draft_session.handle({"command": "take", "player": "Player 3"}) == {
+        "ok": True,
+        "pick": 1,
+        "player": "Player 3",
+    }
+    reply = draft_session.handle({"command": "rank", "top_k": 2})
+
+    assert reply["ok"] and reply["pick"] == 2
+    assert [player["name"] for player in reply["players"]] == ["Player 1", "Player 0"]
+
+    draft_session.handle({"command": "undo"})
+    assert draft_session.handle({"command": "status"}) == {
+        "ok": True,
+        "pick": 1,
+        "picks": [],
+    }
+
+
+def test_errors_are_replies():
+    draft_session = make_session()
+    draft_session.handle({"command": "take", "player": "Player 0"})
+
+    for message in (
+        {"command": "take", "player": "Player 0"},
+        {"command": "take", "player": "Nobody"},
+        {"command": "take"},
+        {"command": "recommend", "draft_slot": 99},
+        {"command": "explode"},
+        ["not", "an", "object"],
+    ):
+        reply = draft_session.handle(message)
+        assert not reply["ok"] and reply["error"]
+    assert draft_session.handle({"command": "status"})["picks"] == ["Player 0"]
+
+
+def test_unknown_players_can_be_taken_to_keep_the_pick_count():
+    draft_session = make_session()
+
+    assert not draft_session.handle({"command": "take", "player": "Nobody"})["ok"]
+    assert draft_session.handle(
+        {"command": "take", "player": "Nobody", "unknown": True}
+    ) == {"ok": True, "pick": 1, "player": "Nobody", "unknown": True}
+    draft_session.handle({"command": "take", "player": "Player 3"})
+
+    assert draft_session.handle({"command": "status"}) == {
+        "ok": True,
+        "pick": 3,
+        "picks": ["Nobody", "Player 3"],
+    }
+    draft_session.handle({"command": "undo"})
+    assert draft_session.handle({"command": "undo"})["player"] == "Nobody"
+    assert draft_session.handle({"command": "status"})["pick"] == 1
+
+
+def test_serve_stream_answers_every_line():
+    output = io.StringIO()
+    lines = [
+        json.dumps({"command": "take", "player": "Player 0"}),
+        "",
+        "not json",
+        json.dumps({"command": "recommend", "top_k": 1}),
+    ]
+
+    session.serve_stream(make_session(), io.StringIO("\n".join(lines)), output)
+
+    replies = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [reply["ok"] for reply in replies] == [True, False, True]
+    assert replies[2]["pick"] == 2 and len(replies[2]["players"]) == 1
+
+
+def test_reload_keeps_picks_and_refits_changed_positions(monkeypatch):
+    refitted = []
+
+    def fit(table, positions=None):
+        refitted.append(positions)
+        return {}
+
+    monkeypatch.setattr(session, "_fit", fit)
+    draft_session = make_session(FakeLoader())
+    draft_session.handle({"command": "take", "player": "Player 3"})
+
+    reply = draft_session.handle({"command": "reload"})
+
+    assert reply == {
+        "ok": True,
+        "changed_files": ["1.htm"],
+        "changed_positions": ["RB"],
+        "pick": 2,
+    }
+    assert refitted == [{"RB"}]
+    # The refit failed, so RB has no curve rather than its old one.
+    assert set(draft_session.functions) == {"WR"}
+    assert len(draft_session.table) == 5
+    assert draft_session.handle({"command": "status"})["picks"] == ["Player 3"]
+    assert not make_session().handle({"command": "reload"})["ok"]
+
+
+def test_reload_keeps_picks_that_no_longer_resolve(monkeypatch):
+    monkeypatch.setattr(session, "_fit", lambda table, positions=None: {})
+    loader = FakeLoader()
+    draft_session = make_session(loader)
+    draft_session.handle({"command": "take", "player": "Player 3"})
+    draft_session.handle({"command": "take", "player": "Player 0"})
+
+    # A half-written file drops Player 3 for one reload.
+    loader.players = [p for p in make_players(5) if p.name != "Player 3"]
+    draft_session.handle({"command": "reload"})
+
+    assert draft_session.handle({"command": "status"})["pick"] == 3
+    assert not draft_session.state.available[draft_session.state.resolve("Player 0")]
+
+    loader.players = make_players(5)
+    draft_session.handle({"command": "reload"})
+
+    assert draft_session.state.picks == [
+        draft_session.state.resolve("Player 3"),
+        draft_session.state.resolve("Player 0"),
+    ]
+    assert draft_session.handle({"command": "status"}) == {
+        "ok": True,
+        "pick": 3,
+        "picks": ["Player 3", "Player 0"],
+    }
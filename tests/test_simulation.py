@@ -0,0 +1,89 @@
+import numpy
+import pytest
+
+from src import settings, simulation
+from src.infra import Player
+from src.table import PlayerTable
+
+
+def linear(x_value, intercept, slope):
+    return intercept - slope * x_value
+
+
+FUNCTIONS = {"QB": (linear, (30.0, 0.5)), "RB": (linear, (15.0, 0.5))}
+
+
+def make_table(count=40):
+    players = []
+    for i in range(count):
+        player = Player(f"Player {i}", "QB" if i % 4 == 0 else "RB")
+        player.set_rank("ESPN", i + 1)
+        player.set_rank("FantasyPros", i + 1 + (i % 3))
+        player.set_projected_ppg("ESPN", 30.0 - 0.5 * i)
+        players.append(player)
+    return PlayerTable.from_players(players)
+
+
+@pytest.fixture(autouse=True)
+def small_league(monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_SIZE", 4)
+    monkeypatch.setattr(settings, "DRAFT_ROUNDS", 3)
+    monkeypatch.setattr(settings, "ROSTER_SLOTS", {"QB": 1, "RB": 2})
+    monkeypatch.setattr(settings, "POSITION_LIMITS", {"QB": 1, "RB": 2})
+
+
+def test_snake_order():
+    numpy.testing.assert_array_equal(simulation.snake_order(2, 4, 4), [2, 7, 10, 15])
+    numpy.testing.assert_array_equal(simulation.snake_order(4, 4, 2), [4, 5])
+
+
+def test_simulation_is_reproducible_and_independent_of_workers():
+    table = make_table()
+
+    serial = simulation.simulate_drafts(
+        table, FUNCTIONS, 2, num_simulations=300, num_workers=1, seed=7
+    )
+    parallel = simulation.simulate_drafts(
+        table, FUNCTIONS, 2, num_simulations=300, num_workers=2, seed=7
+    )
+
+    assert serial == parallel
+    assert set(serial) == set(simulation.STRATEGIES)
+    assert all(result.num_simulations == 300 for result in serial.values())
+
+
+def test_position_limits_are_respected(monkeypatch):
+    # With a single team every pick is mine, so the outcome is deterministic.
+    monkeypatch.setattr(settings, "LEAGUE_SIZE", 1)
+    players = []
+    for i, (position, ppg) in enumerate(
+        [("QB", 30.0), ("QB", 29.0), ("RB", 10.0), ("RB", 9.0), ("RB", 8.0)]
+    ):
+        player = Player(f"Player {i}", position)
+        player.set_rank("ESPN", i + 1)
+        player.set_projected_ppg("ESPN", ppg)
+        players.append(player)
+
+    results = simulation.simulate_drafts(
+        PlayerTable.from_players(players),
+        FUNCTIONS,
+        1,
+        num_simulations=10,
+        strategies=[simulation.BEST_PPG],
+        num_workers=1,
+        seed=0,
+    )
+
+    result = results[simulation.BEST_PPG]
+    assert result.mean_roster_ppg == 30.0 + 10.0 + 9.0
+    assert result.std_roster_ppg == 0.0
+
+
+def test_invalid_draft_slot():
+    with pytest.raises(ValueError):
+        simulation.simulate_drafts(make_table(), FUNCTIONS, 5)
+
+
+def test_no_simulations():
+    with pytest.raises(ValueError):
+        simulation.simulate_drafts(make_table(), FUNCTIONS, 2, num_simulations=0)
@@ -0,0 +1,51 @@
+import numpy
+import pytest
+
+from src import store
+from src.infra import Player
+from src.table import PlayerTable
+
+
+def make_table(ppg_offset=0.0):
+    players = []
+    for i, position in enumerate(["RB", "WR", "RB"]):
+        player = Player(f"Player {i}", position, "NE")
+        player.set_rank("ESPN", i + 1)
+        player.set_projected_ppg("ESPN", 20.0 - i + ppg_offset)
+        player.set_projected_ppg("CBS", 19.0 - i + ppg_offset)
+        players.append(player)
+    players[1].set_rank("CBS", 4)
+    return PlayerTable.from_players(players)
+
+
+def test_seasons_round_trip_through_memory_mapped_columns(tmp_path):
+    table = make_table()
+    store.write_season(2017, make_table(5.0), str(tmp_path))
+    store.write_season(2018, make_table(1.0), str(tmp_path))
+    store.write_season(2018, table, str(tmp_path))
+
+    assert store.seasons(str(tmp_path)) == [2017, 2018]
+    season = store.Season(2018, str(tmp_path))
+    assert isinstance(season.column("rank", "ESPN"), numpy.memmap)
+    stored = season.table()
+    assert stored.names == table.names and stored.sources == table.sources
+    assert [player.to_record() for player in stored] == [
+        player.to_record() for player in table
+    ]
+
+
+def test_points_read_any_subset_of_seasons_and_sources(tmp_path):
+    store.write_season(2017, make_table(5.0), str(tmp_path))
+    store.write_season(2018, make_table(), str(tmp_path))
+
+    x_values, y_values = store.points([2017, 2018], "RB", ["ESPN"], str(tmp_path))
+    assert list(x_values) == [1.0, 3.0, 1.0, 3.0]
+    assert list(y_values) == [25.0, 23.0, 20.0, 18.0]
+    assert list(store.points([2018], "WR", ["CBS"], str(tmp_path))[0]) == [4.0]
+    assert store.points([2018], "QB", root=str(tmp_path))[0].size == 0
+    assert store.Season(2018, str(tmp_path)).table(["CBS"]).sources == ["CBS"]
+
+
+def test_missing_seasons_raise(tmp_path):
+    with pytest.raises(store.StoreError):
+        store.Season(1999, str(tmp_path))
@@ -0,0 +1,57 @@
+import numpy
+
+from src.infra import Player
+from src.table import PROJECTED_PPG, PlayerTable
+
+
+def make_players():
+    gurley = Player("Todd Gurley", "RB", "LAR")
+    gurley.set_rank("ESPN", 2)
+    gurley.set_rank("FantasyPros", 1)
+    gurley.set_projected_ppg("ESPN", 20.0)
+    gurley.set_projected_ppg("FantasyPros", 22.0)
+    brady = Player("Tom Brady", "QB", "NE")
+    brady.set_rank("ESPN", 30)
+    brady.set_projected_ppg("FantasyPros", 18.5)
+    unknown = Player("Nobody")
+    return [gurley, brady, unknown]
+
+
+def test_columns_hold_nan_for_missing_values():
+    table = PlayerTable.from_players(make_players())
+
+    assert table.sources == ["ESPN", "FantasyPros"]
+    assert table.positions == ["RB", "QB"]
+    assert list(table.position_codes) == [0, 1, -1]
+    numpy.testing.assert_array_equal(
+        table.column(PROJECTED_PPG, "ESPN"), [20.0, numpy.nan, numpy.nan]
+    )
+    numpy.testing.assert_array_equal(
+        table.average_projected_ppg(), [21.0, 18.5, numpy.nan]
+    )
+
+
+def test_points_pair_rank_and_ppg_from_the_same_source():
+    table = PlayerTable.from_players(make_players())
+
+    x_values, y_values = table.points("RB")
+    assert list(x_values) == [2, 1]
+    assert list(y_values) == [20.0, 22.0]
+    assert table.points("QB")[0].size == 0
+    assert list(table.points("RB", "FantasyPros")[1]) == [22.0]
+
+
+def test_views_read_and_write_through_the_table():
+    players = make_players()
+    table = PlayerTable.from_players(players)
+    view = table[0]
+
+    assert view.name == "Todd Gurley"
+    assert view.rank_map == players[0].rank_map
+    assert view.get_rank("ESPN") == 2
+    assert view.get_average_projected_ppg() == 21.0
+    assert table[2].position is None
+
+    view.set_projected_ppg("ESPN", 24.0)
+    assert table.average_projected_ppg()[0] == 23.0
+    assert view.to_record() == table[0].to_record()